@@ -7,5 +7,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbri_backend.settings')
+# Loaded by a server: warm the model at startup (see PREDICTOR_SERVING)
+os.environ.setdefault('PREDICTOR_SERVING', '1')
 
 application = get_asgi_application()
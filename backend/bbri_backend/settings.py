@@ -31,6 +31,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'predictor.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -112,3 +113,109 @@ REST_FRAMEWORK = {
 
 # Model path
 MODEL_PATH = os.path.join(BASE_DIR.parent, 'best_tft_model.pth')
+MODEL_SPEC_PATH = os.path.join(BASE_DIR.parent, 'best_tft_model.spec.json')
+MODEL_ONNX_PATH = os.path.join(BASE_DIR.parent, 'best_tft_model.onnx')  # `python manage.py export_onnx`
+
+# 'live' runs the TFT on the request path; 'precomputed' only reads the forecast
+# store written by `python manage.py precompute_forecasts` (torch is never imported)
+PREDICTOR_SERVING_MODE = 'live'
+
+# Load the model and run a warm-up forward pass when the app starts (live mode)
+PREDICTOR_EAGER_LOAD = True
+
+# Set by bbri_backend/wsgi.py, asgi.py and gunicorn.conf.py: this process serves
+# requests. Only serving processes (and `manage.py runserver`) eagerly load the
+# model and start the in-process price scheduler; scripts and other commands do not
+PREDICTOR_SERVING = os.environ.get('PREDICTOR_SERVING') == '1'
+
+# Build input tensors directly instead of going through TimeSeriesDataSet/DataLoader
+PREDICTOR_FAST_PATH = True
+
+# CPU inference: 'eager' (default), 'torchscript' (traced forward pass, identical
+# output, ~3x lower latency), 'quantized' (dynamic int8 Linear weights only: trades
+# accuracy, ~16 IDR, for size and is slower than eager, not a speedup) or 'onnx'
+# (MODEL_ONNX_PATH run by onnxruntime; the worker never imports torch). The
+# optimized modes are opt-in through the environment variable
+PREDICTOR_INFERENCE_MODE = os.environ.get('PREDICTOR_INFERENCE_MODE', 'eager')
+
+# Torch threads per worker process. The available CPUs are split between
+# PREDICTOR_WORKER_PROCESSES workers (gunicorn's WEB_CONCURRENCY) unless
+# PREDICTOR_TORCH_THREADS is set; OMP/MKL_NUM_THREADS set in the environment win
+PREDICTOR_WORKER_PROCESSES = int(os.environ.get('WEB_CONCURRENCY', 1))
+PREDICTOR_TORCH_THREADS = None
+PREDICTOR_TORCH_INTEROP_THREADS = 1
+
+# Memory-map best_tft_model.pth so worker processes share one page-cache copy of the weights
+PREDICTOR_MMAP_WEIGHTS = True
+
+# Set by gunicorn.conf.py (preload_app): the model is loaded and warmed up once in the
+# gunicorn master, and the forked workers share its memory copy-on-write
+PREDICTOR_PRELOAD = os.environ.get('PREDICTOR_PRELOAD') == '1'
+
+# Tickers the prediction API accepts (first one is the default)
+PREDICTOR_TICKERS = ['BBRI.JK', 'BMRI.JK', 'BBCA.JK', 'BBNI.JK']
+
+# Forecast cache (full 30-day quantile forecast per ticker and data date)
+FORECAST_CACHE_SIZE = 128
+FORECAST_CACHE_TTL = 6 * 60 * 60  # seconds
+
+# Serialized Bokeh charts, keyed per forecast and target date (same TTL as forecasts)
+BOKEH_CHART_CACHE_SIZE = 256
+
+# Thread pool for blocking inference work (async and streaming batch endpoints)
+PREDICTOR_EXECUTOR_WORKERS = 4
+
+# Response compression (predictor.middleware.CompressionMiddleware), in order of
+# preference when the client accepts several; set RESPONSE_COMPRESSION=0 when a
+# reverse proxy already compresses
+RESPONSE_COMPRESSION = os.environ.get('RESPONSE_COMPRESSION', '1') == '1'
+RESPONSE_COMPRESSION_ENCODINGS = ['br', 'gzip']
+RESPONSE_COMPRESSION_MIN_SIZE = 1024  # bytes
+
+# Most (ticker, target_date) pairs accepted by one POST /api/predict/batch/ request
+PREDICTOR_STREAM_MAX_ITEMS = 1000
+
+# Micro-batching: concurrent cache misses are collected for up to
+# PREDICTOR_BATCH_MAX_WAIT_MS (or PREDICTOR_BATCH_MAX_SIZE jobs) and run as one forward pass
+PREDICTOR_BATCHING = True
+PREDICTOR_BATCH_MAX_SIZE = 16
+PREDICTOR_BATCH_MAX_WAIT_MS = 5
+
+# Local OHLCV price store (one memory-mapped .npy file per ticker)
+PRICE_STORE_DIR = os.path.join(BASE_DIR, 'data', 'prices')
+PRICE_STORE_REFRESH_INTERVAL = 60 * 60  # seconds between incremental refreshes
+
+# Stale bars are served at once while a background refresh runs. After
+# PRICE_UPSTREAM_FAILURE_THRESHOLD consecutive failed refreshes the circuit opens and
+# the upstream is not called for PRICE_UPSTREAM_RESET_TIMEOUT seconds
+PRICE_UPSTREAM_FAILURE_THRESHOLD = 3
+PRICE_UPSTREAM_RESET_TIMEOUT = 5 * 60
+
+# Who calls the price upstream (predictor.scheduler):
+#   'off'        - requests trigger the background refreshes above
+#   'in_process' - a thread of the web process refreshes once after every IDX close
+#                  (runserver or a single worker; not with gunicorn's preload_app)
+#   'sidecar'    - `python manage.py market_data_scheduler` runs as its own process
+# In both scheduled modes requests only read the price store
+PRICE_SCHEDULER = os.environ.get('PRICE_SCHEDULER', 'off')
+
+# The job runs IDX_REFRESH_DELAY_MINUTES after the 16:00 WIB close; tickers whose
+# bar is not published yet are retried every IDX_REFRESH_RETRY_MINUTES
+IDX_REFRESH_DELAY_MINUTES = 30
+IDX_REFRESH_RETRY_MINUTES = 15
+IDX_REFRESH_MAX_RETRIES = 4
+
+# Exchange closures ('YYYY-MM-DD') missing from predictor.trading_calendar.IDX_HOLIDAYS.
+# IDX_HOLIDAYS is maintained in that module and must be extended every year; a year
+# without holiday data logs a warning and counts every weekday as a trading day
+IDX_EXTRA_HOLIDAYS = []
+
+# Where bars come from: 'yahoo', 'simulator' (synthetic market in-process),
+# 'http' (simulator served by `python -m predictor.market_sim`) or 'sample'.
+# Each source keeps its own subdirectory of PRICE_STORE_DIR
+PRICE_DATA_SOURCE = os.environ.get('PRICE_DATA_SOURCE', 'yahoo')
+MARKET_SIM_URL = os.environ.get('MARKET_SIM_URL', 'http://127.0.0.1:8765')
+MARKET_SIM_SEED = 42
+
+# Precomputed forecasts (one .npz per ticker) for PREDICTOR_SERVING_MODE = 'precomputed'
+FORECAST_STORE_DIR = os.path.join(BASE_DIR, 'data', 'forecasts')
@@ -0,0 +1,186 @@
+"""
+End-to-end benchmark of the prediction pipeline with per-stage timings
+
+Every stage of TFTPredictor.predict is timed separately on offline data from the
+market simulator, plus the Bokeh plot and the full /api/predict/ round-trip.
+Results are written to benchmarks/<label>.json; pass --baseline to compare with
+an earlier run and fail on regressions.
+
+Usage:
+    python benchmark.py                                   # run and save as benchmarks/<git sha>.json
+    python benchmark.py --label v1.1.0                    # save under a release name
+    python benchmark.py --baseline benchmarks/v1.0.0.json # compare, exit 1 on regression
+
+Only release baselines (benchmarks/v*.json, saved with --label) are committed;
+.gitignore keeps the per-commit benchmarks/<git sha>.json runs out of git. Record
+a new baseline on the reference machine when tagging a release and commit it
+together with the tag.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbri_backend.settings')
+
+import django
+django.setup()
+
+import numpy as np
+import torch
+from django.test import Client
+from predictor import model as predictor_module
+from predictor.data_store import PriceStore
+from predictor.inputs import build_model_input
+from predictor.market_sim import MarketSimulator
+from predictor.views import PredictStockView, chart_cache
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks')
+
+
+def time_stage(fn, repeat, warmup=2):
+    """Run fn warmup + repeat times and return the timed runs in milliseconds"""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def summarize(timings):
+    timings = np.asarray(timings)
+    return {
+        'median_ms': float(np.median(timings)),
+        'p95_ms': float(np.percentile(timings, 95)),
+        'min_ms': float(timings.min()),
+        'runs': len(timings),
+    }
+
+
+def build_stages(predictor, ticker):
+    """Stage name -> zero-argument callable, in pipeline order"""
+    df = predictor.fetch_and_prepare_data(lookback_days=180, ticker=ticker)
+    raw = predictor.data_store.read(ticker)
+    last_date = df['date'].iloc[-1]
+    target_date = (last_date + timedelta(days=7)).to_pydatetime()
+    quantiles = predictor._run_inference(df)
+    result = predictor._build_result(ticker, df, last_date, target_date, 7, quantiles)
+
+    def indicators_full():
+        predictor.indicator_states.pop(ticker, None)
+        predictor._add_technical_indicators(raw.copy(), ticker)
+
+    client = Client()
+    body = {'target_date': target_date.strftime('%Y-%m-%d'), 'ticker': ticker}
+
+    def api_cold():
+        predictor.forecast_cache.clear()
+        chart_cache.clear()
+        client.post('/api/predict/', body, content_type='application/json')
+
+    return {
+        'fetch': lambda: predictor.data_store.read(ticker),
+        'indicators_full': indicators_full,
+        'indicators_incremental': lambda: predictor._add_technical_indicators(raw.copy(), ticker),
+        'prepare_features': lambda: predictor._prepare_features(raw.copy(), ticker),
+        'dataset_build': lambda: predictor._build_prediction_dataset(df),
+        'input_tensors': lambda: build_model_input(df, predictor.model_spec),
+        'forward_direct': lambda: predictor._run_inference_direct([df]),
+        'forward_dataset': lambda: predictor._run_inference_dataset(df),
+        'result_assembly': lambda: predictor._build_result(ticker, df, last_date, target_date, 7, quantiles),
+        'bokeh_plot': lambda: PredictStockView._create_bokeh_plot(result),
+        'api_predict_cold': api_cold,
+        'api_predict_warm': lambda: client.post('/api/predict/', body, content_type='application/json'),
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = 'unknown'
+    return {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'torch': torch.__version__,
+        'torch_threads': torch.get_num_threads(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """Print the change per stage; return the stages slower than baseline by more than threshold"""
+    regressions = []
+    print(f"\n{'Stage':<26}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name, stats in results['stages'].items():
+        if name not in baseline['stages']:
+            continue
+        before = baseline['stages'][name]['median_ms']
+        change = (stats['median_ms'] - before) / before
+        flag = "❌" if change > threshold else "✓"
+        print(f"{name:<26}{before:>10.2f}ms{stats['median_ms']:>10.2f}ms{change:>+9.0%} {flag}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the prediction pipeline stage by stage')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed runs per stage')
+    parser.add_argument('--ticker', default='BBRI.JK')
+    parser.add_argument('--label', help='Result file name (default: git commit)')
+    parser.add_argument('--baseline', help='Earlier result file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Allowed median slowdown (0.25 = 25%%)')
+    parser.add_argument('--stages', nargs='+', help='Only run these stages')
+    args = parser.parse_args()
+
+    print("\n⏱️ BBRI Stock Prediction - Pipeline Benchmark\n")
+
+    # Offline, reproducible data: the market simulator behind a throwaway price store
+    predictor = predictor_module.TFTPredictor(
+        data_store=PriceStore(tempfile.mkdtemp(), fetcher=MarketSimulator())
+    )
+    predictor.load_model()
+    predictor_module._predictor = predictor
+
+    stages = build_stages(predictor, args.ticker)
+    if args.stages:
+        stages = {name: fn for name, fn in stages.items() if name in args.stages}
+
+    results = {'environment': environment(), 'repeat': args.repeat, 'stages': {}}
+    print(f"\n{'Stage':<26}{'median':>12}{'p95':>12}{'min':>12}")
+    for name, fn in stages.items():
+        # The Lightning predict loop is much slower; fewer runs keep the suite short
+        repeat = max(args.repeat // 4, 3) if name in ('forward_dataset', 'api_predict_cold') else args.repeat
+        stats = summarize(time_stage(fn, repeat))
+        results['stages'][name] = stats
+        print(f"{name:<26}{stats['median_ms']:>10.2f}ms{stats['p95_ms']:>10.2f}ms{stats['min_ms']:>10.2f}ms")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{args.label or results['environment']['commit']}.json")
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results saved to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n❌ Slower than baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print("\n✓ No regressions")
@@ -0,0 +1,26 @@
+"""
+Gunicorn configuration: load the TFT once in the master and fork the workers from it
+
+    gunicorn bbri_backend.wsgi:application            # reads this file automatically
+    WEB_CONCURRENCY=8 gunicorn bbri_backend.wsgi:application
+
+The master imports Django, torch and pytorch-forecasting, loads the memory-mapped
+weights and runs the warm-up pass before forking. Workers share those pages
+copy-on-write, so each extra worker only adds its own request-time allocations.
+"""
+import os
+
+# Read by bbri_backend.settings, which is imported after this file
+os.environ.setdefault('WEB_CONCURRENCY', '4')
+os.environ['PREDICTOR_PRELOAD'] = '1'
+os.environ['PREDICTOR_SERVING'] = '1'
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+workers = int(os.environ['WEB_CONCURRENCY'])
+preload_app = True
+
+
+def post_fork(server, worker):
+    """Give each worker its share of the CPUs (the master ran single-threaded)"""
+    from predictor.threads import configure_worker_threads
+    configure_worker_threads()
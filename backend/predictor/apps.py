@@ -1,6 +1,62 @@
+import gc
+import os
+import sys
 from django.apps import AppConfig
+from django.conf import settings
+
+
+# manage.py commands that serve requests and should get a warm model
+SERVING_COMMANDS = {'runserver'}
 
 
 class PredictorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'predictor'
+
+    def ready(self):
+        # Export OMP/MKL thread counts before anything imports torch;
+        # get_predictor() sizes the torch thread pools
+        from .threads import configure_threads
+        configure_threads(apply_torch=False)
+
+        if settings.PREDICTOR_SERVING_MODE != 'live':
+            return
+        if not self._is_serving_process():
+            return
+
+        if settings.PREDICTOR_EAGER_LOAD:
+            from .model import get_predictor
+            try:
+                get_predictor().warm_up()
+            except Exception as e:
+                # Requests will retry the lazy load and report the error
+                print(f"⚠️ Model warm-up failed: {str(e)}")
+
+        if settings.PRICE_SCHEDULER == 'in_process':
+            if settings.PREDICTOR_PRELOAD:
+                # A thread started in the gunicorn master does not survive the fork
+                print("⚠️ PRICE_SCHEDULER='in_process' is not started with preload_app, use 'sidecar'")
+            else:
+                from .scheduler import start_scheduler
+                start_scheduler()
+
+        if settings.PREDICTOR_PRELOAD:
+            # Keep the garbage collector from writing to (and so copying) the
+            # master's objects in every forked worker
+            gc.freeze()
+
+    @staticmethod
+    def _is_serving_process():
+        """
+        True for WSGI/ASGI servers (PREDICTOR_SERVING) and the runserver child
+
+        Scripts, tests, notebooks, workers and other management commands that
+        only import Django neither warm the model nor start the scheduler.
+        """
+        if settings.PREDICTOR_SERVING:
+            return True
+        if os.path.basename(sys.argv[0]) != 'manage.py':
+            return False
+        if not sys.argv[1:2] or sys.argv[1] not in SERVING_COMMANDS:
+            return False
+        return os.environ.get('RUN_MAIN') == 'true' or '--noreload' in sys.argv
@@ -0,0 +1,215 @@
+"""
+Walk-forward backtest of the served TFT forecasts
+
+Every trading day in [start, end] is a forecast origin. Each origin gets the
+window the API would have read that day (TFTPredictor.history_start), prepared
+from scratch with TFTPredictor._prepare_features and _collate_inputs, i.e.
+what the API and the nightly precompute job produce. Windows are prepared in parallel
+worker processes and run through the model in large batches.
+
+Horizons are calendar days as in the API: quantile row h-1 is the forecast for
+origin + h days. Horizons that land on a non-trading day are not scored.
+"""
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+
+# Quantile levels of the QuantileLoss the TFT was trained with
+DEFAULT_QUANTILES = (0.02, 0.1, 0.25, 0.5, 0.75, 0.9, 0.98)
+
+# Row of the median and of the lower/upper bound returned by the API
+MEDIAN, LOWER, UPPER = 3, 1, 5
+
+# Inherited by forked workers: (predictor, {ticker: bars})
+_worker_state = None
+
+
+def _init_worker(state):
+    global _worker_state
+    _worker_state = state
+
+    # Window prep is NumPy/pandas; only a forked torch needs its pool shrunk
+    # (in onnx mode the parent never imported torch)
+    if 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(1)
+
+
+def _prepare_chunk(ticker, bounds):
+    """Collated model input for the windows bars[lo:hi] of one ticker"""
+    predictor, bars = _worker_state
+    frames = []
+    for lo, hi in bounds:
+        # From scratch, like a freshly started process; no indicator state between origins
+        predictor.indicator_states.pop(ticker, None)
+        frames.append(predictor._prepare_features(bars[ticker].iloc[lo:hi], ticker))
+    return predictor._collate_inputs(frames)
+
+
+def _pool_context():
+    """fork keeps the loaded predictor and Django settings without pickling them"""
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return None
+
+
+def origin_windows(dates, origins, lookback_days=180):
+    """
+    Row bounds [lo, hi) of the bars the API reads for a forecast at each origin
+
+    Args:
+        dates: Sorted bar dates (datetime64 array)
+        origins: Origin dates, each one a bar date
+        lookback_days: lookback_days passed to fetch_and_prepare_data
+
+    Returns:
+        Array of shape [len(origins), 2]
+    """
+    from .model import TFTPredictor
+
+    origins = pd.DatetimeIndex(origins)
+    starts = TFTPredictor.history_start(origins, lookback_days).normalize()
+    lo = np.searchsorted(dates, starts.to_numpy(dtype='datetime64[ns]'), side='left')
+    hi = np.searchsorted(dates, origins.to_numpy(dtype='datetime64[ns]'), side='right')
+    return np.stack([lo, hi], axis=1)
+
+
+def forecast_origins(predictor, bars, origins, batch_size=256, workers=None):
+    """
+    Quantile forecasts for every origin of every ticker
+
+    Args:
+        predictor: Loaded TFTPredictor
+        bars: Dictionary mapping ticker to its OHLCV DataFrame (sorted by date)
+        origins: Dictionary mapping ticker to the origin dates to forecast from
+        batch_size: Windows per forward pass
+        workers: Processes preparing windows (default: all CPUs, 0 = in-process)
+
+    Returns:
+        Dictionary mapping ticker to an array [len(origins), max_prediction_length, quantiles]
+    """
+    tasks = []
+    for ticker, ticker_origins in origins.items():
+        bounds = origin_windows(bars[ticker]['date'].to_numpy(), ticker_origins)
+        tasks += [(ticker, bounds[i:i + batch_size]) for i in range(0, len(bounds), batch_size)]
+
+    workers = os.cpu_count() if workers is None else workers
+    context = _pool_context()
+    forecasts = {ticker: [] for ticker in origins}
+
+    if workers and context is not None and len(tasks) > 1:
+        # Workers prepare the next batches while this process runs the model
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                 initargs=((predictor, bars),)) as executor:
+            inputs = executor.map(_prepare_chunk, *zip(*tasks))
+            for (ticker, _), x in zip(tasks, inputs):
+                forecasts[ticker].append(predictor._forward(x))
+    else:
+        global _worker_state
+        _worker_state = (predictor, bars)
+        for ticker, bounds in tasks:
+            forecasts[ticker].append(predictor._forward(_prepare_chunk(ticker, bounds)))
+
+    return {ticker: np.concatenate(chunks) for ticker, chunks in forecasts.items()}
+
+
+def _metrics(actual, quantiles):
+    """Point error of the median and interval/quantile calibration for scored forecasts"""
+    error = quantiles[:, MEDIAN] - actual
+    inside = (actual >= quantiles[:, LOWER]) & (actual <= quantiles[:, UPPER])
+    return {
+        'count': int(len(actual)),
+        'mae': float(np.abs(error).mean()),
+        'rmse': float(np.sqrt((error ** 2).mean())),
+        'mape': float((np.abs(error) / actual).mean() * 100),
+        'coverage': float(inside.mean()),
+        # Fraction of actuals at or below each quantile; calibrated forecasts match the levels
+        'quantile_hits': (actual[:, None] <= quantiles).mean(axis=0).round(4).tolist(),
+    }
+
+
+def score_forecasts(quantiles, origins, dates, close, quantile_levels=DEFAULT_QUANTILES):
+    """
+    Error and calibration of the forecasts per horizon
+
+    Args:
+        quantiles: Array [origins, horizons, quantiles] from forecast_origins
+        origins: Origin dates
+        dates: Bar dates of the ticker
+        close: Close prices of the ticker
+        quantile_levels: Quantile level of each forecast column
+
+    Returns:
+        Dictionary with 'horizons' (one entry per scored horizon) and 'overall'
+    """
+    horizons = np.arange(1, quantiles.shape[1] + 1)
+    targets = pd.DatetimeIndex(origins).normalize().to_numpy(dtype='datetime64[D]')[:, None] + horizons
+    actual = pd.Series(np.asarray(close, dtype=float), index=pd.DatetimeIndex(dates).normalize())
+    actual = actual.reindex(pd.DatetimeIndex(targets.ravel())).to_numpy().reshape(targets.shape)
+    scored = ~np.isnan(actual)
+
+    return {
+        'quantile_levels': list(quantile_levels),
+        'interval': [quantile_levels[LOWER], quantile_levels[UPPER]],
+        'horizons': [
+            dict(horizon=int(h), **_metrics(actual[scored[:, i], i], quantiles[scored[:, i], i]))
+            for i, h in enumerate(horizons) if scored[:, i].any()
+        ],
+        'overall': _metrics(actual[scored], quantiles[scored]),
+    }
+
+
+def run_backtest(predictor, tickers, start, end, batch_size=256, workers=None):
+    """
+    Walk-forward backtest from every trading day in [start, end]
+
+    Bars are downloaded once per ticker from the predictor's price fetcher, covering
+    the first window's history through the last forecast's horizon.
+
+    Returns:
+        Dictionary mapping ticker to its score_forecasts() report plus 'origins' and
+        'timing' (seconds per stage)
+    """
+    if predictor.model is None:
+        predictor.load_model()
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    quantile_levels = tuple(getattr(getattr(predictor.model, 'loss', None), 'quantiles', DEFAULT_QUANTILES))
+
+    timer = time.perf_counter()
+    bars, origins = {}, {}
+    for ticker in tickers:
+        df = predictor.data_store.fetcher.fetch(
+            ticker,
+            predictor.history_start(start).to_pydatetime(),
+            (end + timedelta(days=predictor.max_prediction_length + 1)).to_pydatetime(),
+        )
+        df = df.assign(date=pd.to_datetime(df['date'])).sort_values('date').reset_index(drop=True)
+        bars[ticker] = df
+        origins[ticker] = df.loc[(df['date'] >= start) & (df['date'] <= end), 'date'].to_numpy()
+        if len(origins[ticker]) == 0:
+            raise ValueError(f"No trading days for {ticker} between {start:%Y-%m-%d} and {end:%Y-%m-%d}")
+    fetch_time = time.perf_counter() - timer
+
+    timer = time.perf_counter()
+    forecasts = forecast_origins(predictor, bars, origins, batch_size, workers)
+    forecast_time = time.perf_counter() - timer
+
+    reports = {}
+    for ticker in tickers:
+        report = score_forecasts(
+            forecasts[ticker], origins[ticker], bars[ticker]['date'], bars[ticker]['close'], quantile_levels,
+        )
+        report['origins'] = {
+            'count': len(origins[ticker]),
+            'first': pd.Timestamp(origins[ticker][0]).strftime('%Y-%m-%d'),
+            'last': pd.Timestamp(origins[ticker][-1]).strftime('%Y-%m-%d'),
+        }
+        report['timing'] = {'fetch': fetch_time, 'forecast': forecast_time}
+        reports[ticker] = report
+    return reports
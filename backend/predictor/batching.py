@@ -0,0 +1,102 @@
+"""
+Micro-batching scheduler for TFT inference under concurrent load
+"""
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+
+
+class InferenceBatcher:
+    """
+    Collect inference jobs from concurrent callers and run them as one batch
+
+    A single worker thread takes the first queued job, then keeps collecting
+    jobs until max_batch_size items are gathered or max_wait_ms has passed,
+    runs run_batch once over all of them and hands each caller its own row.
+    """
+
+    def __init__(self, run_batch, max_batch_size=16, max_wait_ms=5):
+        self.run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._batch_sizes = Counter()
+        self.items = 0
+        self.failures = 0
+
+    def submit(self, df):
+        """
+        Queue one prepared DataFrame for inference
+
+        Returns:
+            concurrent.futures.Future resolving to its [max_prediction_length, quantiles] array
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((df, future))
+        return future
+
+    def run(self, dfs):
+        """Submit several DataFrames and block until all their forecasts are ready"""
+        futures = [self.submit(df) for df in dfs]
+        return [future.result() for future in futures]
+
+    def _ensure_worker(self):
+        # Threads do not survive fork, so a forked worker process starts its own
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._worker, name='tft-batcher', daemon=True)
+                self._thread.start()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._collect()
+            with self._stats_lock:
+                self._batch_sizes[len(batch)] += 1
+                self.items += len(batch)
+
+            try:
+                results = self.run_batch([df for df, _ in batch])
+            except Exception as e:
+                with self._stats_lock:
+                    self.failures += 1
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def stats(self):
+        """Return queue depth and batch-size metrics"""
+        with self._stats_lock:
+            batches = sum(self._batch_sizes.values())
+            return {
+                'queue_depth': self._queue.qsize(),
+                'batches': batches,
+                'items': self.items,
+                'failures': self.failures,
+                'mean_batch_size': self.items / batches if batches else 0.0,
+                'max_batch_size_seen': max(self._batch_sizes) if batches else 0,
+                'batch_size_counts': dict(sorted(self._batch_sizes.items())),
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000.0,
+            }
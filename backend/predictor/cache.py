@@ -0,0 +1,75 @@
+"""
+In-memory forecast cache for TFT predictions
+"""
+import threading
+import time
+from collections import OrderedDict
+
+
+class ForecastCache:
+    """
+    Bounded LRU cache with TTL eviction for full quantile forecasts
+
+    Entries are keyed on (ticker, last_data_date, weights_hash) so a forecast
+    is reused until a new trading day arrives or the model weights change.
+    """
+
+    def __init__(self, max_size=128, ttl=6 * 3600):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing/expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            stored_at, value = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store value under key, evicting the least recently used entry if full"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def discard(self, predicate):
+        """Drop the entries whose key matches predicate; returns how many were dropped"""
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self):
+        """Drop all cached entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Return cache size and hit/miss counters"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+            }
@@ -0,0 +1,66 @@
+"""
+Bounded executor with single-flight coalescing for blocking inference work
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+
+
+class SingleFlightExecutor:
+    """
+    Run blocking calls on a bounded thread pool, one in-flight call per key
+
+    Concurrent submissions with the same key share the first call's future, so
+    N identical requests cost one computation. Futures are concurrent.futures
+    objects: await them from async code with asyncio.wrap_future, or block on
+    future.result() from sync code.
+    """
+
+    def __init__(self, max_workers, thread_name_prefix='tft-inference'):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.coalesced = 0
+
+    def submit(self, key, fn, *args, **kwargs):
+        """Submit fn(*args, **kwargs) unless a call for key is already running"""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+
+            future = self._executor.submit(fn, *args, **kwargs)
+            self._inflight[key] = future
+            self.submitted += 1
+
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self):
+        """Return in-flight and coalescing counters"""
+        with self._lock:
+            return {
+                'in_flight': len(self._inflight),
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+            }
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_inference_executor():
+    """Get or create the process-wide inference executor"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = SingleFlightExecutor(max_workers=settings.PREDICTOR_EXECUTOR_WORKERS)
+        return _executor
@@ -0,0 +1,264 @@
+"""
+Local on-disk OHLCV store with incremental refresh from a pluggable fetcher
+"""
+import os
+import json
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta
+from urllib.parse import urlencode
+from urllib.request import urlopen
+
+
+PRICE_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+PRICE_DTYPE = np.dtype([('date', 'datetime64[D]')] + [(col, 'f8') for col in PRICE_COLUMNS])
+
+
+class YahooFinanceFetcher:
+    """Download daily OHLCV bars from Yahoo Finance"""
+
+    def __init__(self, timeout=30):
+        self.timeout = timeout
+
+    def fetch(self, ticker, start, end):
+        """
+        Download bars for ticker in [start, end)
+
+        Args:
+            ticker: Yahoo Finance ticker symbol (e.g. BBRI.JK)
+            start: First date to fetch (datetime)
+            end: Exclusive end date (datetime)
+
+        Returns:
+            DataFrame with columns date, open, high, low, close, volume (may be empty)
+        """
+        import yfinance as yf
+
+        df = yf.download(
+            ticker,
+            start=start.strftime('%Y-%m-%d'),
+            end=end.strftime('%Y-%m-%d'),
+            progress=False,
+            timeout=self.timeout
+        )
+
+        if df is None or df.empty:
+            return pd.DataFrame(columns=['date'] + PRICE_COLUMNS)
+
+        df.reset_index(inplace=True)
+
+        # Flatten MultiIndex columns if they exist
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = [col[1] if col[0] == 'Price' else col[0] for col in df.columns.values]
+
+        # Standardize column names
+        new_columns = []
+        for col in df.columns:
+            if col == 'Date':
+                new_columns.append('date')
+            else:
+                new_columns.append(col.lower().replace(' ', '_'))
+        df.columns = new_columns
+
+        missing_cols = [col for col in ['date'] + PRICE_COLUMNS if col not in df.columns]
+        if missing_cols:
+            raise ValueError(f"Missing required columns: {missing_cols}. Available columns: {list(df.columns)}")
+
+        return df[['date'] + PRICE_COLUMNS].copy()
+
+
+class SampleDataFetcher:
+    """
+    Offline stand-in fetcher serving the synthetic BBRI series from sample_data
+
+    The series is generated once over the fixed range [SERIES_START, SERIES_END],
+    so every [start, end) slice is cut from the same bars and a refresh appends
+    bars that continue the stored ones. Like a real source it publishes nothing
+    after yesterday.
+    """
+
+    SERIES_START = '2010-01-01'
+    SERIES_END = '2040-12-31'
+
+    _series = None
+
+    @classmethod
+    def series(cls):
+        if cls._series is None:
+            from .sample_data import create_sample_prices
+
+            days = int(np.busday_count(cls.SERIES_START, cls.SERIES_END)) + 1
+            df = create_sample_prices(days=days, end_date=cls.SERIES_END)
+            cls._series = df[['date'] + PRICE_COLUMNS]
+        return cls._series
+
+    def fetch(self, ticker, start, end):
+        df = self.series()
+        end = min(pd.Timestamp(end.date()), pd.Timestamp.now().normalize())
+        mask = (df['date'] >= pd.Timestamp(start.date())) & (df['date'] < end)
+        return df[mask].reset_index(drop=True)
+
+
+class HTTPMarketFetcher:
+    """Fetch bars from a market simulator served with `python -m predictor.market_sim`"""
+
+    def __init__(self, base_url, timeout=30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+
+    def fetch(self, ticker, start, end):
+        query = urlencode({'ticker': ticker, 'start': start.strftime('%Y-%m-%d'), 'end': end.strftime('%Y-%m-%d')})
+        with urlopen(f"{self.base_url}/bars?{query}", timeout=self.timeout) as response:
+            payload = json.load(response)
+
+        df = pd.DataFrame({column: payload[column] for column in ['date'] + PRICE_COLUMNS})
+        df['date'] = pd.to_datetime(df['date'])
+        return df
+
+
+def create_fetcher(source, simulator_url=None, seed=42):
+    """
+    Build the fetcher for a price data source
+
+    Args:
+        source: 'yahoo', 'simulator' (in-process MarketSimulator), 'http'
+            (MarketSimulator served at simulator_url) or 'sample'
+        simulator_url: Base URL for the 'http' source
+        seed: Seed for the in-process simulator
+    """
+    if source == 'yahoo':
+        return YahooFinanceFetcher()
+    if source == 'simulator':
+        from .market_sim import MarketSimulator
+        return MarketSimulator(seed=seed)
+    if source == 'http':
+        return HTTPMarketFetcher(simulator_url)
+    if source == 'sample':
+        return SampleDataFetcher()
+    raise ValueError(f"Unknown price data source: {source}")
+
+
+class PriceStore:
+    """
+    Per-ticker daily OHLCV history persisted as memory-mapped NumPy files
+
+    Each ticker lives in <root>/<ticker>.npy as a structured array sorted by date.
+    refresh() only requests bars newer than the last stored date from the fetcher;
+    reads never touch the network.
+    """
+
+    def __init__(self, root, fetcher=None, history_days=3 * 365):
+        self.root = str(root)
+        self.fetcher = fetcher if fetcher is not None else YahooFinanceFetcher()
+        self.history_days = history_days
+        os.makedirs(self.root, exist_ok=True)
+
+    def path(self, ticker):
+        return os.path.join(self.root, f"{ticker}.npy")
+
+    def _load_array(self, ticker):
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            return np.empty(0, dtype=PRICE_DTYPE)
+        return np.load(path, mmap_mode='r')
+
+    def last_date(self, ticker):
+        """Return the last stored bar date as a datetime, or None if the store is empty"""
+        bars = self._load_array(ticker)
+        if len(bars) == 0:
+            return None
+        return pd.Timestamp(bars['date'][-1]).to_pydatetime()
+
+    def refreshed_at(self, ticker):
+        """Unix time of the last successful refresh (file mtime), or None if never refreshed"""
+        path = self.path(ticker)
+        if not os.path.exists(path):
+            return None
+        return os.path.getmtime(path)
+
+    def is_stale(self, ticker, max_age):
+        """True if the ticker has never been refreshed or was refreshed more than max_age seconds ago"""
+        refreshed = self.refreshed_at(ticker)
+        return refreshed is None or time.time() - refreshed > max_age
+
+    def refresh(self, ticker, end=None):
+        """
+        Append bars newer than the last stored date
+
+        Args:
+            ticker: Ticker symbol
+            end: Exclusive end date (defaults to today)
+
+        Returns:
+            Number of bars appended
+        """
+        end = end or datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        last = self.last_date(ticker)
+        start = last + timedelta(days=1) if last is not None else end - timedelta(days=self.history_days)
+
+        if start >= end:
+            self._touch(ticker)
+            return 0
+
+        new_bars = self._to_array(self.fetcher.fetch(ticker, start, end))
+        if last is not None:
+            new_bars = new_bars[new_bars['date'] > np.datetime64(last.date())]
+
+        if len(new_bars) == 0:
+            self._touch(ticker)
+            return 0
+
+        bars = np.concatenate([np.asarray(self._load_array(ticker)), new_bars])
+        self._write(ticker, bars)
+        return len(new_bars)
+
+    def read(self, ticker, start=None):
+        """
+        Read stored bars for ticker as a DataFrame
+
+        Args:
+            ticker: Ticker symbol
+            start: Optional first date to include
+
+        Returns:
+            DataFrame with columns date, open, high, low, close, volume
+        """
+        bars = self._load_array(ticker)
+        if start is not None and len(bars):
+            first = np.searchsorted(bars['date'], np.datetime64(start.date()), side='left')
+            bars = bars[first:]
+
+        df = pd.DataFrame({col: np.array(bars[col]) for col in PRICE_COLUMNS})
+        df.insert(0, 'date', pd.to_datetime(np.array(bars['date'])))
+        return df
+
+    def _to_array(self, df):
+        df = df.dropna(subset=PRICE_COLUMNS)
+        dates = pd.to_datetime(df['date'])
+        if getattr(dates.dt, 'tz', None) is not None:
+            dates = dates.dt.tz_localize(None)
+
+        bars = np.empty(len(df), dtype=PRICE_DTYPE)
+        bars['date'] = dates.values.astype('datetime64[D]')
+        for col in PRICE_COLUMNS:
+            bars[col] = df[col].to_numpy(dtype='f8')
+        return np.sort(bars, order='date')
+
+    def _write(self, ticker, bars):
+        # Write to a temp file and swap it in so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.npy.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.save(f, bars)
+            os.replace(tmp_path, self.path(ticker))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _touch(self, ticker):
+        if os.path.exists(self.path(ticker)):
+            os.utime(self.path(ticker))
@@ -0,0 +1,172 @@
+"""
+Precomputed forecast store and the read-only predictor that serves from it
+
+The nightly `precompute_forecasts` command writes one compact .npz file per
+ticker (quantile forecast plus the recent close history). In
+PREDICTOR_SERVING_MODE = 'precomputed' the API answers from these files only,
+so the web tier never imports torch.
+"""
+import os
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from django.conf import settings
+from .revalidate import DataUnavailableError
+from .results import HISTORY_DAYS, build_prediction_result, check_horizon, parse_target_date
+
+
+class ForecastStore:
+    """One .npz file per ticker holding a full quantile forecast and its history"""
+
+    def __init__(self, root):
+        self.root = root
+        self._loaded = {}
+        self._lock = threading.Lock()
+
+    def path(self, ticker):
+        return os.path.join(self.root, f"{ticker.replace('/', '_')}.npz")
+
+    def save(self, ticker, forecast, weights_hash):
+        """
+        Persist a forecast() tuple for ticker
+
+        Args:
+            ticker: Ticker symbol
+            forecast: Tuple of (prepared DataFrame, last data date, quantiles array)
+            weights_hash: Hash of the model weights that produced the forecast
+        """
+        df, last_date, quantiles = forecast
+        history = df.tail(HISTORY_DAYS)
+        os.makedirs(self.root, exist_ok=True)
+
+        # Write to a temp file and swap it in so serving processes never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.npz.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez(
+                    f,
+                    quantiles=np.asarray(quantiles, dtype=np.float32),
+                    history_date=history['date'].to_numpy().astype('datetime64[D]'),
+                    history_close=history['close'].to_numpy(dtype=np.float64),
+                    last_date=np.datetime64(last_date, 'D'),
+                    weights_hash=np.str_(weights_hash or ''),
+                    generated_at=np.datetime64(datetime.now(), 's'),
+                )
+            os.chmod(tmp_path, 0o644)  # readable by the web tier's user
+            os.replace(tmp_path, self.path(ticker))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load(self, ticker):
+        """
+        Return the stored forecast for ticker, or None if nothing is stored
+
+        Files are parsed once and kept in memory until their mtime changes.
+
+        Returns:
+            Dictionary with history (DataFrame), last_date, quantiles, weights_hash, generated_at
+        """
+        try:
+            mtime = os.stat(self.path(ticker)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+        with self._lock:
+            cached = self._loaded.get(ticker)
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+
+        with np.load(self.path(ticker), allow_pickle=False) as data:
+            quantiles = data['quantiles']
+            quantiles.setflags(write=False)
+            record = {
+                'history': pd.DataFrame({
+                    'date': pd.to_datetime(data['history_date']),
+                    'close': data['history_close'],
+                }),
+                'last_date': pd.Timestamp(data['last_date'].item()),
+                'quantiles': quantiles,
+                'weights_hash': str(data['weights_hash'].item()),
+                'generated_at': pd.Timestamp(data['generated_at'].item()),
+            }
+
+        with self._lock:
+            self._loaded[ticker] = (mtime, record)
+        return record
+
+    def describe(self, tickers):
+        """Summary of stored forecasts for the health endpoint"""
+        summary = {}
+        for ticker in tickers:
+            record = self.load(ticker)
+            summary[ticker] = None if record is None else {
+                'last_data_date': record['last_date'].strftime('%Y-%m-%d'),
+                'generated_at': record['generated_at'].isoformat(),
+                'weights_hash': record['weights_hash'],
+            }
+        return summary
+
+
+class PrecomputedPredictor:
+    """
+    Read-only stand-in for TFTPredictor backed by a ForecastStore
+
+    Implements the same predict / predict_many / forecast / predict_from_forecast
+    interface, so the views work unchanged in either serving mode.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.ticker = settings.PREDICTOR_TICKERS[0]
+
+    def data_date(self, ticker=None):
+        record = self.store.load(ticker or self.ticker)
+        return None if record is None else record['last_date']
+
+    def forecast(self, ticker=None):
+        """
+        Return the stored (history DataFrame, last data date, quantiles) for ticker
+        
+        Raises:
+            DataUnavailableError: The nightly job has not written a forecast for ticker (503)
+        """
+        ticker = ticker or self.ticker
+        record = self.store.load(ticker)
+        if record is None:
+            raise DataUnavailableError(f"No precomputed forecast for {ticker}. Run: python manage.py precompute_forecasts")
+        return record['history'], record['last_date'], record['quantiles']
+
+    def predict_from_forecast(self, target_date, ticker, forecast):
+        """Build the prediction result for target_date from a forecast() tuple"""
+        target_date = parse_target_date(target_date)
+        df, last_date, quantiles = forecast
+        prediction_horizon = check_horizon(target_date, last_date, len(quantiles))
+        return build_prediction_result(ticker, df, last_date, target_date, prediction_horizon, quantiles)
+
+    def predict(self, target_date, ticker=None):
+        ticker = ticker or self.ticker
+        return self.predict_from_forecast(target_date, ticker, self.forecast(ticker))
+
+    def predict_many(self, target_date, tickers):
+        results = {}
+        for ticker in tickers:
+            try:
+                results[ticker] = self.predict(target_date, ticker)
+            except (ValueError, DataUnavailableError) as e:
+                results[ticker] = {'success': False, 'ticker': ticker, 'error': str(e)}
+        return results
+
+
+_forecast_predictor = None
+
+
+def get_forecast_predictor():
+    """Get or create the global read-only predictor"""
+    global _forecast_predictor
+    if _forecast_predictor is None:
+        _forecast_predictor = PrecomputedPredictor(ForecastStore(settings.FORECAST_STORE_DIR))
+    return _forecast_predictor
@@ -0,0 +1,217 @@
+"""
+Incremental technical-indicator engine (MA, RSI, MACD, Bollinger Bands)
+
+compute() processes a full close series in vectorized form, update() folds in
+one new bar in O(1) using running state (EMA values, Wilder averages, rolling
+sums and sums of squares). Both reproduce the `ta` library definitions used in
+training: RSIIndicator(window=14), MACD(12, 26, 9) and
+BollingerBands(window=20, window_dev=2) with fillna=False.
+"""
+from collections import deque
+import numpy as np
+import pandas as pd
+
+
+# Indicators used as TFT inputs
+INDICATOR_COLUMNS = [
+    'ma_7', 'ma_30', 'rsi', 'macd', 'macd_signal',
+    'bb_upper', 'bb_middle', 'bb_lower',
+]
+
+# Extra indicators used by the model-comparison notebook
+EXTENDED_INDICATOR_COLUMNS = INDICATOR_COLUMNS + ['macd_diff', 'bb_width']
+
+
+class _EMA:
+    """Recursive exponential average (pandas ewm with adjust=False)"""
+
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = np.nan
+        self.count = 0
+
+    def update(self, x):
+        self.value = x if self.count == 0 else self.alpha * x + (1 - self.alpha) * self.value
+        self.count += 1
+        return self.value if self.count >= self.min_periods else np.nan
+
+    def compute(self, values):
+        """Vectorized pass over values; leaves the state at the last element"""
+        series = pd.Series(values, dtype='float64')
+        ema = series.ewm(alpha=self.alpha, adjust=False).mean().to_numpy()
+        self.count = int(series.notna().sum())
+        self.value = ema[-1] if self.count else np.nan
+        valid = series.notna().cumsum().to_numpy() >= self.min_periods
+        return np.where(valid, ema, np.nan)
+
+
+class IndicatorEngine:
+    """
+    Stateful indicator calculator for a single close-price series
+
+    Usage:
+        engine = IndicatorEngine()
+        frame = engine.compute(df['close'])   # full history, vectorized
+        row = engine.update(new_close)        # each new bar, O(1)
+    """
+
+    def __init__(self, ma_windows=(7, 30), rsi_window=14, macd_windows=(12, 26, 9),
+                 bb_window=20, bb_dev=2):
+        self.ma_windows = tuple(ma_windows)
+        self.rsi_window = rsi_window
+        self.macd_fast, self.macd_slow, self.macd_sign = macd_windows
+        self.bb_window = bb_window
+        self.bb_dev = bb_dev
+        self._rolling_windows = sorted(set(self.ma_windows) | {bb_window})
+        self.reset()
+
+    def reset(self):
+        """Clear all running state"""
+        self.count = 0
+        self.last_close = None
+        self._buffer = deque(maxlen=max(self._rolling_windows) + 1)
+        self._sums = {window: 0.0 for window in self._rolling_windows}
+        self._sumsq = 0.0
+        self._ema_fast = _EMA(2.0 / (self.macd_fast + 1), self.macd_fast)
+        self._ema_slow = _EMA(2.0 / (self.macd_slow + 1), self.macd_slow)
+        self._ema_sign = _EMA(2.0 / (self.macd_sign + 1), self.macd_sign)
+        self._avg_up = _EMA(1.0 / self.rsi_window, self.rsi_window)
+        self._avg_down = _EMA(1.0 / self.rsi_window, self.rsi_window)
+
+    def warmup_periods(self):
+        """Number of leading rows each indicator leaves NaN when computed from scratch"""
+        periods = {f'ma_{window}': window - 1 for window in self.ma_windows}
+        periods['rsi'] = self.rsi_window - 1
+        periods['macd'] = self.macd_slow - 1
+        periods['macd_signal'] = periods['macd_diff'] = self.macd_slow + self.macd_sign - 2
+        for column in ('bb_upper', 'bb_middle', 'bb_lower', 'bb_width'):
+            periods[column] = self.bb_window - 1
+        return periods
+
+    def compute(self, close):
+        """
+        Compute indicators over a full close series and keep the end state
+
+        Args:
+            close: Sequence of close prices in chronological order
+
+        Returns:
+            DataFrame with EXTENDED_INDICATOR_COLUMNS, aligned with close
+        """
+        self.reset()
+        close = np.asarray(close, dtype=np.float64)
+        series = pd.Series(close)
+
+        columns = {}
+        for window in self.ma_windows:
+            columns[f'ma_{window}'] = series.rolling(window).mean().to_numpy()
+
+        diff = np.diff(close, prepend=np.nan)
+        avg_up = self._avg_up.compute(np.where(diff > 0, diff, 0.0))
+        avg_down = self._avg_down.compute(np.where(diff < 0, -diff, 0.0))
+        columns['rsi'] = self._rsi(avg_up, avg_down)
+
+        macd = self._ema_fast.compute(close) - self._ema_slow.compute(close)
+        signal = self._ema_sign.compute(macd)
+        columns['macd'] = macd
+        columns['macd_signal'] = signal
+        columns['macd_diff'] = macd - signal
+
+        mavg = series.rolling(self.bb_window).mean().to_numpy()
+        mstd = series.rolling(self.bb_window).std(ddof=0).to_numpy()
+        columns.update(self._bollinger(mavg, mstd))
+
+        # Running state for subsequent update() calls
+        self.count = len(close)
+        self.last_close = close[-1] if len(close) else None
+        self._buffer.extend(close[-self._buffer.maxlen:])
+        tail = np.asarray(self._buffer)
+        for window in self._rolling_windows:
+            self._sums[window] = tail[-window:].sum()
+        self._sumsq = np.square(tail[-self.bb_window:]).sum()
+
+        return pd.DataFrame(columns)
+
+    def update(self, close):
+        """
+        Fold one new close price into the running state
+
+        Args:
+            close: Close price of the new bar
+
+        Returns:
+            Dictionary with EXTENDED_INDICATOR_COLUMNS for the new bar
+        """
+        close = float(close)
+        self._buffer.append(close)
+        self.count += 1
+
+        rolling = {}
+        for window in self._rolling_windows:
+            self._sums[window] += close
+            if len(self._buffer) > window:
+                self._sums[window] -= self._buffer[-window - 1]
+            rolling[window] = self._sums[window] / window if self.count >= window else np.nan
+
+        self._sumsq += close * close
+        if len(self._buffer) > self.bb_window:
+            self._sumsq -= self._buffer[-self.bb_window - 1] ** 2
+
+        row = {f'ma_{window}': rolling[window] for window in self.ma_windows}
+
+        diff = close - self.last_close if self.last_close is not None else 0.0
+        self.last_close = close
+        avg_up = self._avg_up.update(max(diff, 0.0))
+        avg_down = self._avg_down.update(max(-diff, 0.0))
+        row['rsi'] = float(self._rsi(np.array(avg_up), np.array(avg_down)))
+
+        fast = self._ema_fast.update(close)
+        slow = self._ema_slow.update(close)
+        macd = fast - slow
+        signal = self._ema_sign.update(macd) if not np.isnan(macd) else np.nan
+        row['macd'] = macd
+        row['macd_signal'] = signal
+        row['macd_diff'] = macd - signal
+
+        mavg = rolling[self.bb_window]
+        mstd = np.sqrt(max(self._sumsq / self.bb_window - mavg * mavg, 0.0)) if not np.isnan(mavg) else np.nan
+        row.update({key: float(value) for key, value in self._bollinger(mavg, mstd).items()})
+
+        return row
+
+    def append(self, closes):
+        """Fold several new close prices in order; returns a DataFrame of their indicators"""
+        return pd.DataFrame([self.update(close) for close in closes], columns=EXTENDED_INDICATOR_COLUMNS)
+
+    @staticmethod
+    def _rsi(avg_up, avg_down):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(avg_down == 0, 100.0, 100.0 - 100.0 / (1.0 + avg_up / avg_down))
+
+    def _bollinger(self, mavg, mstd):
+        upper = mavg + self.bb_dev * mstd
+        lower = mavg - self.bb_dev * mstd
+        return {
+            'bb_upper': upper,
+            'bb_middle': mavg,
+            'bb_lower': lower,
+            'bb_width': (upper - lower) / mavg * 100,
+        }
+
+
+def add_technical_indicators(df, columns=INDICATOR_COLUMNS):
+    """
+    Add indicator columns computed from df['close'] to df
+
+    Args:
+        df: DataFrame with a 'close' column
+        columns: Indicator columns to add
+
+    Returns:
+        The same DataFrame with the indicator columns set
+    """
+    frame = IndicatorEngine().compute(df['close'].to_numpy())
+    for column in columns:
+        df[column] = frame[column].to_numpy()
+    return df
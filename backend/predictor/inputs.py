@@ -0,0 +1,200 @@
+"""
+Direct construction of TFT input tensors from a prepared DataFrame
+
+Mirrors what TimeSeriesDataSet produces for the predict-mode window used by
+TFTPredictor (last encoder window + max_prediction_length future steps), so
+inference can call model.forward without building a dataset or DataLoader.
+The inputs are built as NumPy arrays (fed to onnxruntime as they are) and only
+wrapped in tensors for torch, which is imported on first use.
+"""
+import numpy as np
+
+
+def softplus_inv(y):
+    """NumPy version of pytorch_forecasting's inverse softplus transformation"""
+    eps = np.finfo(y.dtype).eps
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(y > 20.0, y, y + np.log(-np.expm1(-(y + eps))))
+
+
+TARGET_TRANSFORMS = {
+    None: lambda y: y,
+    'softplus': softplus_inv,
+    'log': np.log,
+    'log1p': np.log1p,
+}
+
+
+def fit_target_scale(target, transformation):
+    """
+    Return (center, scale) as fitted by GroupNormalizer(method='standard') on one group
+
+    Args:
+        target: 1D float64 array of observed target values
+        transformation: Name of the normalizer transformation
+
+    Returns:
+        Tuple of center and scale
+    """
+    y = TARGET_TRANSFORMS[transformation](target)
+    eps = np.finfo(np.float16).eps
+    return y.mean(), y.std(ddof=1) + eps
+
+
+def encode_label(labels, value):
+    """
+    Encode a categorical value with the labels the model was trained on
+
+    A single-series model has one label; other tickers are mapped onto it since
+    their scale is carried by the per-request target normalization.
+    """
+    value = str(value)
+    if value in labels:
+        return labels[value]
+    if len(labels) == 1:
+        return next(iter(labels.values()))
+    raise ValueError(f"Unknown category '{value}'. Known values: {', '.join(labels)}")
+
+
+def build_model_arrays(df, model_spec):
+    """
+    Build the model input dictionary for the last window of df as NumPy arrays
+
+    Args:
+        df: Prepared DataFrame from TFTPredictor.fetch_and_prepare_data
+        model_spec: Spec loaded from best_tft_model.spec.json
+
+    Returns:
+        Dictionary of arrays with batch size 1 (see build_model_input)
+    """
+    dataset = model_spec['dataset']
+    x_reals = model_spec['model']['x_reals']
+    x_categoricals = model_spec['model']['x_categoricals']
+    target_name = dataset['target']
+    max_encoder_length = dataset['max_encoder_length']
+    decoder_length = dataset['max_prediction_length']
+    transformation = dataset['target_normalizer'].get('transformation')
+    embedding_labels = model_spec['model']['embedding_labels']
+
+    encoder_length = min(max_encoder_length, len(df))
+    window = encoder_length + decoder_length
+
+    target = df[target_name].to_numpy(dtype=np.float64)
+    center, scale = fit_target_scale(target, transformation)
+
+    # Future rows repeat the last observation; only known reals are read by the decoder
+    rows = np.concatenate([
+        np.arange(len(df) - encoder_length, len(df)),
+        np.full(decoder_length, len(df) - 1),
+    ])
+    time_idx = df[dataset['time_idx']].to_numpy(dtype=np.float64)
+    window_time_idx = np.concatenate([
+        time_idx[-encoder_length:],
+        time_idx[-1] + 1 + np.arange(decoder_length),
+    ])
+
+    cont = np.empty((window, len(x_reals)), dtype=np.float64)
+    for pos, name in enumerate(x_reals):
+        if name == 'encoder_length':
+            cont[:, pos] = (encoder_length - 0.5 * max_encoder_length) / max_encoder_length * 2.0
+        elif name == 'relative_time_idx':
+            cont[:, pos] = np.arange(-encoder_length, decoder_length) / max_encoder_length
+        elif name in (f"{target_name}_center", f"{target_name}_scale"):
+            # StandardScaler over a constant column
+            cont[:, pos] = 0.0
+        elif name == target_name:
+            cont[:, pos] = (TARGET_TRANSFORMS[transformation](target[rows]) - center) / scale
+        else:
+            values = time_idx if name == dataset['time_idx'] else df[name].to_numpy(dtype=np.float64)
+            std = values.std()
+            window_values = window_time_idx if name == dataset['time_idx'] else values[rows]
+            cont[:, pos] = (window_values - values.mean()) / (std if std > 0 else 1.0)
+
+    cat = np.empty((window, len(x_categoricals)), dtype=np.int64)
+    for pos, name in enumerate(x_categoricals):
+        cat[:, pos] = encode_label(embedding_labels[name], df[name].iloc[-1])
+    groups = [encode_label(embedding_labels[name], df[name].iloc[-1]) for name in dataset['group_ids']]
+
+    cont = cont.astype(np.float32)[np.newaxis]
+    cat = cat[np.newaxis]
+    window_target = target[rows].astype(np.float32)[np.newaxis]
+
+    return {
+        'encoder_cat': cat[:, :encoder_length],
+        'encoder_cont': cont[:, :encoder_length],
+        'encoder_target': window_target[:, :encoder_length],
+        'encoder_lengths': np.array([encoder_length], dtype=np.int64),
+        'decoder_cat': cat[:, encoder_length:],
+        'decoder_cont': cont[:, encoder_length:],
+        'decoder_target': window_target[:, encoder_length:],
+        'decoder_lengths': np.array([decoder_length], dtype=np.int64),
+        'decoder_time_idx': window_time_idx[encoder_length:].astype(np.int64)[np.newaxis],
+        'groups': np.array([groups], dtype=np.int64),
+        'target_scale': np.array([[center, scale]], dtype=np.float32),
+    }
+
+
+def build_model_input(df, model_spec):
+    """
+    Build the model input dictionary for the last window of df
+
+    Args:
+        df: Prepared DataFrame from TFTPredictor.fetch_and_prepare_data
+        model_spec: Spec loaded from best_tft_model.spec.json
+
+    Returns:
+        Dictionary of tensors with batch size 1, accepted by TemporalFusionTransformer.forward
+    """
+    import torch
+    return {key: torch.from_numpy(value) for key, value in build_model_arrays(df, model_spec).items()}
+
+
+SEQUENCE_KEYS = (
+    'encoder_cat', 'encoder_cont', 'encoder_target',
+    'decoder_cat', 'decoder_cont', 'decoder_target', 'decoder_time_idx',
+)
+
+
+def collate_model_arrays(inputs):
+    """
+    Stack single-series inputs from build_model_arrays into one batch
+
+    Sequences are right-padded with zeros to the longest encoder/decoder like the
+    pytorch-forecasting collate function; lengths keep the true sizes.
+    """
+    if len(inputs) == 1:
+        return inputs[0]
+
+    batch = {}
+    for key in inputs[0]:
+        if key in SEQUENCE_KEYS:
+            length = max(x[key].shape[1] for x in inputs)
+            batch[key] = np.concatenate([
+                np.pad(x[key], [(0, 0), (0, length - x[key].shape[1])] + [(0, 0)] * (x[key].ndim - 2))
+                for x in inputs
+            ])
+        else:
+            batch[key] = np.concatenate([x[key] for x in inputs])
+    return batch
+
+
+def collate_model_inputs(inputs):
+    """
+    Stack single-series inputs from build_model_input into one batch
+
+    Sequences are right-padded to the longest encoder/decoder like the
+    pytorch-forecasting collate function; lengths keep the true sizes.
+    """
+    if len(inputs) == 1:
+        return inputs[0]
+
+    import torch
+    from torch.nn.utils.rnn import pad_sequence
+
+    batch = {}
+    for key in inputs[0]:
+        if key in SEQUENCE_KEYS:
+            batch[key] = pad_sequence([x[key][0] for x in inputs], batch_first=True)
+        else:
+            batch[key] = torch.cat([x[key] for x in inputs])
+    return batch
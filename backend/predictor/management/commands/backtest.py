@@ -0,0 +1,81 @@
+"""
+Walk-forward backtest of the served TFT: one forecast per trading day, scored per horizon
+"""
+import json
+import time
+from datetime import datetime, timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from predictor.backtest import run_backtest
+from predictor.model import TFTPredictor
+
+
+class Command(BaseCommand):
+    help = 'Forecast from every trading day in a date range and report MAE/RMSE/MAPE and quantile coverage per horizon'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tickers', nargs='+', default=settings.PREDICTOR_TICKERS,
+            help='Tickers to backtest (default: PREDICTOR_TICKERS)',
+        )
+        parser.add_argument(
+            '--start', default=(datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d'),
+            help='First forecast origin, YYYY-MM-DD (default: one year ago)',
+        )
+        parser.add_argument(
+            '--end', default=datetime.now().strftime('%Y-%m-%d'),
+            help='Last forecast origin, YYYY-MM-DD (default: today)',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=256,
+            help='Forecast windows per forward pass (default: 256)',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Processes preparing windows (default: all CPUs, 0 = in-process)',
+        )
+        parser.add_argument(
+            '--output', default=None,
+            help='Also write the full report as JSON to this file',
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        tickers = options['tickers']
+        if not tickers:
+            raise CommandError('No tickers to backtest')
+
+        predictor = TFTPredictor()
+        predictor.load_model()
+
+        try:
+            reports = run_backtest(
+                predictor, tickers, options['start'], options['end'],
+                batch_size=options['batch_size'], workers=options['workers'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for ticker, report in reports.items():
+            lower, upper = report['interval']
+            origins = report['origins']
+            self.stdout.write(
+                f"\n📈 {ticker}: {origins['count']} origins {origins['first']} → {origins['last']} "
+                f"(forecast in {report['timing']['forecast']:.1f}s)"
+            )
+            self.stdout.write(f"{'Horizon':>7} {'N':>6} {'MAE':>10} {'RMSE':>10} {'MAPE %':>8} {f'P{lower * 100:g}-P{upper * 100:g}':>10}")
+            for row in report['horizons'] + [dict(report['overall'], horizon='all')]:
+                self.stdout.write(
+                    f"{row['horizon']:>7} {row['count']:>6} {row['mae']:>10.2f} {row['rmse']:>10.2f} "
+                    f"{row['mape']:>8.2f} {row['coverage']:>10.1%}"
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(reports, f, indent=2)
+            self.stdout.write(f"\n✓ Report written to {options['output']}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Backtested {len(reports)} tickers in {time.perf_counter() - start:.1f}s"
+        ))
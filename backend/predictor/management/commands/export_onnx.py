@@ -0,0 +1,55 @@
+"""
+Export the TFT to ONNX for PREDICTOR_INFERENCE_MODE = 'onnx'
+"""
+import os
+import time
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from predictor.inputs import build_model_input, collate_model_inputs
+from predictor.model import TFTPredictor
+from predictor.optimize import OnnxForward, export_onnx
+from predictor.sample_data import create_sample_bbri_data
+
+
+class Command(BaseCommand):
+    help = 'Export best_tft_model.pth to ONNX (encoder 60, horizon 30) and check it against torch'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output', default=settings.MODEL_ONNX_PATH,
+            help='ONNX file to write (default: MODEL_ONNX_PATH)',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=0.01,
+            help='Largest allowed difference from the torch quantiles in IDR (default: 0.01)',
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        path = options['output']
+
+        predictor = TFTPredictor()
+        predictor.inference_mode = 'eager'
+        predictor.load_model()
+
+        df = create_sample_bbri_data(days=2 * predictor.max_encoder_length)
+        example = build_model_input(df, predictor.model_spec)
+        export_onnx(predictor.model, example, path, weights_hash=predictor.weights_hash)
+        self.stdout.write(f"✓ Exported to {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+
+        # Parity on a batch of windows ending on different days
+        frames = [df.iloc[:len(df) - offset] for offset in range(0, 40, 5)]
+        x = collate_model_inputs([build_model_input(frame, predictor.model_spec) for frame in frames])
+        expected = predictor._forward(x)
+        actual = OnnxForward(path)(x)
+        diff = float(np.abs(actual - expected).max())
+        if diff > options['tolerance']:
+            os.remove(path)
+            raise CommandError(f"ONNX output differs from torch by {diff:.6f} IDR, export removed")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ onnxruntime matches torch within {diff:.6f} IDR on {len(frames)} windows "
+            f"({time.perf_counter() - start:.1f}s)"
+        ))
@@ -0,0 +1,53 @@
+"""
+Sidecar market-data job: refresh prices after every IDX close (PRICE_SCHEDULER = 'sidecar')
+"""
+from argparse import BooleanOptionalAction
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from predictor.forecast_store import ForecastStore
+from predictor.model import TFTPredictor
+from predictor.scheduler import create_scheduler
+
+
+class Command(BaseCommand):
+    help = 'Refresh price data for all configured tickers after every IDX session close'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Run the job for the latest close and exit (for cron)',
+        )
+        parser.add_argument(
+            '--forecasts', action=BooleanOptionalAction,
+            default=settings.PREDICTOR_SERVING_MODE == 'precomputed',
+            help='Also run the forecasts and write FORECAST_STORE_DIR (default: on in precomputed serving mode)',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.PREDICTOR_TICKERS:
+            raise CommandError('No tickers configured (PREDICTOR_TICKERS)')
+
+        # Forecasts warmed here would only fill this process's cache; the web
+        # processes pick up the new bars from the shared price store
+        forecast_store = ForecastStore(settings.FORECAST_STORE_DIR) if options['forecasts'] else None
+        scheduler = create_scheduler(TFTPredictor(), warm=forecast_store is not None, forecast_store=forecast_store)
+
+        if options['once']:
+            report = scheduler.run_once()
+            failed = {ticker: outcome for ticker, outcome in report.items() if outcome['error']}
+            for ticker, outcome in report.items():
+                self.stdout.write(
+                    f"{ticker}: {outcome['appended']} new bars, last bar {outcome['last_date'] or '-'}"
+                    + (f" ({outcome['error']})" if outcome['error'] else '')
+                )
+            if len(failed) == len(report):
+                raise CommandError('Market data refresh failed for every ticker')
+            return
+
+        self.stdout.write(f"✓ Market data scheduler started for {', '.join(settings.PREDICTOR_TICKERS)}")
+        try:
+            scheduler.serve_forever()
+        except KeyboardInterrupt:
+            scheduler.stop()
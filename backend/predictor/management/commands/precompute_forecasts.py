@@ -0,0 +1,72 @@
+"""
+Nightly job: refresh prices after IDX close and persist every ticker's forecast
+"""
+import time
+import pandas as pd
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from predictor.forecast_store import ForecastStore
+from predictor.model import TFTPredictor
+from predictor.trading_calendar import get_calendar
+
+
+class Command(BaseCommand):
+    help = 'Refresh price data, run the TFT for all configured tickers and write the forecast store'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tickers', nargs='+', default=settings.PREDICTOR_TICKERS,
+            help='Tickers to forecast (default: PREDICTOR_TICKERS)',
+        )
+        parser.add_argument(
+            '--output', default=settings.FORECAST_STORE_DIR,
+            help='Forecast store directory (default: FORECAST_STORE_DIR)',
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        tickers = options['tickers']
+        if not tickers:
+            raise CommandError('No tickers to forecast')
+        store = ForecastStore(options['output'])
+
+        predictor = TFTPredictor()
+        predictor.load_model()
+
+        # Pull the day's bars first; a failed download falls back to the stored data.
+        # The end covers the latest closed session (the default, today's midnight, does not)
+        end = get_calendar().fetch_end()
+        for ticker in tickers:
+            try:
+                added = predictor.data_store.refresh(ticker, end=end)
+                self.stdout.write(f"📥 {ticker}: {added} new bars")
+            except Exception as e:
+                self.stderr.write(f"⚠️ {ticker}: refresh failed ({str(e)}), using stored data")
+
+        # A ticker that cannot be prepared keeps its previous forecast; the others are still written
+        frames, failed = {}, []
+        for ticker in tickers:
+            try:
+                df = predictor.fetch_and_prepare_data(lookback_days=180, ticker=ticker)
+            except Exception as e:
+                failed.append(ticker)
+                self.stderr.write(f"❌ {ticker}: no forecast ({str(e)})")
+                continue
+            frames[ticker] = (df, pd.to_datetime(df['date'].iloc[-1]))
+
+        # One batched forward pass for every ticker
+        forecasts = predictor._get_quantile_forecasts(frames) if frames else {}
+
+        for ticker, (df, last_date) in frames.items():
+            store.save(ticker, (df, last_date, forecasts[ticker]), predictor.weights_hash)
+            self.stdout.write(f"✓ {ticker}: forecast from {last_date.strftime('%Y-%m-%d')} saved to {store.path(ticker)}")
+
+        if failed:
+            raise CommandError(
+                f"{len(forecasts)} forecasts written, failed for {', '.join(failed)} "
+                f"({time.perf_counter() - start:.1f}s)"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {len(forecasts)} forecasts written in {time.perf_counter() - start:.1f}s"
+        ))
@@ -0,0 +1,229 @@
+"""
+Synthetic multi-ticker market simulator, a local stand-in for Yahoo Finance
+
+Prices follow a one-factor model: every ticker loads on a common market return
+whose drift and volatility switch between regimes, plus its own noise,
+occasional overnight gaps and a trading calendar with weekends and holidays.
+Each calendar year is drawn from its own seeded generator, so a bar never
+changes once simulated and any [start, end) window is reproducible.
+
+Use it in-process as a fetcher (settings.PRICE_DATA_SOURCE = 'simulator') or
+serve it over HTTP for other processes (PRICE_DATA_SOURCE = 'http'):
+
+    python -m predictor.market_sim --port 8765
+"""
+import argparse
+import json
+import zlib
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+# Starting prices for the tickers the API serves; others get one from their name
+DEFAULT_BASE_PRICES = {
+    'BBRI.JK': 5000,
+    'BMRI.JK': 6000,
+    'BBCA.JK': 9500,
+    'BBNI.JK': 5000,
+}
+
+# Market regimes as (daily drift, daily volatility) of the common factor
+REGIMES = (
+    (0.0008, 0.008),   # calm uptrend
+    (0.0002, 0.013),   # sideways
+    (-0.0010, 0.022),  # stress
+)
+
+
+class MarketSimulator:
+    """
+    Deterministic daily OHLCV generator for any number of tickers
+
+    Implements the fetcher interface used by PriceStore (fetch(ticker, start, end)).
+    """
+
+    def __init__(self, seed=42, start='2015-01-01', mean_regime_days=60, mean_reversion=0.002,
+                 holidays_per_year=12, gap_probability=0.02, gap_size=0.03):
+        self.seed = seed
+        self.start = pd.Timestamp(start)
+        self.mean_regime_days = mean_regime_days
+        self.mean_reversion = mean_reversion
+        self.holidays_per_year = holidays_per_year
+        self.gap_probability = gap_probability
+        self.gap_size = gap_size
+        self._calendar = {}
+        self._market = {}
+
+    def _rng(self, *keys):
+        return np.random.default_rng([self.seed, *keys])
+
+    @staticmethod
+    def _ticker_key(ticker):
+        return zlib.crc32(ticker.encode())
+
+    def trading_days(self, year):
+        """Business days of year minus New Year, Christmas and seeded random holidays"""
+        if year not in self._calendar:
+            days = np.arange(f'{year}-01-01', f'{year + 1}-01-01', dtype='datetime64[D]')
+            days = days[np.is_busday(days)]
+            rng = self._rng(year, 0)
+            fixed = np.array([f'{year}-01-01', f'{year}-12-25'], dtype='datetime64[D]')
+            random_holidays = rng.choice(days, size=self.holidays_per_year, replace=False)
+            self._calendar[year] = days[~np.isin(days, np.concatenate([fixed, random_holidays]))]
+        return self._calendar[year]
+
+    def _market_returns(self, year):
+        """Common factor log returns and regime volatility scale for each trading day of year"""
+        if year not in self._market:
+            n = len(self.trading_days(year))
+            rng = self._rng(year, 1)
+
+            # Regime segments with geometric durations; each switch moves to a different regime
+            durations = rng.geometric(1.0 / self.mean_regime_days, size=n)
+            labels = np.cumsum(rng.integers(1, len(REGIMES), size=n)) % len(REGIMES)
+            regime = np.repeat(labels, durations)[:n]
+
+            drift, vol = np.array(REGIMES).T
+            returns = rng.normal(drift[regime], vol[regime])
+            self._market[year] = (returns, vol[regime] / vol[1])
+        return self._market[year]
+
+    def _ticker_profile(self, ticker):
+        """Stable per-ticker parameters: base price, market beta, idiosyncratic vol, volume"""
+        rng = self._rng(self._ticker_key(ticker))
+        base_price = DEFAULT_BASE_PRICES.get(ticker, float(rng.integers(500, 10000)))
+        return {
+            'base_price': base_price,
+            'beta': rng.uniform(0.8, 1.2),
+            'idio_vol': rng.uniform(0.006, 0.012),
+            'volume': rng.uniform(5e7, 2e8),
+        }
+
+    def _ticker_year(self, ticker, year, profile):
+        n = len(self.trading_days(year))
+        market, vol_scale = self._market_returns(year)
+        rng = self._rng(year, 2, self._ticker_key(ticker))
+
+        noise = rng.normal(0.0, profile['idio_vol'], size=n) * vol_scale
+        gap = np.where(
+            rng.random(n) < self.gap_probability,
+            rng.normal(0.0, self.gap_size, size=n),
+            rng.normal(0.0, 0.002, size=n),
+        )
+        wick = np.abs(rng.normal(0.0, 0.006, size=(2, n))) * vol_scale
+        volume_noise = rng.lognormal(0.0, 0.3, size=n)
+        return profile['beta'] * market + noise + gap, gap, wick, volume_noise
+
+    def simulate(self, ticker, end):
+        """
+        Simulate bars for ticker from self.start up to (excluding) end
+
+        Returns:
+            DataFrame with columns date, open, high, low, close, volume
+        """
+        end = pd.Timestamp(end)
+        profile = self._ticker_profile(ticker)
+        years = range(self.start.year, end.year + 1)
+
+        # Log price deviation from the base price is an AR(1) process, solved one year
+        # at a time in closed form: x_t = phi^t * (x_0 + sum_k shock_k * phi^-k)
+        phi = 1.0 - self.mean_reversion
+        deviations = []
+        level = 0.0
+        parts = [self._ticker_year(ticker, year, profile) for year in years]
+        for shocks, *_ in parts:
+            powers = phi ** np.arange(1, len(shocks) + 1)
+            deviation = powers * (level + np.cumsum(shocks / powers))
+            deviations.append(deviation)
+            level = deviation[-1]
+
+        dates = np.concatenate([self.trading_days(year) for year in years])
+        _, gap, wick, volume_noise = (np.concatenate(x, axis=-1) for x in zip(*parts))
+
+        log_close = np.log(profile['base_price']) + np.concatenate(deviations)
+        prev_log_close = np.concatenate([[np.log(profile['base_price'])], log_close[:-1]])
+        log_return = log_close - prev_log_close
+        close = np.exp(log_close)
+        open_ = np.exp(prev_log_close + gap)
+        high = np.maximum(open_, close) * np.exp(wick[0])
+        low = np.minimum(open_, close) * np.exp(-wick[1])
+        volume = np.round(profile['volume'] * volume_noise * (1 + 20 * np.abs(log_return)))
+
+        df = pd.DataFrame({
+            'date': dates.astype('datetime64[ns]'),
+            'open': open_,
+            'high': high,
+            'low': low,
+            'close': close,
+            'volume': volume,
+        })
+        mask = (df['date'] >= self.start) & (df['date'] < end)
+        return df[mask].reset_index(drop=True)
+
+    def fetch(self, ticker, start, end):
+        """
+        Bars for ticker in [start, end), never past yesterday (like a live feed)
+
+        Returns:
+            DataFrame with columns date, open, high, low, close, volume (may be empty)
+        """
+        today = pd.Timestamp(datetime.now().date())
+        end = min(pd.Timestamp(end), today)
+        df = self.simulate(ticker, end)
+        return df[df['date'] >= pd.Timestamp(start)].reset_index(drop=True)
+
+
+def _make_handler(simulator):
+    class MarketSimHandler(BaseHTTPRequestHandler):
+        """GET /bars?ticker=BBRI.JK&start=YYYY-MM-DD&end=YYYY-MM-DD and GET /health"""
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            if url.path == '/health':
+                return self._send(200, {'status': 'healthy', 'seed': simulator.seed})
+            if url.path != '/bars':
+                return self._send(404, {'error': f'Unknown path: {url.path}'})
+
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            try:
+                df = simulator.fetch(query['ticker'], pd.Timestamp(query['start']), pd.Timestamp(query['end']))
+            except (KeyError, ValueError) as e:
+                return self._send(400, {'error': f'Expected ticker, start and end: {str(e)}'})
+
+            payload = {'ticker': query['ticker'], 'date': df['date'].dt.strftime('%Y-%m-%d').tolist()}
+            payload.update({column: df[column].tolist() for column in ('open', 'high', 'low', 'close', 'volume')})
+            return self._send(200, payload)
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return MarketSimHandler
+
+
+def serve(host='127.0.0.1', port=8765, seed=42):
+    """Serve a MarketSimulator over HTTP until interrupted"""
+    server = ThreadingHTTPServer((host, port), _make_handler(MarketSimulator(seed=seed)))
+    print(f"📈 Market simulator (seed {seed}) listening on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Serve synthetic OHLCV bars over HTTP')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.seed)
@@ -0,0 +1,150 @@
+"""
+In-process latency histograms and counters, rendered in Prometheus text format
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+
+# Histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_HELP = {
+    'tft_stage_duration_seconds': 'Time spent in each prediction pipeline stage',
+    'tft_stale_responses_total': 'Predictions served from price data that missed its due refresh',
+    'tft_price_refresh_errors_total': 'Failed incremental price store refreshes',
+    'tft_market_data_jobs_total': 'Scheduled market data jobs run (PRICE_SCHEDULER)',
+}
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(f'{key}="{_escape(value)}"' for key, value in labels)
+    return '{' + pairs + '}'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    return repr(float(value)) if value == value else 'NaN'
+
+
+class Histogram:
+    """Cumulative-bucket histogram (Prometheus semantics)"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe store of labelled histograms and counters"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, value, **labels):
+        """Record one observation in histogram name"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        """Increase counter name"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def span(self, stage):
+        """Time the enclosed block into tft_stage_duration_seconds{stage=...}"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe('tft_stage_duration_seconds', time.perf_counter() - start, stage=stage)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def render(self):
+        """Render every histogram and counter in Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for name in sorted({name for name, _ in self._histograms}):
+                lines += _header(name, 'histogram')
+                for (metric, labels), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+            for name in sorted({name for name, _ in self._counters}):
+                lines += _header(name, 'counter')
+                for (metric, labels), value in sorted(self._counters.items()):
+                    if metric == name:
+                        lines.append(f"{name}{_format_labels(labels)} {value}")
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+def _header(name, metric_type):
+    return [f"# HELP {name} {METRIC_HELP.get(name, name)}", f"# TYPE {name} {metric_type}"]
+
+
+def render_stats(prefix, stats, counters=(), help_text=''):
+    """
+    Render a component's stats() dict as Prometheus gauges and counters
+
+    Args:
+        prefix: Metric name prefix, e.g. tft_forecast_cache
+        stats: Dictionary of numeric values (non-numeric entries are skipped)
+        counters: Keys exported as monotonically increasing counters (suffix _total)
+        help_text: Component description for the HELP lines
+    """
+    lines = []
+    for key, value in stats.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        is_counter = key in counters
+        name = f"{prefix}_{key}_total" if is_counter else f"{prefix}_{key}"
+        lines.append(f"# HELP {name} {help_text} ({key})")
+        lines.append(f"# TYPE {name} {'counter' if is_counter else 'gauge'}")
+        lines.append(f"{name} {_format_value(value)}")
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def render_cache_stats(prefix, stats, help_text):
+    """Cache counters plus a hit ratio gauge"""
+    lookups = stats['hits'] + stats['misses']
+    stats = dict(stats, hit_ratio=stats['hits'] / lookups if lookups else 0.0)
+    return render_stats(prefix, stats, counters=('hits', 'misses'), help_text=help_text)
+
+
+# Process-wide registry
+metrics = MetricsRegistry()
@@ -1,18 +1,37 @@
 """
 Model loader and predictor for TFT model
+
+torch and pytorch-forecasting are imported when the model is loaded, so with
+PREDICTOR_INFERENCE_MODE = 'onnx' a worker only needs onnxruntime.
 """
 import os
-import torch
+import hashlib
+import threading
 import pandas as pd
 import numpy as np
-import yfinance as yf
-import ta
 from datetime import datetime, timedelta
-from pytorch_forecasting import TimeSeriesDataSet, TemporalFusionTransformer
-from pytorch_forecasting.data import GroupNormalizer
-from pytorch_forecasting.metrics import QuantileLoss
 from django.conf import settings
 from .sample_data import create_sample_bbri_data
+from .batching import InferenceBatcher
+from .cache import ForecastCache
+from .data_store import PriceStore, create_fetcher
+from .indicators import INDICATOR_COLUMNS, IndicatorEngine
+from .inputs import build_model_arrays, build_model_input, collate_model_arrays, collate_model_inputs
+from .metrics import metrics
+from .optimize import INFERENCE_MODES, OnnxForward, TracedForward, quantize_model
+from .results import build_prediction_result, check_horizon, parse_target_date
+from .revalidate import CircuitBreaker, DataUnavailableError, PriceRefresher
+from .scheduler import last_scheduled_run, refresh_delay, scheduler_mode
+from .threads import configure_threads, inference_threads
+from .trading_calendar import get_calendar
+from .model_spec import (
+    DATASET_PARAMETERS,
+    build_model_spec,
+    create_model_from_spec,
+    dataset_kwargs_from_spec,
+    load_model_spec,
+    save_model_spec,
+)
 
 
 
@@ -21,50 +40,180 @@ class TFTPredictor:
     Temporal Fusion Transformer predictor for BBRI stock
     """
     
-    def __init__(self):
+    def __init__(self, data_store=None):
         self.model = None
+        self.model_spec = None
         self.training_dataset = None
         self.max_encoder_length = 60
         self.max_prediction_length = 30
         self.ticker = "BBRI.JK"
+        self.weights_hash = None
+        self.inference_mode = settings.PREDICTOR_INFERENCE_MODE
+        self.traced_forward = None
+        self.forecast_cache = ForecastCache(
+            max_size=settings.FORECAST_CACHE_SIZE,
+            ttl=settings.FORECAST_CACHE_TTL,
+        )
+        self.data_store = data_store if data_store is not None else PriceStore(
+            os.path.join(settings.PRICE_STORE_DIR, settings.PRICE_DATA_SOURCE),
+            fetcher=create_fetcher(
+                settings.PRICE_DATA_SOURCE,
+                simulator_url=settings.MARKET_SIM_URL,
+                seed=settings.MARKET_SIM_SEED,
+            ),
+        )
+        self.refresher = PriceRefresher(
+            self.data_store,
+            max_age=settings.PRICE_STORE_REFRESH_INTERVAL,
+            breaker=CircuitBreaker(
+                failure_threshold=settings.PRICE_UPSTREAM_FAILURE_THRESHOLD,
+                reset_timeout=settings.PRICE_UPSTREAM_RESET_TIMEOUT,
+            ),
+            **self._refresh_schedule(),
+        )
+        self.indicator_states = {}
+        self._indicator_locks = {}
+        self._indicator_locks_lock = threading.Lock()
+        self.batcher = InferenceBatcher(
+            self._run_inference_batch,
+            max_batch_size=settings.PREDICTOR_BATCH_MAX_SIZE,
+            max_wait_ms=settings.PREDICTOR_BATCH_MAX_WAIT_MS,
+        )
         
+    @staticmethod
+    def _refresh_schedule():
+        """PriceRefresher arguments for PRICE_SCHEDULER"""
+        if scheduler_mode() == 'off':
+            return {}
+        # Only the scheduled job calls the upstream; a ticker is stale once it
+        # missed the latest scheduled refresh
+        calendar, delay = get_calendar(), refresh_delay()
+        return {
+            'on_request': False,
+            'due': lambda: last_scheduled_run(calendar, delay).timestamp(),
+        }
+    
     def load_model(self):
-        """Load the trained TFT model"""
+        """
+        Load the trained TFT model
+        
+        The architecture is rebuilt from the JSON spec next to the weights file.
+        If no spec exists yet, it is derived once from a dummy dataset and saved.
+        """
         if self.model is not None:
             return self.model
+        if self.inference_mode == 'onnx':
+            try:
+                return self._load_onnx_model()
+            except Exception as e:
+                print(f"⚠️ Inference mode onnx unavailable ({str(e)}), using eager")
+                self.inference_mode = 'eager'
+                configure_threads(apply_torch=True)
             
+        import torch
+        from pytorch_forecasting import TemporalFusionTransformer
+        from pytorch_forecasting.metrics import QuantileLoss
+        
         try:
-            # First, we need to create a dummy dataset to initialize the model architecture
-            dummy_data = self._create_dummy_dataset()
+            self.model_spec = load_model_spec(settings.MODEL_SPEC_PATH)
             
-            # Create model from dataset
-            self.model = TemporalFusionTransformer.from_dataset(
-                dummy_data,
-                learning_rate=0.03,
-                hidden_size=32,
-                attention_head_size=2,
-                dropout=0.1,
-                hidden_continuous_size=16,
-                output_size=7,  # 7 quantiles
-                loss=QuantileLoss(),
-                reduce_on_plateau_patience=4,
-            )
+            if self.model_spec is not None:
+                self.model = create_model_from_spec(self.model_spec)
+            else:
+                # No spec yet: create a dummy dataset to initialize the model architecture
+                dummy_data = self._create_dummy_dataset()
+                
+                self.model = TemporalFusionTransformer.from_dataset(
+                    dummy_data,
+                    learning_rate=0.03,
+                    hidden_size=32,
+                    attention_head_size=2,
+                    dropout=0.1,
+                    hidden_continuous_size=16,
+                    output_size=7,  # 7 quantiles
+                    loss=QuantileLoss(),
+                    reduce_on_plateau_patience=4,
+                )
+                self.model_spec = build_model_spec(self.model)
+                save_model_spec(self.model_spec, settings.MODEL_SPEC_PATH)
+                print(f"✓ Model spec saved to {settings.MODEL_SPEC_PATH}")
             
             # Load the saved weights
             if os.path.exists(settings.MODEL_PATH):
-                state_dict = torch.load(settings.MODEL_PATH, map_location=torch.device('cpu'))
-                self.model.load_state_dict(state_dict)
-                self.model.eval()
+                # A memory-mapped state dict assigned as the parameters keeps the weights in
+                # the page cache, shared by every worker process instead of copied into each
+                mmap = settings.PREDICTOR_MMAP_WEIGHTS
+                state_dict = torch.load(settings.MODEL_PATH, map_location=torch.device('cpu'), mmap=mmap)
+                self.model.load_state_dict(state_dict, assign=mmap)
+                self.weights_hash = self._hash_weights(settings.MODEL_PATH)
                 print(f"✓ Model loaded successfully from {settings.MODEL_PATH}")
             else:
                 print(f"⚠️ Model file not found at {settings.MODEL_PATH}. Using untrained model.")
-                
+                self.weights_hash = 'untrained'
+            
+            self.model.eval()
+            self._optimize_model()
             return self.model
             
         except Exception as e:
             print(f"❌ Error loading model: {str(e)}")
             raise
     
+    def _load_onnx_model(self):
+        """
+        Load the ONNX export of the TFT (`python manage.py export_onnx`) for onnxruntime
+        
+        Only the spec is read besides the .onnx file; the forecast cache keeps using the
+        hash of the weights the export was made from.
+        """
+        model_spec = load_model_spec(settings.MODEL_SPEC_PATH)
+        if model_spec is None:
+            raise FileNotFoundError(f"Model spec not found at {settings.MODEL_SPEC_PATH}")
+        
+        model = OnnxForward(settings.MODEL_ONNX_PATH, threads=inference_threads)
+        if os.path.exists(settings.MODEL_PATH) and model.weights_hash != self._hash_weights(settings.MODEL_PATH):
+            print(f"⚠️ {settings.MODEL_ONNX_PATH} was exported from other weights than {settings.MODEL_PATH}, "
+                  f"re-run `python manage.py export_onnx`")
+        
+        self.model_spec = model_spec
+        self.weights_hash = model.weights_hash or 'untrained'
+        self.model = model
+        print(f"✓ ONNX model loaded from {settings.MODEL_ONNX_PATH}")
+        print(f"✓ Inference mode: {self.inference_mode}")
+        return self.model
+    
+    def _optimize_model(self):
+        """Apply PREDICTOR_INFERENCE_MODE; falls back to eager inference if that fails"""
+        if self.inference_mode not in INFERENCE_MODES:
+            raise ValueError(f"Unknown inference mode: {self.inference_mode}. Choose from {INFERENCE_MODES}")
+        
+        try:
+            if self.inference_mode == 'quantized':
+                self.model = quantize_model(self.model)
+            elif self.inference_mode == 'torchscript':
+                example = build_model_input(create_sample_bbri_data(days=2 * self.max_encoder_length), self.model_spec)
+                self.traced_forward = TracedForward(self.model, example)
+            print(f"✓ Inference mode: {self.inference_mode}")
+        except Exception as e:
+            print(f"⚠️ Inference mode {self.inference_mode} unavailable ({str(e)}), using eager")
+            self.inference_mode = 'eager'
+    
+    def warm_up(self):
+        """Load the model and run one forward pass so the first request does not pay for it"""
+        self.load_model()
+        df = create_sample_bbri_data(days=2 * self.max_encoder_length)
+        self._run_inference(df)
+        print("✓ Model warm-up completed")
+    
+    @staticmethod
+    def _hash_weights(path):
+        """Return a short content hash of the weights file, used in forecast cache keys"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()[:16]
+    
     def _create_dummy_dataset(self):
         """Create a minimal dummy dataset for model initialization"""
         # Create minimal data
@@ -94,286 +243,386 @@ class TFTPredictor:
         dummy_df['target'] = dummy_df['close']
         
         # Create TimeSeriesDataSet
-        dataset = TimeSeriesDataSet(
-            dummy_df,
-            time_idx="time_idx",
-            target="target",
-            group_ids=["series"],
-            min_encoder_length=self.max_encoder_length // 2,
-            max_encoder_length=self.max_encoder_length,
-            min_prediction_length=1,
-            max_prediction_length=self.max_prediction_length,
-            static_categoricals=["series"],
-            time_varying_known_reals=["time_idx"],
-            time_varying_unknown_reals=[
-                "target", "open", "high", "low", "volume",
-                "ma_7", "ma_30", "rsi", "macd", "macd_signal",
-                "bb_upper", "bb_middle", "bb_lower"
-            ],
-            target_normalizer=GroupNormalizer(groups=["series"], transformation="softplus"),
-            add_relative_time_idx=True,
-            add_target_scales=True,
-            add_encoder_length=True,
-        )
+        from pytorch_forecasting import TimeSeriesDataSet
+        dataset = TimeSeriesDataSet(dummy_df, **dataset_kwargs_from_spec({'dataset': DATASET_PARAMETERS}))
         
         return dataset
     
-    def fetch_and_prepare_data(self, lookback_days=180):
+    def fetch_and_prepare_data(self, lookback_days=180, ticker=None):
         """
-        Fetch real-time data from yfinance and prepare it for prediction
+        Read recent bars from the local price store and prepare them for prediction
+        
+        Stale-while-revalidate: when the store is older than PRICE_STORE_REFRESH_INTERVAL
+        the stored bars are served immediately and an incremental refresh runs in the
+        background (skipped while the upstream circuit is open). Only a ticker with no
+        stored bars at all waits for the upstream. With PRICE_SCHEDULER enabled the
+        stored bars are read as they are and the scheduled job does all refreshes.
         
         Args:
             lookback_days: Number of days to fetch for historical context
+            ticker: Ticker symbol (defaults to self.ticker)
             
         Returns:
             Prepared DataFrame with technical indicators
+            
+        Raises:
+            DataUnavailableError: Nothing stored for ticker and the upstream is unreachable
         """
-        import time
+        ticker = ticker or self.ticker
+        start_date = self.history_start(datetime.now(), lookback_days)
         
-        max_retries = 3
-        for attempt in range(max_retries):
-            try:
-                # Calculate date range
-                end_date = datetime.now()
-                start_date = end_date - timedelta(days=lookback_days + 60)  # Extra buffer for indicators
-                
-                print(f"📥 Fetching data for {self.ticker} from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')} (Attempt {attempt + 1}/{max_retries})")
-                
-                # Download data with timeout
-                df = yf.download(
-                    self.ticker,
-                    start=start_date.strftime('%Y-%m-%d'),
-                    end=end_date.strftime('%Y-%m-%d'),
-                    progress=False,
-                    timeout=30
-                )
-                
-                # Check if data is empty
-                if df is None or df.empty or len(df) == 0:
-                    error_msg = f"No data returned from Yahoo Finance for ticker {self.ticker}"
-                    if attempt < max_retries - 1:
-                        print(f"⚠️ {error_msg}. Retrying in 2 seconds...")
-                        time.sleep(2)
-                        continue
-                    else:
-                        raise ValueError(f"{error_msg}. Please check: 1) Internet connection, 2) Ticker symbol is correct (BBRI.JK for Indonesian stocks), 3) Yahoo Finance service is available")
-                
-                print(f"✓ Data fetched successfully: {len(df)} rows")
-                
-                df.reset_index(inplace=True)
-                
-                # Flatten MultiIndex columns if they exist
-                if isinstance(df.columns, pd.MultiIndex):
-                    df.columns = [col[1] if col[0] == 'Price' else col[0] for col in df.columns.values]
-                
-                # Standardize column names
-                new_columns = []
-                for col in df.columns:
-                    if col == 'Date':
-                        new_columns.append('date')
-                    else:
-                        new_columns.append(col.lower().replace(' ', '_'))
-                df.columns = new_columns
-                
-                # Keep only necessary columns
-                cols_to_keep = ['date', 'open', 'high', 'low', 'close', 'volume']
-                missing_cols = [col for col in cols_to_keep if col not in df.columns]
-                if missing_cols:
-                    raise ValueError(f"Missing required columns: {missing_cols}. Available columns: {list(df.columns)}")
-                
-                df = df[[col for col in cols_to_keep if col in df.columns]].copy()
-                
-                # Add technical indicators
-                df = self._add_technical_indicators(df)
-                
-                # Add TFT-specific columns
-                df['time_idx'] = range(len(df))
-                df['series'] = 'BBRI'
-                df['target'] = df['close']
-                
-                # Remove NaN values
-                df = df.dropna().reset_index(drop=True)
-                
-                # Update time_idx after dropping NaN
-                df['time_idx'] = range(len(df))
-                
-                if len(df) < self.max_encoder_length:
-                    raise ValueError(f"Insufficient data after preprocessing. Got {len(df)} rows, need at least {self.max_encoder_length}")
-                
-                print(f"✓ Data prepared successfully: {len(df)} rows after preprocessing")
-                return df
-                
-            except Exception as e:
-                error_msg = f"Error fetching data (attempt {attempt + 1}/{max_retries}): {str(e)}"
-                print(f"❌ {error_msg}")
-                
-                if attempt < max_retries - 1:
-                    print(f"⏳ Retrying in 2 seconds...")
-                    time.sleep(2)
+        with metrics.span('fetch'):
+            self.refresher.ensure_fresh(ticker)
+            df = self.data_store.read(ticker, start=start_date)
+        if df.empty:
+            raise DataUnavailableError(f"No stored data for ticker {ticker}. Please check: 1) Internet connection, 2) Ticker symbol is correct (BBRI.JK for Indonesian stocks), 3) Yahoo Finance service is available")
+        
+        print(f"✓ Data read from price store: {len(df)} rows")
+        
+        df = self._prepare_features(df, ticker)
+        
+        print(f"✓ Data prepared successfully: {len(df)} rows after preprocessing")
+        return df
+    
+    @staticmethod
+    def history_start(now, lookback_days=180):
+        """First bar date read for a forecast made at now"""
+        return now - timedelta(days=lookback_days + 60)  # Extra buffer for indicators
+    
+    def _prepare_features(self, df, ticker):
+        """Add technical indicators and TFT columns to raw OHLCV bars"""
+        df = df[['date', 'open', 'high', 'low', 'close', 'volume']].copy()
+        
+        # Add technical indicators
+        with metrics.span('indicators'):
+            df = self._add_technical_indicators(df, ticker)
+        
+        # Add TFT-specific columns
+        df['series'] = self.series_name(ticker)
+        df['target'] = df['close']
+        
+        # Remove NaN values
+        df = df.dropna().reset_index(drop=True)
+        df['time_idx'] = range(len(df))
+        
+        if len(df) < self.max_encoder_length:
+            raise ValueError(f"Insufficient data after preprocessing. Got {len(df)} rows, need at least {self.max_encoder_length}")
+        
+        return df
+    
+    def _add_technical_indicators(self, df, ticker=None):
+        """
+        Add technical indicators to the dataframe
+        
+        With a ticker, the indicator engine state is kept between calls. When df
+        starts on the same bar as the stored state and continues its bars, only the
+        newer bars are folded in; otherwise (e.g. the lookback window moved) the
+        indicators are recomputed over df. Either way the EMA-based indicators are
+        seeded from df's first bar, so the result matches a from-scratch computation.
+        """
+        if not ticker:
+            engine, frame = self._compute_indicators(df)
+        else:
+            # Requests, the batch stream and the scheduler thread share the state
+            with self._indicator_lock(ticker):
+                state = self.indicator_states.get(ticker)
+                if state is not None and self._can_extend_indicators(state, df):
+                    engine, frame = state
+                    new_rows = df[df['date'].to_numpy() > frame['date'].iloc[-1]]
+                    if len(new_rows):
+                        appended = engine.append(new_rows['close'].to_numpy())
+                        appended.insert(0, 'date', new_rows['date'].to_numpy())
+                        frame = pd.concat([frame, appended], ignore_index=True)
                 else:
-                    # Use sample data as fallback
-                    print(f"\n⚠️ Yahoo Finance unavailable. Using SAMPLE DATA for demonstration.")
-                    print(f"📊 This is realistic BBRI stock data generated for demo purposes.")
-                    print(f"💡 For real predictions, ensure internet connection and Yahoo Finance access.\n")
-                    
-                    try:
-                        df = create_sample_bbri_data(days=lookback_days + 60)
-                        print(f"✓ Sample data loaded successfully: {len(df)} rows")
-                        return df
-                    except Exception as sample_error:
-                        raise ValueError(f"Failed to fetch real data AND failed to create sample data. Original error: {str(e)}, Sample data error: {str(sample_error)}")
-    
-    def _add_technical_indicators(self, df):
-        """Add technical indicators to the dataframe"""
-        # Moving Averages
-        df['ma_7'] = df['close'].rolling(window=7).mean()
-        df['ma_30'] = df['close'].rolling(window=30).mean()
-        
-        # RSI
-        df['rsi'] = ta.momentum.RSIIndicator(close=df['close'], window=14).rsi()
-        
-        # MACD
-        macd = ta.trend.MACD(close=df['close'])
-        df['macd'] = macd.macd()
-        df['macd_signal'] = macd.macd_signal()
-        
-        # Bollinger Bands
-        bollinger = ta.volatility.BollingerBands(close=df['close'], window=20, window_dev=2)
-        df['bb_upper'] = bollinger.bollinger_hband()
-        df['bb_middle'] = bollinger.bollinger_mavg()
-        df['bb_lower'] = bollinger.bollinger_lband()
+                    engine, frame = self._compute_indicators(df)
+                self.indicator_states[ticker] = (engine, frame)
+        
+        warmup = engine.warmup_periods()
+        position = np.arange(len(df))
+        for column in INDICATOR_COLUMNS:
+            df[column] = np.where(position < warmup[column], np.nan, frame[column].to_numpy())
         
         return df
     
-    def predict(self, target_date):
+    @staticmethod
+    def _compute_indicators(df):
+        """Fresh engine and dated indicator frame over all bars of df"""
+        engine = IndicatorEngine()
+        frame = engine.compute(df['close'].to_numpy())
+        frame.insert(0, 'date', df['date'].to_numpy())
+        return engine, frame
+    
+    def _indicator_lock(self, ticker):
+        with self._indicator_locks_lock:
+            return self._indicator_locks.setdefault(ticker, threading.Lock())
+    
+    @staticmethod
+    def _can_extend_indicators(state, df):
+        """True if df starts on the first bar of the cached state and continues its bars"""
+        _, frame = state
+        if frame.empty or df.empty or frame['date'].iloc[0] != df['date'].iloc[0]:
+            return False
+        overlap = df['date'].to_numpy()[:len(frame)]
+        return len(overlap) == len(frame) and (overlap == frame['date'].to_numpy()).all()
+    
+    @staticmethod
+    def series_name(ticker):
+        """Series label for a ticker, e.g. BBRI.JK -> BBRI"""
+        return ticker.split('.')[0].upper()
+    
+    def predict(self, target_date, ticker=None):
         """
         Make prediction for a target date
         
         Args:
             target_date: Target date for prediction (datetime object or string)
+            ticker: Ticker symbol (defaults to self.ticker)
             
         Returns:
             Dictionary containing predictions and metadata
         """
         try:
-            # Load model if not already loaded
-            if self.model is None:
-                self.load_model()
-            
-            # Parse target date
-            if isinstance(target_date, str):
-                target_date = datetime.strptime(target_date, '%Y-%m-%d')
-            
-            # Fetch and prepare data
-            df = self.fetch_and_prepare_data(lookback_days=180)
-            
-            # Get the last date in the data
-            last_date = pd.to_datetime(df['date'].iloc[-1])
-            
-            # Calculate prediction horizon
-            prediction_horizon = (target_date - last_date).days
+            ticker = ticker or self.ticker
+            target_date = self._parse_target_date(target_date)
+            df, last_date, prediction_horizon = self._prepare_prediction(target_date, ticker)
             
-            if prediction_horizon <= 0:
-                raise ValueError(f"Target date must be in the future. Last available date: {last_date.strftime('%Y-%m-%d')}")
+            # Full quantile forecast is reused for every target date within the horizon
+            quantiles = self._get_quantile_forecasts({ticker: (df, last_date)})[ticker]
+            return self._build_result(ticker, df, last_date, target_date, prediction_horizon, quantiles)
             
-            if prediction_horizon > self.max_prediction_length:
-                raise ValueError(f"Prediction horizon ({prediction_horizon} days) exceeds maximum ({self.max_prediction_length} days)")
+        except Exception as e:
+            print(f"❌ Error in prediction: {str(e)}")
+            raise
+    
+    def predict_many(self, target_date, tickers):
+        """
+        Make predictions for several tickers with a single batched forward pass
+        
+        Args:
+            target_date: Target date for prediction (datetime object or string)
+            tickers: List of ticker symbols
             
-            # Create dataset for prediction
-            dataset = TimeSeriesDataSet(
-                df,
-                time_idx="time_idx",
-                target="target",
-                group_ids=["series"],
-                min_encoder_length=self.max_encoder_length // 2,
-                max_encoder_length=self.max_encoder_length,
-                min_prediction_length=1,
-                max_prediction_length=self.max_prediction_length,
-                static_categoricals=["series"],
-                time_varying_known_reals=["time_idx"],
-                time_varying_unknown_reals=[
-                    "target", "open", "high", "low", "volume",
-                    "ma_7", "ma_30", "rsi", "macd", "macd_signal",
-                    "bb_upper", "bb_middle", "bb_lower"
-                ],
-                target_normalizer=GroupNormalizer(groups=["series"], transformation="softplus"),
-                add_relative_time_idx=True,
-                add_target_scales=True,
-                add_encoder_length=True,
+        Returns:
+            Dictionary mapping ticker to its prediction result. Tickers that cannot be
+            predicted (e.g. target date outside the horizon, no price data) get
+            {'success': False, 'error': ...}
+        """
+        target_date = self._parse_target_date(target_date)
+        
+        prepared = {}
+        results = {}
+        for ticker in tickers:
+            try:
+                prepared[ticker] = self._prepare_prediction(target_date, ticker)
+            except (ValueError, DataUnavailableError) as e:
+                results[ticker] = {'success': False, 'ticker': ticker, 'error': str(e)}
+        
+        forecasts = self._get_quantile_forecasts({
+            ticker: (df, last_date) for ticker, (df, last_date, _) in prepared.items()
+        })
+        
+        for ticker, (df, last_date, prediction_horizon) in prepared.items():
+            results[ticker] = self._build_result(
+                ticker, df, last_date, target_date, prediction_horizon, forecasts[ticker]
             )
-            
-            # Create dataloader
+        
+        return {ticker: results[ticker] for ticker in tickers}
+    
+    @staticmethod
+    def _parse_target_date(target_date):
+        return parse_target_date(target_date)
+    
+    def _prepare_prediction(self, target_date, ticker):
+        """
+        Fetch data for ticker and validate the prediction horizon
+        
+        Returns:
+            Tuple of (prepared DataFrame, last data date, prediction horizon in days)
+        """
+        # Load model if not already loaded
+        if self.model is None:
+            self.load_model()
+        
+        # Fetch and prepare data
+        df = self.fetch_and_prepare_data(lookback_days=180, ticker=ticker)
+        
+        # Get the last date in the data
+        last_date = pd.to_datetime(df['date'].iloc[-1])
+        
+        return df, last_date, self._check_horizon(target_date, last_date)
+    
+    def _check_horizon(self, target_date, last_date):
+        """Return the prediction horizon in days, or raise ValueError if it is out of range"""
+        return check_horizon(target_date, last_date, self.max_prediction_length)
+    
+    def data_date(self, ticker=None):
+        """Last stored bar date for ticker (None if nothing is stored); cheap, no network"""
+        return self.data_store.last_date(ticker or self.ticker)
+    
+    def forecast(self, ticker=None):
+        """
+        Fetch data and return the full quantile forecast for ticker
+        
+        Returns:
+            Tuple of (prepared DataFrame, last data date, quantiles array) for predict_from_forecast
+        """
+        ticker = ticker or self.ticker
+        if self.model is None:
+            self.load_model()
+        
+        df = self.fetch_and_prepare_data(lookback_days=180, ticker=ticker)
+        last_date = pd.to_datetime(df['date'].iloc[-1])
+        quantiles = self._get_quantile_forecasts({ticker: (df, last_date)})[ticker]
+        return df, last_date, quantiles
+    
+    def predict_from_forecast(self, target_date, ticker, forecast):
+        """Build the prediction result for target_date from a forecast() tuple"""
+        target_date = self._parse_target_date(target_date)
+        df, last_date, quantiles = forecast
+        prediction_horizon = self._check_horizon(target_date, last_date)
+        return self._build_result(ticker, df, last_date, target_date, prediction_horizon, quantiles)
+    
+    def _build_result(self, ticker, df, last_date, target_date, prediction_horizon, quantiles):
+        """Slice the quantile forecast up to the target date and assemble the API response"""
+        result = build_prediction_result(ticker, df, last_date, target_date, prediction_horizon, quantiles)
+        result['data_status'] = self.refresher.status(ticker)
+        if result['data_status']['stale']:
+            metrics.inc('tft_stale_responses_total', ticker=ticker)
+        return result
+    
+    def _build_prediction_dataset(self, df):
+        """
+        Create a predict-mode dataset whose decoder covers the next max_prediction_length days
+        
+        Normalizers are fitted on the observed data, then the forecast window is taken
+        over placeholder future rows (unknown reals are not read by the decoder).
+        """
+        from pytorch_forecasting import TimeSeriesDataSet
+        
+        dataset = TimeSeriesDataSet(df, **dataset_kwargs_from_spec(self.model_spec))
+        
+        future_df = pd.concat([df.iloc[[-1]]] * self.max_prediction_length, ignore_index=True)
+        future_df['time_idx'] = df['time_idx'].iloc[-1] + 1 + np.arange(self.max_prediction_length)
+        future_df['date'] = df['date'].iloc[-1] + pd.to_timedelta(np.arange(1, self.max_prediction_length + 1), unit='D')
+        
+        return TimeSeriesDataSet.from_dataset(
+            dataset,
+            pd.concat([df, future_df], ignore_index=True),
+            predict=True,
+            stop_randomization=True,
+        )
+    
+    def _run_inference(self, df):
+        """
+        Run the TFT on the last window of df
+        
+        Returns:
+            Array of shape [max_prediction_length, 7 quantiles]
+        """
+        return self._run_inference_batch([df])[0]
+    
+    def _run_inference_batch(self, dfs):
+        """
+        Run the TFT on the last window of each DataFrame
+        
+        Returns:
+            Array of shape [len(dfs), max_prediction_length, 7 quantiles]
+        """
+        if settings.PREDICTOR_FAST_PATH or self.inference_mode == 'onnx':
+            return self._run_inference_direct(dfs)
+        return np.stack([self._run_inference_dataset(df) for df in dfs])
+    
+    def _run_inference_direct(self, dfs):
+        """Fast path: build input tensors directly and run one batched model.forward"""
+        # Input tensors stand in for the TimeSeriesDataSet, so they share its stage label
+        with metrics.span('dataset_build'):
+            x = self._collate_inputs(dfs)
+        return self._forward(x)
+    
+    def _collate_inputs(self, dfs):
+        """Collated model input for prepared frames: NumPy arrays for onnxruntime, tensors otherwise"""
+        if self.inference_mode == 'onnx':
+            return collate_model_arrays([build_model_arrays(df, self.model_spec) for df in dfs])
+        return collate_model_inputs([build_model_input(df, self.model_spec) for df in dfs])
+    
+    def _forward(self, x):
+        """
+        Run the model on a collated input batch (TorchScript graph or onnxruntime when available)
+        
+        Returns:
+            Array of shape [batch, max_prediction_length, 7 quantiles]
+        """
+        if self.inference_mode == 'onnx':
+            if not self.model.supports(x):
+                raise ValueError(
+                    f"The ONNX model needs {self.model.encoder_length} encoder and "
+                    f"{self.model.decoder_length} decoder steps, got {x['encoder_cont'].shape[1]}/{x['decoder_cont'].shape[1]}"
+                )
+            with metrics.span('inference'):
+                return self.model(x)
+        
+        import torch
+        with metrics.span('inference'), torch.inference_mode():
+            if self.traced_forward is not None and self.traced_forward.supports(x):
+                predictions = self.traced_forward(x)
+            else:
+                out = self.model(x)
+                predictions = self.model.to_quantiles(out)
+        return predictions.numpy()
+    
+    def _run_inference_dataset(self, df):
+        """Reference path through TimeSeriesDataSet and Lightning's predict loop"""
+        with metrics.span('dataset_build'):
+            dataset = self._build_prediction_dataset(df)
             dataloader = dataset.to_dataloader(train=False, batch_size=1, num_workers=0)
+        
+        # Make prediction
+        import torch
+        with metrics.span('inference'), torch.no_grad():
+            raw_predictions = self.model.predict(dataloader, mode="quantiles", return_x=False)
+        
+        # Shape: [batch, prediction_length, quantiles]
+        predictions = raw_predictions.numpy()
+        print(f"📊 Prediction shape: {predictions.shape}")
+        if predictions.ndim != 3:
+            raise ValueError(f"Unexpected prediction shape: {predictions.shape}")
+        
+        return predictions[0]
+    
+    def _get_quantile_forecasts(self, frames):
+        """
+        Return the full quantile forecast per ticker, running cache misses as one batch
+        
+        Args:
+            frames: Dictionary mapping ticker to (prepared DataFrame, last data date)
             
-            # Make prediction
-            with torch.no_grad():
-                raw_predictions = self.model.predict(dataloader, mode="prediction", return_x=False)
-            
-            # Extract predictions - handle different shapes
-            predictions = raw_predictions.numpy()
-            print(f"📊 Prediction shape: {predictions.shape}")
-            
-            # Handle different prediction shapes
-            if len(predictions.shape) == 3:
-                # Shape: [batch, prediction_length, quantiles]
-                median_predictions = predictions[0, :prediction_horizon, 3]
-                lower_bound = predictions[0, :prediction_horizon, 1]
-                upper_bound = predictions[0, :prediction_horizon, 5]
-            elif len(predictions.shape) == 2:
-                # Shape: [prediction_length, quantiles]
-                median_predictions = predictions[:prediction_horizon, 3]
-                lower_bound = predictions[:prediction_horizon, 1]
-                upper_bound = predictions[:prediction_horizon, 5]
+        Returns:
+            Dictionary mapping ticker to an array of shape [max_prediction_length, 7 quantiles]
+        """
+        forecasts = {}
+        misses = {}
+        for ticker, (df, last_date) in frames.items():
+            cache_key = (ticker, last_date.strftime('%Y-%m-%d'), self.weights_hash)
+            quantiles = self.forecast_cache.get(cache_key)
+            if quantiles is not None:
+                print(f"⚡ Forecast cache hit for {cache_key}")
+                forecasts[ticker] = quantiles
             else:
-                # Fallback: assume it's just median predictions
-                print(f"⚠️ Unexpected prediction shape: {predictions.shape}")
-                median_predictions = predictions.flatten()[:prediction_horizon]
-                # Create simple confidence intervals (±10%)
-                lower_bound = median_predictions * 0.9
-                upper_bound = median_predictions * 1.1
-            
-            # Create prediction dates
-            prediction_dates = [last_date + timedelta(days=i+1) for i in range(prediction_horizon)]
-            
-            # Prepare historical data (last 90 days)
-            historical_days = 90
-            historical_df = df.tail(historical_days).copy()
-            
-            # Calculate trend
-            last_price = df['close'].iloc[-1]
-            predicted_price = median_predictions[-1]
-            trend_pct = ((predicted_price - last_price) / last_price) * 100
-            
-            return {
-                'success': True,
-                'target_date': target_date.strftime('%Y-%m-%d'),
-                'last_data_date': last_date.strftime('%Y-%m-%d'),
-                'prediction_horizon': prediction_horizon,
-                'predictions': {
-                    'dates': [d.strftime('%Y-%m-%d') for d in prediction_dates],
-                    'median': median_predictions.tolist(),
-                    'lower_bound': lower_bound.tolist(),
-                    'upper_bound': upper_bound.tolist(),
-                },
-                'historical': {
-                    'dates': historical_df['date'].dt.strftime('%Y-%m-%d').tolist(),
-                    'close': historical_df['close'].tolist(),
-                },
-                'analysis': {
-                    'last_price': float(last_price),
-                    'predicted_price': float(predicted_price),
-                    'trend_percentage': float(trend_pct),
-                    'trend_direction': 'NAIK' if trend_pct > 0 else 'TURUN',
-                    'confidence_range': {
-                        'lower': float(lower_bound[-1]),
-                        'upper': float(upper_bound[-1]),
-                    }
-                }
-            }
-            
-        except Exception as e:
-            print(f"❌ Error in prediction: {str(e)}")
-            raise
+                misses[ticker] = (cache_key, df)
+        
+        if misses:
+            dfs = [df for _, df in misses.values()]
+            if settings.PREDICTOR_BATCHING:
+                # Share one forward pass with whatever other requests are in flight
+                batch = self.batcher.run(dfs)
+            else:
+                batch = self._run_inference_batch(dfs)
+            for (ticker, (cache_key, _)), quantiles in zip(misses.items(), batch):
+                quantiles.setflags(write=False)
+                self.forecast_cache.set(cache_key, quantiles)
+                forecasts[ticker] = quantiles
+        
+        return forecasts
 
 
 # Global predictor instance
@@ -383,5 +632,6 @@ def get_predictor():
     """Get or create global predictor instance"""
     global _predictor
     if _predictor is None:
+        configure_threads()
         _predictor = TFTPredictor()
     return _predictor
@@ -0,0 +1,112 @@
+"""
+Serialized TFT architecture spec, stored next to best_tft_model.pth
+
+The spec holds the TemporalFusionTransformer hyperparameters and the
+TimeSeriesDataSet arguments as plain JSON, so the model can be rebuilt
+without constructing a dataset first. pytorch-forecasting is only imported to
+build a model or dataset, so the ONNX backend can read the spec without it.
+"""
+import json
+import os
+
+
+SPEC_VERSION = 1
+
+# TimeSeriesDataSet arguments used for training and prediction
+DATASET_PARAMETERS = {
+    'time_idx': 'time_idx',
+    'target': 'target',
+    'group_ids': ['series'],
+    'min_encoder_length': 30,
+    'max_encoder_length': 60,
+    'min_prediction_length': 1,
+    'max_prediction_length': 30,
+    'static_categoricals': ['series'],
+    'time_varying_known_reals': ['time_idx'],
+    'time_varying_unknown_reals': [
+        'target', 'open', 'high', 'low', 'volume',
+        'ma_7', 'ma_30', 'rsi', 'macd', 'macd_signal',
+        'bb_upper', 'bb_middle', 'bb_lower'
+    ],
+    'target_normalizer': {'groups': ['series'], 'transformation': 'softplus'},
+    'add_relative_time_idx': True,
+    'add_target_scales': True,
+    'add_encoder_length': True,
+}
+
+# Hyperparameters that define the network architecture and are stable across
+# pytorch-forecasting releases
+MODEL_HPARAM_KEYS = [
+    'hidden_size', 'lstm_layers', 'dropout', 'output_size', 'attention_head_size',
+    'max_encoder_length', 'static_categoricals', 'static_reals',
+    'time_varying_categoricals_encoder', 'time_varying_categoricals_decoder',
+    'categorical_groups', 'time_varying_reals_encoder', 'time_varying_reals_decoder',
+    'x_reals', 'x_categoricals', 'hidden_continuous_size', 'hidden_continuous_sizes',
+    'embedding_sizes', 'embedding_paddings', 'embedding_labels', 'learning_rate',
+    'reduce_on_plateau_patience', 'causal_attention',
+]
+
+
+def build_model_spec(model, dataset_parameters=None):
+    """
+    Build a JSON-serializable spec from a TemporalFusionTransformer
+
+    Args:
+        model: TemporalFusionTransformer instance
+        dataset_parameters: TimeSeriesDataSet arguments (defaults to DATASET_PARAMETERS)
+
+    Returns:
+        Dictionary with 'version', 'model' and 'dataset' sections
+    """
+    hparams = {key: model.hparams[key] for key in MODEL_HPARAM_KEYS if key in model.hparams}
+    hparams['embedding_sizes'] = {name: list(size) for name, size in hparams.get('embedding_sizes', {}).items()}
+
+    return {
+        'version': SPEC_VERSION,
+        'model': hparams,
+        'dataset': dataset_parameters or DATASET_PARAMETERS,
+    }
+
+
+def save_model_spec(spec, path):
+    """Write spec to path as JSON"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(spec, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def load_model_spec(path):
+    """Read a spec written by save_model_spec, or return None if it does not exist"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        spec = json.load(f)
+    if spec.get('version') != SPEC_VERSION:
+        raise ValueError(f"Unsupported model spec version {spec.get('version')} in {path}")
+    return spec
+
+
+def create_model_from_spec(spec):
+    """Instantiate an untrained TemporalFusionTransformer from a spec"""
+    from pytorch_forecasting import TemporalFusionTransformer
+    from pytorch_forecasting.data import GroupNormalizer
+    from pytorch_forecasting.metrics import QuantileLoss
+
+    hparams = dict(spec['model'])
+    hparams['embedding_sizes'] = {name: tuple(size) for name, size in hparams['embedding_sizes'].items()}
+
+    return TemporalFusionTransformer(
+        **hparams,
+        loss=QuantileLoss(),
+        output_transformer=GroupNormalizer(**spec['dataset']['target_normalizer']),
+    )
+
+
+def dataset_kwargs_from_spec(spec):
+    """Return TimeSeriesDataSet keyword arguments with a fresh (unfitted) target normalizer"""
+    from pytorch_forecasting.data import GroupNormalizer
+
+    kwargs = dict(spec['dataset'])
+    kwargs['target_normalizer'] = GroupNormalizer(**kwargs['target_normalizer'])
+    return kwargs
@@ -0,0 +1,198 @@
+"""
+Optimized CPU inference for the TFT: TorchScript tracing, dynamic int8 quantization
+and ONNX export for onnxruntime
+
+Selected with settings.PREDICTOR_INFERENCE_MODE:
+    'eager'        plain model.forward
+    'torchscript'  forward pass + to_quantiles traced into one TorchScript graph;
+                   removes most per-call Python/module overhead, output is identical
+    'quantized'    dynamic int8 quantization of the nn.Linear weights; a smaller model,
+                   not a faster one (slower than eager at this TFT size, ~16 IDR off)
+    'onnx'         the same traced graph exported by `python manage.py export_onnx`
+                   and run by onnxruntime; torch and pytorch-forecasting are never imported
+
+torch and onnxruntime are imported on first use, so each mode only loads its own runtime.
+"""
+import inspect
+import os
+
+import numpy as np
+
+
+INFERENCE_MODES = ('eager', 'torchscript', 'quantized', 'onnx')
+
+# Supported by the TorchScript exporter of the pinned torch 2.1 and loaded by the
+# pinned onnx 1.15 (up to opset 20) and onnxruntime 1.16 (up to opset 19)
+ONNX_OPSET = 17
+
+
+def quantize_model(model):
+    """
+    Return a copy of model with its Linear layers dynamically quantized to int8
+
+    The LSTMs stay in float: pytorch-forecasting's rnn.LSTM subclass overrides
+    forward() (sequence lengths, empty sequences), which the quantized
+    nn.LSTM replacement would drop.
+    """
+    import torch
+    from torch import nn
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=False)
+
+
+class TracedForward:
+    """
+    model.forward followed by model.to_quantiles, traced for fixed sequence lengths
+
+    The trace records the TFT's Python control flow for one encoder/decoder length,
+    so inputs with other lengths must go through the eager model (see supports()).
+    The batch dimension stays dynamic.
+    """
+
+    def __init__(self, model, example_input):
+        import torch
+
+        self.keys = sorted(example_input)
+        self.encoder_length = example_input['encoder_cont'].shape[1]
+        self.decoder_length = example_input['decoder_cont'].shape[1]
+
+        # Weights become graph constants, which must not require grad
+        for parameter in model.parameters():
+            parameter.requires_grad_(False)
+
+        def forward(*tensors):
+            return model.to_quantiles(model(dict(zip(self.keys, tensors))))
+
+        # Trace a function rather than the LightningModule itself: scripting walks
+        # module attributes and trips over properties that need an attached Trainer
+        with torch.inference_mode():
+            self.graph = torch.jit.trace(
+                forward, tuple(example_input[key] for key in self.keys), check_trace=False, strict=False,
+            )
+
+    def supports(self, x):
+        return (
+            sorted(x) == self.keys
+            and x['encoder_cont'].shape[1] == self.encoder_length
+            and x['decoder_cont'].shape[1] == self.decoder_length
+        )
+
+    def __call__(self, x):
+        return self.graph(*(x[key] for key in self.keys))
+
+
+def export_onnx(model, example_input, path, weights_hash=None):
+    """
+    Export model.forward followed by model.to_quantiles to an ONNX file
+
+    Like TracedForward the graph is traced for the encoder/decoder lengths of
+    example_input, with a dynamic batch dimension. Inputs the graph does not read
+    are dropped by the exporter; OnnxForward feeds only the ones left.
+
+    Args:
+        model: TemporalFusionTransformer with loaded weights
+        example_input: Input dictionary from build_model_input
+        path: Output .onnx file
+        weights_hash: Hash of the weights file, stored in the model metadata
+            (forecast cache keys stay the same across inference modes)
+    """
+    import onnx
+    import torch
+
+    keys = sorted(example_input)
+    for parameter in model.parameters():
+        parameter.requires_grad_(False)
+
+    class QuantileForward(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *tensors):
+            return self.model.to_quantiles(self.model(dict(zip(keys, tensors))))
+
+    # The exporter restores the wrapper's training flag on every submodule afterwards,
+    # so a wrapper left in training mode would switch the TFT's dropout on
+    wrapper = QuantileForward().eval()
+    dynamic_axes = {key: {0: 'batch'} for key in keys}
+    dynamic_axes['quantiles'] = {0: 'batch'}
+    # torch >= 2.5 has a dynamo exporter (the default from 2.9); keep the TorchScript
+    # one, which is the only exporter in the pinned torch 2.1 and has no dynamo argument
+    options = {}
+    if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+        options['dynamo'] = False
+    tmp_path = f"{path}.tmp"
+    with torch.inference_mode():
+        torch.onnx.export(
+            wrapper, tuple(example_input[key] for key in keys), tmp_path,
+            input_names=keys, output_names=['quantiles'], dynamic_axes=dynamic_axes,
+            opset_version=ONNX_OPSET, **options,
+        )
+
+    graph = onnx.load(tmp_path)
+    metadata = {
+        'weights_hash': weights_hash or '',
+        'encoder_length': str(example_input['encoder_cont'].shape[1]),
+        'decoder_length': str(example_input['decoder_cont'].shape[1]),
+    }
+    for key, value in metadata.items():
+        entry = graph.metadata_props.add()
+        entry.key, entry.value = key, value
+    onnx.save(graph, tmp_path)
+    os.replace(tmp_path, path)
+
+
+class OnnxForward:
+    """
+    Exported TFT (see export_onnx) run by onnxruntime on CPU
+
+    Sessions are created per process on first use: onnxruntime's thread pools do
+    not survive fork(), so a session built in a preloading gunicorn master is not
+    reused by the workers.
+
+    Args:
+        path: .onnx file written by export_onnx
+        threads: Callable returning the intra-op thread count for a new session
+    """
+
+    def __init__(self, path, threads=lambda: 1):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"ONNX model not found at {path}, run `python manage.py export_onnx`")
+        self.path = path
+        self.threads = threads
+        self._session = None
+        self._pid = None
+
+        metadata = self.session.get_modelmeta().custom_metadata_map
+        self.weights_hash = metadata.get('weights_hash') or None
+        self.encoder_length = int(metadata['encoder_length'])
+        self.decoder_length = int(metadata['decoder_length'])
+        self.input_names = [node.name for node in self.session.get_inputs()]
+
+    @property
+    def session(self):
+        if self._session is None or self._pid != os.getpid():
+            import onnxruntime
+
+            options = onnxruntime.SessionOptions()
+            options.intra_op_num_threads = self.threads()
+            options.inter_op_num_threads = 1
+            self._session = onnxruntime.InferenceSession(
+                self.path, options, providers=['CPUExecutionProvider'],
+            )
+            self._pid = os.getpid()
+        return self._session
+
+    def supports(self, x):
+        return (
+            x['encoder_cont'].shape[1] == self.encoder_length
+            and x['decoder_cont'].shape[1] == self.decoder_length
+        )
+
+    def __call__(self, x):
+        """
+        Returns:
+            Array of shape [batch, decoder_length, quantiles]
+        """
+        # Tensors from build_model_input (e.g. the backtester's workers) are accepted too
+        feed = {name: np.asarray(x[name]) for name in self.input_names}
+        return self.session.run(None, feed)[0]
@@ -0,0 +1,170 @@
+"""
+Compact binary encodings of the prediction response (MessagePack, Arrow IPC)
+
+Both encodings carry the same numbers as the JSON response, in columnar form:
+dates become an epoch base (days since 1970-01-01) plus uint16 day offsets, and
+price series become little-endian float32 buffers. Scalar fields (ticker,
+analysis, errors, ...) are unchanged.
+
+Clients pick an encoding with the Accept header (or ?format=msgpack / ?format=arrow);
+JSON stays the default. msgpack and pyarrow are optional: an encoding whose
+package is missing is simply not offered.
+"""
+import json
+from importlib.util import find_spec
+
+import numpy as np
+from rest_framework.exceptions import NotAcceptable
+from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.request import Request
+from django.http import HttpResponse
+
+
+# Series in a prediction result and the value arrays each one holds
+SERIES_FIELDS = {
+    'predictions': ('median', 'lower_bound', 'upper_bound'),
+    'historical': ('close',),
+}
+
+
+def _is_prediction(data):
+    return isinstance(data, dict) and all(isinstance(data.get(name), dict) for name in SERIES_FIELDS)
+
+
+def _scalars(data):
+    """A prediction result without its series (everything that stays JSON)"""
+    return {key: value for key, value in data.items() if key not in SERIES_FIELDS}
+
+
+def _epoch_offsets(dates):
+    """ISO date strings -> (days since 1970-01-01 of the earliest date, uint16 day offsets)"""
+    days = np.array(dates, dtype='datetime64[D]').astype(np.int64)
+    base = int(days.min()) if len(days) else 0
+    return base, (days - base).astype('<u2')
+
+
+def compact_series(series):
+    """{'dates': [...], name: [...]} -> epoch base, offsets and float32 buffers"""
+    base, offsets = _epoch_offsets(series['dates'])
+    compact = {'epoch_day': base, 'offsets': offsets.tobytes()}
+    for name, values in series.items():
+        if name != 'dates':
+            compact[name] = np.asarray(values, dtype='<f4').tobytes()
+    return compact
+
+
+def compact_result(data):
+    """Columnar copy of a prediction response (single or multi-ticker); other data is returned as-is"""
+    if _is_prediction(data):
+        return {
+            key: compact_series(value) if key in SERIES_FIELDS else value
+            for key, value in data.items()
+        }
+    if isinstance(data, dict) and isinstance(data.get('results'), dict):
+        return {**data, 'results': {ticker: compact_result(r) for ticker, r in data['results'].items()}}
+    return data
+
+
+class MessagePackRenderer(BaseRenderer):
+    """MessagePack with bin-typed float32/uint16 buffers"""
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import msgpack
+
+        if data is None:
+            return b''
+        return msgpack.packb(compact_result(data), use_bin_type=True)
+
+
+class ArrowRenderer(BaseRenderer):
+    """
+    Arrow IPC stream: one row per date of every ticker's history and forecast
+
+    Columns: ticker (dictionary), offset (uint16 days from the epoch_day in the
+    metadata), close (history rows) and median / lower_bound / upper_bound
+    (forecast rows) as float32, null where not applicable. The rest of the JSON
+    response, without the series, is in the schema metadata under 'response'.
+    """
+    media_type = 'application/vnd.apache.arrow.stream'
+    format = 'arrow'
+    charset = None
+    render_style = 'binary'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        import pyarrow as pa
+
+        if data is None:
+            return b''
+        if _is_prediction(data):
+            results, response = {data['ticker']: data}, _scalars(data)
+        elif isinstance(data, dict) and isinstance(data.get('results'), dict):
+            results = data['results']
+            response = {**data, 'results': {ticker: _scalars(r) for ticker, r in results.items()}}
+        else:
+            results, response = {}, data
+
+        rows = {
+            ticker: (r['historical'], r['predictions'])
+            for ticker, r in results.items() if _is_prediction(r)
+        }
+        dates = [d for history, forecast in rows.values() for d in history['dates'] + forecast['dates']]
+        base, offsets = _epoch_offsets(dates)
+
+        columns = {'ticker': [], 'close': [], 'median': [], 'lower_bound': [], 'upper_bound': []}
+        for ticker, (history, forecast) in rows.items():
+            n_history, n_forecast = len(history['dates']), len(forecast['dates'])
+            columns['ticker'] += [ticker] * (n_history + n_forecast)
+            columns['close'] += history['close'] + [None] * n_forecast
+            for name in SERIES_FIELDS['predictions']:
+                columns[name] += [None] * n_history + forecast[name]
+
+        table = pa.table({
+            'ticker': pa.array(columns['ticker'], pa.string()).dictionary_encode(),
+            'offset': pa.array(offsets, pa.uint16()),
+            **{name: pa.array(columns[name], pa.float32()) for name in ('close',) + SERIES_FIELDS['predictions']},
+        }).replace_schema_metadata({
+            'epoch_day': str(base),
+            'response': json.dumps(response),
+        })
+
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+
+def available_renderers():
+    """JSON first (the default), then every compact encoding whose package is installed"""
+    renderers = [JSONRenderer]
+    if find_spec('msgpack') is not None:
+        renderers.append(MessagePackRenderer)
+    if find_spec('pyarrow') is not None:
+        renderers.append(ArrowRenderer)
+    return renderers
+
+
+PREDICT_RENDERERS = available_renderers()
+
+
+def negotiated_response(request, data, status):
+    """
+    Render data for a plain Django view in the encoding the client accepts
+
+    Returns:
+        HttpResponse (406 if the Accept header matches no available encoding)
+    """
+    renderers = [renderer() for renderer in PREDICT_RENDERERS]
+    try:
+        renderer, media_type = DefaultContentNegotiation().select_renderer(Request(request), renderers)
+    except NotAcceptable:
+        renderer, media_type, data, status = renderers[0], renderers[0].media_type, {
+            'error': f"Format tidak didukung. Pilihan: {', '.join(r.media_type for r in renderers)}"
+        }, 406
+
+    content_type = media_type if renderer.charset is None else f'{media_type}; charset={renderer.charset}'
+    return HttpResponse(renderer.render(data, media_type), status=status, content_type=content_type)
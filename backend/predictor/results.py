@@ -0,0 +1,87 @@
+"""
+Assemble prediction API responses from a quantile forecast (no torch required)
+"""
+from datetime import datetime, timedelta
+
+
+# Days of close prices returned alongside the forecast
+HISTORY_DAYS = 90
+
+
+def parse_target_date(target_date):
+    """Accept a datetime or a YYYY-MM-DD string"""
+    if isinstance(target_date, str):
+        return datetime.strptime(target_date, '%Y-%m-%d')
+    return target_date
+
+
+def check_horizon(target_date, last_date, max_prediction_length):
+    """Return the prediction horizon in days, or raise ValueError if it is out of range"""
+    prediction_horizon = (target_date - last_date).days
+
+    if prediction_horizon <= 0:
+        raise ValueError(f"Target date must be in the future. Last available date: {last_date.strftime('%Y-%m-%d')}")
+
+    if prediction_horizon > max_prediction_length:
+        raise ValueError(f"Prediction horizon ({prediction_horizon} days) exceeds maximum ({max_prediction_length} days)")
+
+    return prediction_horizon
+
+
+def build_prediction_result(ticker, df, last_date, target_date, prediction_horizon, quantiles):
+    """
+    Slice the quantile forecast up to the target date and assemble the API response
+
+    Args:
+        ticker: Ticker symbol
+        df: DataFrame with 'date' and 'close'; only the last HISTORY_DAYS rows are used
+        last_date: Last data date (pd.Timestamp)
+        target_date: Target date (datetime)
+        prediction_horizon: Days from last_date to target_date
+        quantiles: Array of shape [max_prediction_length, 7 quantiles]
+
+    Returns:
+        Dictionary containing predictions, historical prices and trend analysis
+    """
+    median_predictions = quantiles[:prediction_horizon, 3]
+    lower_bound = quantiles[:prediction_horizon, 1]
+    upper_bound = quantiles[:prediction_horizon, 5]
+
+    # Create prediction dates
+    prediction_dates = [last_date + timedelta(days=i+1) for i in range(prediction_horizon)]
+
+    # Prepare historical data
+    historical_df = df.tail(HISTORY_DAYS).copy()
+
+    # Calculate trend
+    last_price = df['close'].iloc[-1]
+    predicted_price = median_predictions[-1]
+    trend_pct = ((predicted_price - last_price) / last_price) * 100
+
+    return {
+        'success': True,
+        'ticker': ticker,
+        'target_date': target_date.strftime('%Y-%m-%d'),
+        'last_data_date': last_date.strftime('%Y-%m-%d'),
+        'prediction_horizon': prediction_horizon,
+        'predictions': {
+            'dates': [d.strftime('%Y-%m-%d') for d in prediction_dates],
+            'median': median_predictions.tolist(),
+            'lower_bound': lower_bound.tolist(),
+            'upper_bound': upper_bound.tolist(),
+        },
+        'historical': {
+            'dates': historical_df['date'].dt.strftime('%Y-%m-%d').tolist(),
+            'close': historical_df['close'].tolist(),
+        },
+        'analysis': {
+            'last_price': float(last_price),
+            'predicted_price': float(predicted_price),
+            'trend_percentage': float(trend_pct),
+            'trend_direction': 'NAIK' if trend_pct > 0 else 'TURUN',
+            'confidence_range': {
+                'lower': float(lower_bound[-1]),
+                'upper': float(upper_bound[-1]),
+            }
+        }
+    }
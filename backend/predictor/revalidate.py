@@ -0,0 +1,209 @@
+"""
+Stale-while-revalidate price refreshes behind a circuit breaker
+
+Requests never wait on the upstream once a ticker has stored bars: a stale ticker
+is answered from the PriceStore at once while a single background refresh runs
+(or, with PRICE_SCHEDULER enabled, until the next scheduled refresh).
+The circuit breaker stops calling an upstream that keeps failing and lets one
+probe through after a cool-down.
+"""
+import threading
+import time
+from datetime import datetime
+
+from .concurrency import SingleFlightExecutor
+from .metrics import metrics
+
+
+class DataUnavailableError(Exception):
+    """No stored bars for a ticker and the upstream could not provide them"""
+
+
+class CircuitOpenError(Exception):
+    """The upstream failed repeatedly and is not being called until the cool-down ends"""
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after failure_threshold consecutive failures; open -> half-open
+    after reset_timeout seconds, where a single probe call decides between closed
+    and open again
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=300, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = None
+        self.rejected = 0
+        self.trips = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go upstream now (claims the probe when half-open)"""
+        with self._lock:
+            if self.state == 'open' and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+            if self.state == 'closed':
+                return True
+            if self.state == 'half_open' and not self._probing:
+                self._probing = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    self.trips += 1
+                self.state = 'open'
+                self.opened_at = self.clock()
+            self._probing = False
+
+    def retry_in(self):
+        """Seconds until an open circuit lets a probe through (0 otherwise)"""
+        with self._lock:
+            if self.state != 'open':
+                return 0.0
+            return max(self.reset_timeout - (self.clock() - self.opened_at), 0.0)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'open': int(self.state == 'open'),
+                'consecutive_failures': self.failures,
+                'rejected': self.rejected,
+                'trips': self.trips,
+            }
+
+
+class PriceRefresher:
+    """
+    Refreshes a PriceStore in the background, one in-flight refresh per ticker
+
+    Args:
+        store: PriceStore to refresh
+        max_age: Seconds after the last successful refresh before a ticker is stale
+        breaker: CircuitBreaker guarding the store's fetcher
+        max_workers: Refreshes running at once (different tickers)
+        on_request: Refresh from ensure_fresh(); False when a scheduled job
+            (predictor.scheduler) owns all upstream traffic
+        due: Callable returning the Unix time a ticker must have been refreshed
+            since to count as fresh (default: max_age seconds ago)
+    """
+
+    def __init__(self, store, max_age, breaker=None, max_workers=2, on_request=True, due=None):
+        self.store = store
+        self.max_age = max_age
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.on_request = on_request
+        self.due = due if due is not None else (lambda: time.time() - self.max_age)
+        self._executor = SingleFlightExecutor(max_workers=max_workers, thread_name_prefix='price-refresh')
+
+    def refresh(self, ticker, end=None):
+        """
+        Refresh ticker in the calling thread
+
+        Args:
+            ticker: Ticker symbol
+            end: Exclusive end date passed to PriceStore.refresh (default: today)
+
+        Returns:
+            Number of bars appended
+
+        Raises:
+            CircuitOpenError: The upstream is in its cool-down
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError(
+                f"Price upstream unavailable, retrying in {self.breaker.retry_in():.0f}s"
+            )
+        try:
+            appended = self.store.refresh(ticker, end=end)
+        except Exception:
+            self.breaker.record_failure()
+            metrics.inc('tft_price_refresh_errors_total', ticker=ticker)
+            raise
+        self.breaker.record_success()
+        return appended
+
+    def schedule(self, ticker):
+        """Start a background refresh of ticker unless one is running; returns its future"""
+        return self._executor.submit(ticker, self._refresh_logged, ticker)
+
+    def _refresh_logged(self, ticker):
+        try:
+            appended = self.refresh(ticker)
+            print(f"📥 Price store refreshed for {ticker}: {appended} new bars")
+            return appended
+        except CircuitOpenError:
+            return 0
+        except Exception as e:
+            print(f"⚠️ Price store refresh failed for {ticker}: {str(e)}")
+            return 0
+
+    def is_stale(self, ticker):
+        refreshed = self.store.refreshed_at(ticker)
+        return refreshed is None or refreshed < self.due()
+
+    def ensure_fresh(self, ticker):
+        """
+        Make sure ticker can be served: refresh in the background when stale, and
+        only block when nothing is stored yet
+
+        Without on_request the stored bars are served as they are and the upstream
+        is never called here.
+
+        Raises:
+            DataUnavailableError: The store is empty and the upstream cannot be reached
+                (or is only called by the scheduled job)
+        """
+        if not self.on_request:
+            if self.store.last_date(ticker) is None:
+                raise DataUnavailableError(f"No stored data for {ticker} yet, waiting for the scheduled market-data refresh")
+            return
+        if not self.is_stale(ticker):
+            return
+        if self.store.last_date(ticker) is not None:
+            self.schedule(ticker)
+            return
+
+        # Cold start: concurrent requests wait on the same refresh
+        try:
+            appended = self._executor.submit(ticker, self.refresh, ticker).result()
+            print(f"📥 Price store initialized for {ticker}: {appended} bars")
+        except Exception as e:
+            raise DataUnavailableError(f"No stored data for {ticker} and the price upstream failed: {str(e)}") from e
+
+    def status(self, ticker):
+        """
+        Freshness of ticker's stored bars, reported with every prediction
+
+        Returns:
+            Dictionary with stale, refreshed_at, age_seconds and the upstream circuit state
+        """
+        refreshed = self.store.refreshed_at(ticker)
+        age = None if refreshed is None else max(time.time() - refreshed, 0.0)
+        return {
+            'stale': refreshed is None or refreshed < self.due(),
+            'refreshed_at': None if refreshed is None else datetime.fromtimestamp(refreshed).isoformat(timespec='seconds'),
+            'age_seconds': None if age is None else int(age),
+            'upstream': self.breaker.stats()['state'],
+        }
+
+    def stats(self):
+        return {**self.breaker.stats(), **{
+            f'refresh_{key}': value for key, value in self._executor.stats().items()
+        }}
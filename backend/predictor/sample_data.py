@@ -4,86 +4,103 @@ Utility to create sample/demo data when yfinance is not available
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import ta
+from .indicators import add_technical_indicators
 
 
-def create_sample_bbri_data(days=240):
+def _reflect(values, lower, upper):
+    """Fold values into [lower, upper] by reflecting at the bounds"""
+    width = upper - lower
+    folded = np.mod(values - lower, 2 * width)
+    return lower + width - np.abs(folded - width)
+
+
+def create_sample_prices(days=240, tickers=('BBRI.JK',), end_date=None, seed=42,
+                         base_price=5000, volatility=0.015, trend=0.0002, price_range=(4200, 5800)):
+    """
+    Generate daily OHLCV bars for one or more tickers in a single vectorized pass
+
+    Each ticker gets an independent random walk with drift over business days,
+    built with a cumulative product and kept inside price_range.
+
+    Args:
+        days: Number of business days per ticker
+        tickers: Ticker symbols to generate
+        end_date: Last bar date (defaults to yesterday)
+        seed: Seed for the local random generator (same seed, same data)
+        base_price: Starting price of every walk
+        volatility: Daily return standard deviation
+        trend: Daily drift
+        price_range: (lower, upper) bounds, or None to leave prices unbounded
+
+    Returns:
+        DataFrame with columns date, ticker, open, high, low, close, volume,
+        sorted by ticker then date
+    """
+    rng = np.random.default_rng(seed)
+    tickers = list(tickers)
+
+    if end_date is None:
+        end_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
+    # Business days ending at end_date (numpy's busday_offset is vectorized,
+    # unlike pd.bdate_range which builds the range in a Python loop)
+    last_day = np.busday_offset(np.datetime64(pd.Timestamp(end_date).date(), 'D'), 0, roll='backward')
+    dates = np.busday_offset(last_day, np.arange(1 - days, 1)).astype('datetime64[ns]')
+    shape = (len(tickers), days)
+
+    # Random walk with drift; the first bar of each ticker is base_price
+    returns = rng.normal(trend, volatility, size=shape)
+    returns[:, 0] = 0.0
+    close = base_price * np.cumprod(1 + returns, axis=1)
+
+    # Keep prices in a realistic range. Reflecting in log space keeps the walk
+    # moving instead of leaving flat stretches at the bounds like a plain clip
+    if price_range is not None:
+        lower, upper = np.log(price_range)
+        close = np.exp(_reflect(np.log(close), lower, upper))
+
+    open_ = close * (1 + rng.uniform(-0.005, 0.005, size=shape))
+    high = np.maximum.reduce([close * (1 + rng.uniform(0.005, 0.02, size=shape)), open_, close])
+    low = np.minimum.reduce([close * (1 + rng.uniform(-0.02, -0.005, size=shape)), open_, close])
+    volume = rng.integers(50000000, 200000000, size=shape)
+
+    return pd.DataFrame({
+        'date': np.tile(dates, len(tickers)),
+        'ticker': pd.Categorical.from_codes(np.repeat(np.arange(len(tickers)), days), categories=tickers),
+        'open': open_.ravel(),
+        'high': high.ravel(),
+        'low': low.ravel(),
+        'close': close.ravel(),
+        'volume': volume.ravel(),
+    })
+
+
+def create_sample_bbri_data(days=240, seed=42):
     """
     Create realistic sample BBRI stock data for demo purposes
     Data will end at yesterday (to allow predictions for today and future)
-    
+
     Args:
         days: Number of days of historical data to generate
-        
+        seed: Seed for the local random generator
+
     Returns:
         DataFrame with BBRI-like stock data
     """
-    # Set random seed for reproducibility
-    np.random.seed(42)
-    
-    # Generate dates BACKWARDS from yesterday (excluding weekends)
-    end_date = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=1)
-    dates = []
-    current_date = end_date
-    
-    # Go backwards until we have enough trading days
-    while len(dates) < days:
-        if current_date.weekday() < 5:  # Monday to Friday only
-            dates.insert(0, current_date)  # Insert at beginning
-        current_date -= timedelta(days=1)  # Go back one day
-    
-    # Generate realistic BBRI price data
     # BBRI typically trades around 4500-5500 IDR
-    base_price = 5000
-    volatility = 0.015  # 1.5% daily volatility
-    trend = 0.0002  # Slight upward trend
-    
-    prices = [base_price]
-    for i in range(1, len(dates)):
-        # Random walk with drift
-        change = np.random.normal(trend, volatility)
-        new_price = prices[-1] * (1 + change)
-        # Keep price in realistic range
-        new_price = max(4200, min(5800, new_price))
-        prices.append(new_price)
-    
-    # Create OHLCV data
-    df = pd.DataFrame({
-        'date': dates,
-        'open': [p * (1 + np.random.uniform(-0.005, 0.005)) for p in prices],
-        'high': [p * (1 + np.random.uniform(0.005, 0.02)) for p in prices],
-        'low': [p * (1 + np.random.uniform(-0.02, -0.005)) for p in prices],
-        'close': prices,
-        'volume': [np.random.randint(50000000, 200000000) for _ in prices]
-    })
-    
-    # Ensure high is highest and low is lowest
-    df['high'] = df[['open', 'high', 'close']].max(axis=1)
-    df['low'] = df[['open', 'low', 'close']].min(axis=1)
-    
+    df = create_sample_prices(days=days, seed=seed).drop(columns='ticker')
+
     # Add technical indicators
-    df['ma_7'] = df['close'].rolling(window=7).mean()
-    df['ma_30'] = df['close'].rolling(window=30).mean()
-    df['rsi'] = ta.momentum.RSIIndicator(close=df['close'], window=14).rsi()
-    
-    macd = ta.trend.MACD(close=df['close'])
-    df['macd'] = macd.macd()
-    df['macd_signal'] = macd.macd_signal()
-    
-    bollinger = ta.volatility.BollingerBands(close=df['close'], window=20, window_dev=2)
-    df['bb_upper'] = bollinger.bollinger_hband()
-    df['bb_middle'] = bollinger.bollinger_mavg()
-    df['bb_lower'] = bollinger.bollinger_lband()
-    
+    df = add_technical_indicators(df)
+
     # Add TFT-specific columns
     df['time_idx'] = range(len(df))
     df['series'] = 'BBRI'
     df['target'] = df['close']
-    
+
     # Remove NaN values
     df = df.dropna().reset_index(drop=True)
     df['time_idx'] = range(len(df))
-    
+
     return df
 
 
@@ -0,0 +1,287 @@
+"""
+Market-data refresh scheduled on the IDX trading calendar
+
+One job per session close: fetch the new bars for every configured ticker, extend
+the incremental indicator state, drop the forecasts computed from older bars and
+warm the new ones in a single batched forward pass. Between closes the scheduler
+sleeps. With PRICE_SCHEDULER enabled requests only read the PriceStore, so all
+upstream traffic comes from this job.
+"""
+import threading
+from datetime import datetime, timedelta
+
+import pandas as pd
+from django.conf import settings
+
+from .metrics import metrics
+from .trading_calendar import get_calendar
+
+
+SCHEDULER_MODES = ('off', 'in_process', 'sidecar')
+
+# Longest single sleep; the due time is re-checked after waking so a suspended
+# host or a clock change does not push a run back by a whole day
+MAX_SLEEP = 60 * 60  # seconds
+
+
+def last_scheduled_run(calendar, delay, now=None):
+    """When the latest scheduled refresh was due: the last close + delay at or before now"""
+    now = calendar.localize(now)
+    return calendar.previous_close(now - delay) + delay
+
+
+def next_scheduled_run(calendar, delay, now=None):
+    """When the next scheduled refresh is due: the first close + delay after now"""
+    now = calendar.localize(now)
+    return calendar.next_close(now - delay) + delay
+
+
+def refresh_delay():
+    return timedelta(minutes=settings.IDX_REFRESH_DELAY_MINUTES)
+
+
+def scheduler_mode():
+    mode = settings.PRICE_SCHEDULER
+    if mode not in SCHEDULER_MODES:
+        raise ValueError(f"Unknown PRICE_SCHEDULER '{mode}', expected one of {', '.join(SCHEDULER_MODES)}")
+    return mode
+
+
+class MarketDataJob:
+    """
+    Refresh, re-index and re-forecast a set of tickers
+
+    Args:
+        predictor: TFTPredictor whose price store, indicator state and forecast cache are updated
+        tickers: Tickers to refresh
+        warm: Run the new forecasts after refreshing (loads the model)
+        forecast_store: ForecastStore the new forecasts are written to (precomputed serving)
+        calendar: IDXCalendar deciding which session's bar is fetched (default: get_calendar())
+    """
+
+    def __init__(self, predictor, tickers, warm=True, forecast_store=None, calendar=None):
+        self.predictor = predictor
+        self.tickers = list(tickers)
+        self.warm = warm
+        self.forecast_store = forecast_store
+        self.calendar = calendar or get_calendar()
+
+    def stale_tickers(self):
+        """Tickers not refreshed since the refresher's due time"""
+        return [ticker for ticker in self.tickers if self.predictor.refresher.is_stale(ticker)]
+
+    def run(self, tickers=None, end=None):
+        """
+        Run the job once
+
+        Args:
+            tickers: Subset of self.tickers (default: all)
+            end: Exclusive end date of the fetch (default: through the latest closed session)
+
+        Returns:
+            Dictionary mapping ticker to {'appended', 'last_date', 'error'}
+        """
+        tickers = list(tickers or self.tickers)
+        # PriceStore.refresh defaults to today's midnight, which leaves out the bar
+        # of the session that closed today
+        end = end or self.calendar.fetch_end()
+        report = {ticker: {'appended': 0, 'last_date': None, 'error': None} for ticker in tickers}
+
+        # Upstream calls go through the refresher's circuit breaker
+        for ticker in tickers:
+            try:
+                report[ticker]['appended'] = self.predictor.refresher.refresh(ticker, end=end)
+                print(f"📥 Price store refreshed for {ticker}: {report[ticker]['appended']} new bars")
+            except Exception as e:
+                report[ticker]['error'] = str(e)
+                print(f"⚠️ Price store refresh failed for {ticker}: {str(e)}")
+
+        # Extends the incremental indicator state by the new bars
+        frames = {}
+        for ticker in tickers:
+            try:
+                df = self.predictor.fetch_and_prepare_data(ticker=ticker)
+            except Exception as e:
+                report[ticker]['error'] = report[ticker]['error'] or str(e)
+                continue
+            last_date = pd.to_datetime(df['date'].iloc[-1])
+            report[ticker]['last_date'] = last_date.strftime('%Y-%m-%d')
+            frames[ticker] = (df, last_date)
+
+        # Forecasts from older bars can no longer be requested; free their cache slots
+        current = {ticker: last_date.strftime('%Y-%m-%d') for ticker, (_, last_date) in frames.items()}
+        dropped = self.predictor.forecast_cache.discard(
+            lambda key: key[0] in current and key[1] != current[key[0]]
+        )
+        if dropped:
+            print(f"✓ Dropped {dropped} outdated cached forecasts")
+
+        if self.warm and frames:
+            if self.predictor.model is None:
+                self.predictor.load_model()
+            # One batched forward pass for every ticker
+            forecasts = self.predictor._get_quantile_forecasts(frames)
+            if self.forecast_store is not None:
+                for ticker, (df, last_date) in frames.items():
+                    self.forecast_store.save(ticker, (df, last_date, forecasts[ticker]), self.predictor.weights_hash)
+            print(f"✓ Forecasts warmed for {', '.join(forecasts)}")
+
+        metrics.inc('tft_market_data_jobs_total')
+        return report
+
+
+class MarketDataScheduler:
+    """
+    Runs a MarketDataJob delay after every IDX session close and sleeps in between
+
+    A ticker whose bar for the close is not published yet is retried every
+    retry_interval, at most max_retries times, then left for the next close.
+
+    Args:
+        job: MarketDataJob to run
+        calendar: IDXCalendar
+        delay: Time after the close before the job runs
+        retry_interval: Wait between retries of tickers still missing the close's bar
+        max_retries: Retries per close
+        clock: Callable returning the current aware datetime (tests)
+    """
+
+    def __init__(self, job, calendar, delay=timedelta(minutes=30),
+                 retry_interval=timedelta(minutes=15), max_retries=4, clock=None):
+        self.job = job
+        self.calendar = calendar
+        self.delay = delay
+        self.retry_interval = retry_interval
+        self.max_retries = max_retries
+        self.clock = clock or (lambda: datetime.now(calendar.tz))
+        self.runs = 0
+        self.failures = 0
+        self.last_run = None
+        self.last_report = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def last_due(self, now=None):
+        return last_scheduled_run(self.calendar, self.delay, now or self.clock())
+
+    def next_due(self, now=None):
+        return next_scheduled_run(self.calendar, self.delay, now or self.clock())
+
+    def run_once(self):
+        """
+        Run the job for the latest close, retrying tickers that lack its bar
+
+        Returns:
+            The merged per-ticker report of all attempts
+        """
+        close = self.calendar.previous_close(self.clock() - self.delay)
+        session = close.strftime('%Y-%m-%d')
+        end = self.calendar.fetch_end(close)
+        report = {}
+        tickers = None
+        for attempt in range(self.max_retries + 1):
+            report.update(self.job.run(tickers, end=end))
+            tickers = [
+                ticker for ticker, outcome in report.items()
+                if outcome['last_date'] is None or outcome['last_date'] < session
+            ]
+            if not tickers or attempt == self.max_retries:
+                break
+            print(f"⚠️ No {session} bar yet for {', '.join(tickers)}, "
+                  f"retrying in {self.retry_interval.total_seconds() / 60:.0f} min")
+            if self._stop.wait(self.retry_interval.total_seconds()):
+                break
+
+        self.runs += 1
+        self.last_run = self.clock()
+        self.last_report = report
+        return report
+
+    def _run_logged(self):
+        try:
+            self.run_once()
+        except Exception as e:
+            # Keep the schedule; requests go on serving the stored bars
+            self.failures += 1
+            print(f"❌ Market data job failed: {str(e)}")
+
+    def serve_forever(self):
+        """Catch up if the store missed the last close, then run after every close until stop()"""
+        if self.job.stale_tickers():
+            self._run_logged()
+
+        due = self.next_due()
+        print(f"✓ Next market data refresh at {due.isoformat(timespec='minutes')}")
+        while True:
+            wait = min(max((due - self.clock()).total_seconds(), 0.0), MAX_SLEEP)
+            if self._stop.wait(wait):
+                return
+            if self.clock() >= due:
+                self._run_logged()
+                due = self.next_due()
+                print(f"✓ Next market data refresh at {due.isoformat(timespec='minutes')}")
+
+    def start(self):
+        """Run serve_forever() in a daemon thread"""
+        self._thread = threading.Thread(target=self.serve_forever, name='market-data-scheduler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self):
+        return {
+            'runs': self.runs,
+            'failures': self.failures,
+            'last_run': None if self.last_run is None else self.last_run.isoformat(timespec='seconds'),
+            'next_run': self.next_due().isoformat(timespec='seconds'),
+        }
+
+
+def create_scheduler(predictor, warm=True, forecast_store=None, clock=None):
+    """MarketDataScheduler for PREDICTOR_TICKERS configured from settings"""
+    calendar = get_calendar()
+    return MarketDataScheduler(
+        MarketDataJob(predictor, settings.PREDICTOR_TICKERS, warm=warm, forecast_store=forecast_store, calendar=calendar),
+        calendar,
+        delay=refresh_delay(),
+        retry_interval=timedelta(minutes=settings.IDX_REFRESH_RETRY_MINUTES),
+        max_retries=settings.IDX_REFRESH_MAX_RETRIES,
+        clock=clock,
+    )
+
+
+# In-process scheduler (PRICE_SCHEDULER = 'in_process')
+_scheduler = None
+
+
+def start_scheduler():
+    """Start the in-process scheduler for the global predictor (once)"""
+    global _scheduler
+    if _scheduler is None:
+        from .model import get_predictor
+        _scheduler = create_scheduler(get_predictor()).start()
+    return _scheduler
+
+
+def get_scheduler():
+    return _scheduler
+
+
+def schedule_status():
+    """Refresh schedule for the health endpoint"""
+    mode = scheduler_mode()
+    if mode == 'off':
+        return {'mode': mode}
+    if _scheduler is not None:
+        return {'mode': mode, 'holidays_through': _scheduler.calendar.holidays_through(), **_scheduler.stats()}
+    calendar, delay = get_calendar(), refresh_delay()
+    return {
+        'mode': mode,
+        'holidays_through': calendar.holidays_through(),
+        'last_due': last_scheduled_run(calendar, delay).isoformat(timespec='seconds'),
+        'next_run': next_scheduled_run(calendar, delay).isoformat(timespec='seconds'),
+    }
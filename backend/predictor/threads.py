@@ -0,0 +1,144 @@
+"""
+Per-worker torch/OpenMP/MKL thread configuration
+
+Every gunicorn/uvicorn worker loads its own torch. With default settings each
+one starts a thread per core, so N workers on one machine run N x cores threads
+for small matmuls and slow each other down. The cores are divided between the
+worker processes instead.
+"""
+import os
+import sys
+import threading
+from django.conf import settings
+
+
+# Environment variables read by the OpenMP/MKL/OpenBLAS runtimes when they load
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS')
+
+_config = None
+_is_worker = False
+_config_lock = threading.Lock()
+
+
+def available_cpus():
+    """CPUs this process may run on (respects taskset/cgroup CPU affinity)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # Not available on Windows/macOS
+        return os.cpu_count() or 1
+
+
+def plan_threads(workers, cpus, threads=None, interop_threads=None):
+    """
+    Decide the thread counts for one worker process
+
+    Args:
+        workers: Worker processes sharing the machine
+        cpus: CPUs available to the workers
+        threads: Fixed intra-op thread count (None = cpus // workers)
+        interop_threads: Fixed inter-op thread count (None = 1)
+
+    Returns:
+        Dictionary with workers, cpus, threads, interop_threads
+    """
+    workers = max(int(workers), 1)
+    return {
+        'workers': workers,
+        'cpus': cpus,
+        'threads': max(int(threads or cpus // workers), 1),
+        'interop_threads': max(int(interop_threads or 1), 1),
+    }
+
+
+def _plan_from_settings():
+    return plan_threads(
+        settings.PREDICTOR_WORKER_PROCESSES,
+        available_cpus(),
+        settings.PREDICTOR_TORCH_THREADS or os.environ.get('OMP_NUM_THREADS'),
+        settings.PREDICTOR_TORCH_INTEROP_THREADS,
+    )
+
+
+def configure_threads(apply_torch=None):
+    """
+    Apply the thread plan from settings to this process (once)
+
+    OMP/MKL/OpenBLAS variables only take effect for runtimes loaded afterwards, so
+    call this before torch is imported; variables already set by the operator win.
+
+    Args:
+        apply_torch: Also import torch and set its intra-/inter-op thread pools
+            (default: unless PREDICTOR_INFERENCE_MODE is 'onnx')
+
+    Returns:
+        The applied configuration (see thread_config())
+    """
+    global _config
+    if apply_torch is None:
+        apply_torch = settings.PREDICTOR_INFERENCE_MODE != 'onnx'
+    with _config_lock:
+        if _config is not None and (_config['torch'] is not None or not apply_torch):
+            return _config
+
+        plan = _plan_from_settings()
+        for name in THREAD_ENV_VARS:
+            os.environ.setdefault(name, str(plan['threads']))
+        plan['env'] = {name: os.environ[name] for name in THREAD_ENV_VARS}
+        plan['torch'] = _configure_torch(plan) if apply_torch else None
+
+        _config = plan
+        return _config
+
+
+def configure_worker_threads():
+    """
+    Re-apply the thread plan in a worker forked from a preloaded gunicorn master
+
+    Called from the post_fork hook in gunicorn.conf.py.
+    """
+    global _config, _is_worker
+    with _config_lock:
+        _config = None
+        _is_worker = True
+    return configure_threads()
+
+
+def inference_threads(plan=None):
+    """Intra-op threads for the inference runtime (torch or onnxruntime) of this process"""
+    # A preloading master only runs the warm-up pass single-threaded: thread pools
+    # started before fork() are not usable in the children
+    if settings.PREDICTOR_PRELOAD and not _is_worker:
+        return 1
+    return (plan or _config or _plan_from_settings())['threads']
+
+
+def _configure_torch(plan):
+    import torch
+
+    torch.set_num_threads(inference_threads(plan))
+    try:
+        if torch.get_num_interop_threads() != plan['interop_threads']:
+            torch.set_num_interop_threads(plan['interop_threads'])
+    except RuntimeError as e:
+        # Only possible before the first inter-op parallel work in this process
+        print(f"⚠️ Could not set torch inter-op threads: {str(e)}")
+
+    print(f"⚡ Torch threads: {torch.get_num_threads()} intra-op, {torch.get_num_interop_threads()} inter-op "
+          f"({plan['cpus']} CPUs / {plan['workers']} workers)")
+    return {
+        'num_threads': torch.get_num_threads(),
+        'num_interop_threads': torch.get_num_interop_threads(),
+    }
+
+
+def thread_config():
+    """Thread settings of this process for the health endpoint"""
+    config = dict(_config) if _config is not None else _plan_from_settings()
+    config['pid'] = os.getpid()
+    if 'torch' in sys.modules:
+        torch = sys.modules['torch']
+        config['torch'] = {
+            'num_threads': torch.get_num_threads(),
+            'num_interop_threads': torch.get_num_interop_threads(),
+        }
+    return config
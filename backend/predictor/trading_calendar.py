@@ -0,0 +1,112 @@
+"""
+IDX (Indonesia Stock Exchange) trading calendar
+
+Regular sessions run Monday to Friday and end with the pre-closing session at
+16:00 WIB (Asia/Jakarta, UTC+7, no daylight saving). Exchange holidays follow the
+yearly IDX announcement (national holidays plus cuti bersama); closures missing
+from IDX_HOLIDAYS can be added with settings.IDX_EXTRA_HOLIDAYS.
+
+IDX_HOLIDAYS has to be extended here every year once IDX publishes the next
+year's calendar (usually in the fourth quarter). For a year without any holiday
+data every weekday counts as a trading day, so the calendar prints a warning the
+first time such a year is queried and the health endpoint reports the last year
+covered (price_schedule.holidays_through).
+"""
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+
+JAKARTA = ZoneInfo('Asia/Jakarta')
+
+# End of the pre-closing session, the last trade of the day
+SESSION_CLOSE = time(16, 0)
+
+# Exchange holidays (hari libur bursa), from the IDX trading calendar
+IDX_HOLIDAYS = (
+    # 2025
+    '2025-01-01', '2025-01-27', '2025-01-28', '2025-01-29', '2025-03-28',
+    '2025-03-31', '2025-04-01', '2025-04-02', '2025-04-03', '2025-04-04',
+    '2025-04-07', '2025-04-18', '2025-05-01', '2025-05-12', '2025-05-13',
+    '2025-05-29', '2025-05-30', '2025-06-06', '2025-06-09', '2025-06-27',
+    '2025-08-18', '2025-09-05', '2025-12-25', '2025-12-26', '2025-12-31',
+    # 2026
+    '2026-01-01', '2026-01-16', '2026-02-16', '2026-02-17', '2026-03-18',
+    '2026-03-19', '2026-03-20', '2026-03-23', '2026-03-24', '2026-04-03',
+    '2026-05-01', '2026-05-14', '2026-05-15', '2026-05-27', '2026-05-28',
+    '2026-06-01', '2026-06-16', '2026-08-17', '2026-08-25', '2026-12-24',
+    '2026-12-25', '2026-12-31',
+)
+
+
+class IDXCalendar:
+    """
+    Trading days and session closes of the IDX
+
+    Args:
+        holidays: Exchange holidays as dates or YYYY-MM-DD strings
+        close: Session close (wall-clock time in tz)
+        tz: Exchange time zone
+    """
+
+    def __init__(self, holidays=IDX_HOLIDAYS, close=SESSION_CLOSE, tz=JAKARTA):
+        self.holidays = {date.fromisoformat(d) if isinstance(d, str) else d for d in holidays}
+        self.close = close
+        self.tz = tz
+        # Years with holiday data; any other year only knows about weekends
+        self.years = {day.year for day in self.holidays}
+        self.missing_years = set()
+
+    def is_trading_day(self, day):
+        if day.year not in self.years and day.year not in self.missing_years:
+            self.missing_years.add(day.year)
+            print(f"⚠️ No IDX holiday data for {day.year}: every weekday counts as a trading day. "
+                  f"Add the year's exchange holidays to predictor/trading_calendar.py IDX_HOLIDAYS "
+                  f"(or settings.IDX_EXTRA_HOLIDAYS)")
+        return day.weekday() < 5 and day not in self.holidays
+
+    def holidays_through(self):
+        """Last year with holiday data (None without any)"""
+        return max(self.years, default=None)
+
+    def trading_days(self, start, end):
+        """Trading days in [start, end]"""
+        days = (start + timedelta(days=i) for i in range((end - start).days + 1))
+        return [day for day in days if self.is_trading_day(day)]
+
+    def session_close(self, day):
+        """Close of day's session as an aware datetime"""
+        return datetime.combine(day, self.close, tzinfo=self.tz)
+
+    def localize(self, now):
+        # Naive datetimes are server-local time, like datetime.now()
+        return (now or datetime.now(self.tz)).astimezone(self.tz)
+
+    def previous_close(self, now=None):
+        """Latest session close at or before now"""
+        now = self.localize(now)
+        day = now.date()
+        while not self.is_trading_day(day) or self.session_close(day) > now:
+            day -= timedelta(days=1)
+        return self.session_close(day)
+
+    def next_close(self, now=None):
+        """Earliest session close after now"""
+        now = self.localize(now)
+        day = now.date()
+        while not self.is_trading_day(day) or self.session_close(day) <= now:
+            day += timedelta(days=1)
+        return self.session_close(day)
+
+    def fetch_end(self, now=None):
+        """
+        Exclusive end date (naive midnight, as PriceStore.refresh takes it) of a
+        fetch that includes the bar of the latest session closed at or before now
+        """
+        day = self.previous_close(now).date() + timedelta(days=1)
+        return datetime.combine(day, time())
+
+
+def get_calendar():
+    """IDX calendar including settings.IDX_EXTRA_HOLIDAYS"""
+    from django.conf import settings
+    return IDXCalendar(holidays=IDX_HOLIDAYS + tuple(settings.IDX_EXTRA_HOLIDAYS))
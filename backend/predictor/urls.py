@@ -1,7 +1,10 @@
 from django.urls import path
-from .views import PredictStockView, HealthCheckView
+from .views import PredictStockView, AsyncPredictStockView, BatchPredictView, HealthCheckView, MetricsView
 
 urlpatterns = [
     path('predict/', PredictStockView.as_view(), name='predict'),
+    path('predict/async/', AsyncPredictStockView.as_view(), name='predict-async'),
+    path('predict/batch/', BatchPredictView.as_view(), name='predict-batch'),
     path('health/', HealthCheckView.as_view(), name='health'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
 ]
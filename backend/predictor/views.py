@@ -1,9 +1,18 @@
 """
 Django REST Framework views for stock prediction
 """
+import asyncio
+import json
+from concurrent.futures import as_completed
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
 from datetime import datetime
 from bokeh.plotting import figure
 from bokeh.models import HoverTool, Range1d, Band, ColumnDataSource
@@ -11,18 +20,165 @@ from bokeh.embed import json_item
 import pandas as pd
 import numpy as np
 
-from .model import get_predictor
+from .cache import ForecastCache
+from .concurrency import get_inference_executor
+from .metrics import metrics, render_cache_stats, render_stats
+from .renderers import PREDICT_RENDERERS, negotiated_response
+from .revalidate import DataUnavailableError
+from .scheduler import schedule_status
+from .forecast_store import get_forecast_predictor
+from .threads import thread_config
+
+
+# 'server' returns a ready-made Bokeh JSON item, 'client' only the raw arrays
+CHART_MODES = ('server', 'client')
+
+# Bokeh JSON per (ticker, data date, target date, forecast values)
+chart_cache = ForecastCache(max_size=settings.BOKEH_CHART_CACHE_SIZE, ttl=settings.FORECAST_CACHE_TTL)
+
+
+def get_serving_predictor():
+    """Predictor for the request path, according to PREDICTOR_SERVING_MODE"""
+    if settings.PREDICTOR_SERVING_MODE == 'precomputed':
+        return get_forecast_predictor()
+    
+    # Imported lazily so precomputed mode never loads torch
+    from .model import get_predictor
+    return get_predictor()
 
 
 class HealthCheckView(APIView):
     """Health check endpoint"""
     
     def get(self, request):
-        return Response({
+        health = {
             'status': 'healthy',
             'service': 'BBRI Stock Prediction API',
-            'version': '1.0.0'
-        })
+            'version': '1.0.0',
+            'mode': settings.PREDICTOR_SERVING_MODE,
+            'threads': thread_config(),
+        }
+        predictor = get_serving_predictor()
+        if settings.PREDICTOR_SERVING_MODE == 'precomputed':
+            health['forecasts'] = predictor.store.describe(settings.PREDICTOR_TICKERS)
+        else:
+            health['inference'] = {
+                'batcher': predictor.batcher.stats(),
+                'executor': get_inference_executor().stats(),
+            }
+            health['price_upstream'] = predictor.refresher.stats()
+            health['price_schedule'] = schedule_status()
+        return Response(health)
+
+
+class MetricsView(APIView):
+    """Prometheus scrape endpoint: stage latency histograms, cache and fallback counters"""
+    
+    def get(self, request):
+        parts = [
+            metrics.render(),
+            render_cache_stats('tft_chart_cache', chart_cache.stats(), 'Serialized Bokeh chart cache'),
+        ]
+        
+        if settings.PREDICTOR_SERVING_MODE == 'live':
+            predictor = get_serving_predictor()
+            batcher = predictor.batcher.stats()
+            parts += [
+                render_cache_stats('tft_forecast_cache', predictor.forecast_cache.stats(), 'Quantile forecast cache'),
+                render_stats('tft_batcher', batcher, counters=('batches', 'items', 'failures'),
+                             help_text='Micro-batching scheduler'),
+                render_stats('tft_executor', get_inference_executor().stats(), counters=('submitted', 'coalesced'),
+                             help_text='Async inference executor'),
+                render_stats('tft_price_upstream', predictor.refresher.stats(),
+                             counters=('rejected', 'trips', 'refresh_submitted', 'refresh_coalesced'),
+                             help_text='Price upstream circuit breaker and background refreshes'),
+            ]
+        
+        return HttpResponse(''.join(parts), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def parse_predict_request(data):
+    """
+    Validate a predict request body
+    
+    Args:
+        data: Parsed JSON body
+        
+    Returns:
+        Tuple of (target_date, list of tickers, whether a tickers list was given)
+        
+    Raises:
+        ValueError: With the message returned to the client
+    """
+    # Get target date from request
+    target_date_str = data.get('target_date')
+    
+    if not target_date_str:
+        raise ValueError('Parameter target_date diperlukan (format: YYYY-MM-DD)')
+    
+    # Validate date format
+    try:
+        target_date = datetime.strptime(target_date_str, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        raise ValueError('Format tanggal tidak valid. Gunakan format: YYYY-MM-DD')
+    
+    # Validate tickers
+    tickers = data.get('tickers')
+    if tickers is not None and not isinstance(tickers, list):
+        raise ValueError('Parameter tickers harus berupa list, contoh: ["BBRI.JK", "BMRI.JK"]')
+    
+    requested = tickers or [data.get('ticker') or settings.PREDICTOR_TICKERS[0]]
+    unsupported = [t for t in requested if t not in settings.PREDICTOR_TICKERS]
+    if unsupported:
+        raise ValueError(f"Ticker tidak didukung: {', '.join(map(str, unsupported))}. Pilihan: {', '.join(settings.PREDICTOR_TICKERS)}")
+    
+    return target_date, list(dict.fromkeys(requested)), tickers is not None
+
+
+def parse_batch_request(data):
+    """
+    Validate a streaming batch request body
+    
+    Args:
+        data: Parsed JSON body
+        
+    Returns:
+        Tuple of (list of (index, ticker, target_date) for valid items, list of error
+        lines for invalid items, whether to include the price history)
+        
+    Raises:
+        ValueError: When the body itself is malformed (returned as 400)
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Body harus berupa objek JSON dengan parameter requests')
+    items = data.get('requests')
+    if not isinstance(items, list) or not items:
+        raise ValueError('Parameter requests diperlukan, contoh: [{"ticker": "BBRI.JK", "target_date": "2025-12-31"}]')
+    if len(items) > settings.PREDICTOR_STREAM_MAX_ITEMS:
+        raise ValueError(f"Maksimal {settings.PREDICTOR_STREAM_MAX_ITEMS} permintaan per batch, diterima {len(items)}")
+    
+    valid, errors = [], []
+    for index, item in enumerate(items):
+        try:
+            if not isinstance(item, dict):
+                raise ValueError('Setiap permintaan harus berupa objek dengan ticker dan target_date')
+            target_date, (ticker,), _ = parse_predict_request({
+                'target_date': item.get('target_date'),
+                'ticker': item.get('ticker'),
+            })
+            valid.append((index, ticker, target_date))
+        except ValueError as e:
+            errors.append({'index': index, 'success': False, 'error': str(e)})
+    
+    return valid, errors, bool(data.get('include_history', False))
+
+
+def parse_chart_mode(data):
+    """Validate the optional chart parameter (defaults to 'server')"""
+    chart = data.get('chart', 'server')
+    if chart not in CHART_MODES:
+        raise ValueError('Parameter chart harus "server" atau "client"')
+    return chart
 
 
 class PredictStockView(APIView):
@@ -31,37 +187,43 @@ class PredictStockView(APIView):
     
     POST /api/predict/
     Body: {
-        "target_date": "2025-12-31"  // Format: YYYY-MM-DD
+        "target_date": "2025-12-31",  // Format: YYYY-MM-DD
+        "ticker": "BBRI.JK",          // Optional, defaults to BBRI.JK
+        "chart": "server"             // Optional, "client" omits bokeh_plot
     }
+    
+    Multiple tickers are forecast in one batched forward pass:
+    Body: {
+        "target_date": "2025-12-31",
+        "tickers": ["BBRI.JK", "BMRI.JK", "BBCA.JK"]
+    }
+    
+    Accept: application/msgpack or application/vnd.apache.arrow.stream returns the
+    compact encodings from predictor.renderers instead of JSON.
     """
+    renderer_classes = PREDICT_RENDERERS
     
     def post(self, request):
         try:
-            # Get target date from request
-            target_date_str = request.data.get('target_date')
+            target_date, requested, is_batch = parse_predict_request(request.data)
+            chart = parse_chart_mode(request.data)
             
-            if not target_date_str:
-                return Response({
-                    'error': 'Parameter target_date diperlukan (format: YYYY-MM-DD)'
-                }, status=status.HTTP_400_BAD_REQUEST)
+            # Get predictor and make prediction
+            predictor = get_serving_predictor()
             
-            # Validate date format
-            try:
-                target_date = datetime.strptime(target_date_str, '%Y-%m-%d')
-            except ValueError:
+            if is_batch:
+                results = predictor.predict_many(target_date, requested)
                 return Response({
-                    'error': 'Format tanggal tidak valid. Gunakan format: YYYY-MM-DD'
-                }, status=status.HTTP_400_BAD_REQUEST)
-            
-            # Get predictor and make prediction
-            predictor = get_predictor()
-            result = predictor.predict(target_date)
+                    'success': True,
+                    'target_date': target_date.strftime('%Y-%m-%d'),
+                    'results': results,
+                }, status=status.HTTP_200_OK)
             
-            # Create Bokeh visualization
-            bokeh_plot = self._create_bokeh_plot(result)
+            result = predictor.predict(target_date, ticker=requested[0])
             
-            # Add bokeh plot to result
-            result['bokeh_plot'] = bokeh_plot
+            # Add Bokeh visualization unless the client draws the chart itself
+            if chart == 'server':
+                result['bokeh_plot'] = self._get_bokeh_plot(result)
             
             return Response(result, status=status.HTTP_200_OK)
             
@@ -70,12 +232,37 @@ class PredictStockView(APIView):
                 'error': str(e)
             }, status=status.HTTP_400_BAD_REQUEST)
             
+        except DataUnavailableError as e:
+            return Response({
+                'error': f'Data pasar tidak tersedia: {str(e)}'
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            
         except Exception as e:
             return Response({
                 'error': f'Terjadi kesalahan: {str(e)}'
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
-    def _create_bokeh_plot(self, prediction_data):
+    @classmethod
+    def _get_bokeh_plot(cls, prediction_data):
+        """Bokeh JSON for prediction_data, built once per forecast and target date"""
+        predictions = prediction_data['predictions']
+        key = (
+            prediction_data['ticker'],
+            prediction_data['last_data_date'],
+            prediction_data['target_date'],
+            tuple(predictions['median']),
+            tuple(predictions['lower_bound']),
+            tuple(predictions['upper_bound']),
+        )
+        plot = chart_cache.get(key)
+        if plot is None:
+            with metrics.span('plot'):
+                plot = cls._create_bokeh_plot(prediction_data)
+            chart_cache.set(key, plot)
+        return plot
+    
+    @staticmethod
+    def _create_bokeh_plot(prediction_data):
         """
         Create interactive Bokeh plot with confidence intervals
         
@@ -97,7 +284,7 @@ class PredictStockView(APIView):
             
             # Create figure
             p = figure(
-                title="Prediksi Harga Saham BBRI",
+                title=f"Prediksi Harga Saham {prediction_data['ticker'].split('.')[0]}",
                 x_axis_type='datetime',
                 width=1000,
                 height=500,
@@ -116,12 +303,10 @@ class PredictStockView(APIView):
                 alpha=0.8
             )
             
-            # Historical data circles for hover
+            # Historical data circles for hover (tooltips format on the client)
             hist_source = ColumnDataSource(data=dict(
                 date=hist_dates,
                 price=hist_prices,
-                date_formatted=[d.strftime('%d %b %Y') for d in hist_dates],
-                price_formatted=[f"Rp {p:,.0f}" for p in hist_prices]
             ))
             
             hist_circles = p.circle(
@@ -149,10 +334,6 @@ class PredictStockView(APIView):
                 median=pred_median,
                 lower=pred_lower,
                 upper=pred_upper,
-                date_formatted=[d.strftime('%d %b %Y') for d in pred_dates],
-                median_formatted=[f"Rp {p:,.0f}" for p in pred_median],
-                lower_formatted=[f"Rp {p:,.0f}" for p in pred_lower],
-                upper_formatted=[f"Rp {p:,.0f}" for p in pred_upper]
             ))
             
             pred_circles = p.circle(
@@ -164,18 +345,12 @@ class PredictStockView(APIView):
                 alpha=0.8
             )
             
-            # Confidence interval (shaded area)
-            band_source = ColumnDataSource(data=dict(
-                date=pred_dates,
-                lower=pred_lower,
-                upper=pred_upper
-            ))
-            
+            # Confidence interval (shaded area), drawn from the prediction source
             band = Band(
                 base='date',
                 lower='lower',
                 upper='upper',
-                source=band_source,
+                source=pred_source,
                 level='underlay',
                 fill_alpha=0.3,
                 fill_color='#3498DB',
@@ -190,20 +365,22 @@ class PredictStockView(APIView):
             hist_hover = HoverTool(
                 renderers=[hist_circles],
                 tooltips=[
-                    ("Tanggal", "@date_formatted"),
-                    ("Harga", "@price_formatted"),
+                    ("Tanggal", "@date{%d %b %Y}"),
+                    ("Harga", "Rp @price{0,0}"),
                 ],
+                formatters={'@date': 'datetime'},
                 mode='mouse'
             )
             
             pred_hover = HoverTool(
                 renderers=[pred_circles],
                 tooltips=[
-                    ("Tanggal", "@date_formatted"),
-                    ("Prediksi", "@median_formatted"),
-                    ("Rentang Bawah (10%)", "@lower_formatted"),
-                    ("Rentang Atas (90%)", "@upper_formatted"),
+                    ("Tanggal", "@date{%d %b %Y}"),
+                    ("Prediksi", "Rp @median{0,0}"),
+                    ("Rentang Bawah (10%)", "Rp @lower{0,0}"),
+                    ("Rentang Atas (90%)", "Rp @upper{0,0}"),
                 ],
+                formatters={'@date': 'datetime'},
                 mode='mouse'
             )
             
@@ -246,3 +423,167 @@ class PredictStockView(APIView):
         except Exception as e:
             print(f"❌ Error creating Bokeh plot: {str(e)}")
             raise
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class AsyncPredictStockView(View):
+    """
+    Async prediction endpoint for ASGI deployments (bbri_backend.asgi)
+    
+    POST /api/predict/async/
+    Same body, response and encodings as /api/predict/. Blocking torch work runs on the bounded
+    inference executor, and concurrent requests for the same (ticker, data date)
+    wait on a single in-flight forecast.
+    """
+    
+    async def post(self, request):
+        try:
+            try:
+                data = json.loads(request.body or b'{}')
+            except json.JSONDecodeError:
+                raise ValueError('Body harus berupa JSON')
+            
+            target_date, requested, is_batch = parse_predict_request(data)
+            chart = parse_chart_mode(data)
+            
+            outcomes = await asyncio.gather(
+                *(self._predict(target_date, ticker) for ticker in requested),
+                return_exceptions=True,
+            )
+            
+            if is_batch:
+                results = {}
+                for ticker, outcome in zip(requested, outcomes):
+                    if isinstance(outcome, (ValueError, DataUnavailableError)):
+                        results[ticker] = {'success': False, 'ticker': ticker, 'error': str(outcome)}
+                    elif isinstance(outcome, Exception):
+                        raise outcome
+                    else:
+                        results[ticker] = outcome
+                return negotiated_response(request, {
+                    'success': True,
+                    'target_date': target_date.strftime('%Y-%m-%d'),
+                    'results': results,
+                }, status=status.HTTP_200_OK)
+            
+            result = outcomes[0]
+            if isinstance(result, Exception):
+                raise result
+            
+            # Create Bokeh visualization off the event loop
+            if chart == 'server':
+                result['bokeh_plot'] = await sync_to_async(
+                    PredictStockView._get_bokeh_plot, thread_sensitive=False
+                )(result)
+            
+            return negotiated_response(request, result, status=status.HTTP_200_OK)
+            
+        except ValueError as e:
+            return negotiated_response(request, {
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+            
+        except DataUnavailableError as e:
+            return negotiated_response(request, {
+                'error': f'Data pasar tidak tersedia: {str(e)}'
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+            
+        except Exception as e:
+            return negotiated_response(request, {
+                'error': f'Terjadi kesalahan: {str(e)}'
+            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    @staticmethod
+    async def _predict(target_date, ticker):
+        predictor = get_serving_predictor()
+        if settings.PREDICTOR_SERVING_MODE == 'precomputed':
+            # A store lookup, cheap enough to run on the event loop
+            return predictor.predict(target_date, ticker)
+        
+        key = (ticker, predictor.data_date(ticker))
+        future = get_inference_executor().submit(key, predictor.forecast, ticker)
+        forecast = await asyncio.wrap_future(future)
+        return predictor.predict_from_forecast(target_date, ticker, forecast)
+
+
+class BatchPredictView(APIView):
+    """
+    Streaming batch prediction endpoint
+    
+    POST /api/predict/batch/
+    Body: {
+        "requests": [
+            {"ticker": "BBRI.JK", "target_date": "2025-12-31"},
+            {"ticker": "BMRI.JK", "target_date": "2026-01-05"}
+        ],
+        "include_history": false  // Optional, adds the 90-day close history to every line
+    }
+    
+    Responds with newline-delimited JSON (application/x-ndjson), one line per request
+    item tagged with its "index", in completion order. Items are grouped by
+    (ticker, data date) so each group runs one forecast, shared by all its target dates.
+    """
+    
+    def post(self, request):
+        try:
+            items, errors, include_history = parse_batch_request(request.data)
+        except ValueError as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        response = StreamingHttpResponse(
+            self._stream(get_serving_predictor(), items, errors, include_history),
+            content_type='application/x-ndjson',
+        )
+        # Let nginx pass lines through as they are produced
+        response['X-Accel-Buffering'] = 'no'
+        return response
+    
+    @staticmethod
+    def _stream(predictor, items, errors, include_history):
+        """Yield one NDJSON line per item as each (ticker, data date) group finishes"""
+        for error in errors:
+            yield json.dumps(error) + '\n'
+        
+        # Headers are already sent: a ticker whose data date cannot be read fails
+        # its own items instead of cutting the stream off
+        groups, data_dates = {}, {}
+        for index, ticker, target_date in items:
+            if ticker not in data_dates:
+                try:
+                    data_dates[ticker] = predictor.data_date(ticker)
+                except Exception as e:
+                    data_dates[ticker] = e
+            if isinstance(data_dates[ticker], Exception):
+                yield BatchPredictView._error_line(index, ticker, data_dates[ticker])
+                continue
+            groups.setdefault((ticker, data_dates[ticker]), []).append((index, target_date))
+        
+        # The executor shares in-flight forecasts with other requests, and concurrent
+        # cache misses meet in the micro-batcher's forward pass
+        executor = get_inference_executor()
+        futures = {executor.submit(key, predictor.forecast, key[0]): key for key in groups}
+        
+        for future in as_completed(futures):
+            ticker = futures[future][0]
+            for index, target_date in groups[futures[future]]:
+                try:
+                    result = predictor.predict_from_forecast(target_date, ticker, future.result())
+                except Exception as e:
+                    yield BatchPredictView._error_line(index, ticker, e)
+                    continue
+                if not include_history:
+                    del result['historical']
+                yield json.dumps({'index': index, **result}) + '\n'
+    
+    @staticmethod
+    def _error_line(index, ticker, error):
+        """NDJSON line reporting a failed item"""
+        if isinstance(error, ValueError):
+            message = str(error)
+        elif isinstance(error, DataUnavailableError):
+            message = f'Data pasar tidak tersedia: {str(error)}'
+        else:
+            message = f'Terjadi kesalahan: {str(error)}'
+        return json.dumps({'index': index, 'success': False, 'ticker': ticker, 'error': message}) + '\n'
@@ -0,0 +1,114 @@
+"""
+Zero-copy rolling windows over 2D feature arrays
+
+sliding_windows() and sequence_windows() return strided views into the source
+array, so building windows costs no memory regardless of history length or
+feature count. WindowBatches materializes one mini-batch at a time for training
+loops (Keras Sequence/PyDataset protocol, or a torch DataLoader with
+batch_size=None).
+"""
+import numpy as np
+
+
+def sliding_windows(data, length, step=1):
+    """
+    Every window data[i:i+length] as a read-only view
+
+    Args:
+        data: Array of shape [time] or [time, features]
+        length: Window length
+        step: Offset between consecutive window starts
+
+    Returns:
+        View of shape [windows, length] or [windows, length, features]
+    """
+    data = np.asarray(data)
+    if length < 1 or length > len(data):
+        raise ValueError(f"Window length must be between 1 and {len(data)}, got {length}")
+
+    windows = np.lib.stride_tricks.sliding_window_view(data, length, axis=0)[::step]
+    # sliding_window_view puts the window axis last
+    return np.moveaxis(windows, -1, 1) if data.ndim > 1 else windows
+
+
+def sequence_windows(data, length, target_column=0, horizon=1):
+    """
+    Supervised (X, y) pairs: X[i] = data[i:i+length], y[i] = data[i+length+horizon-1, target_column]
+
+    Both are views into data; nothing is copied.
+
+    Returns:
+        Tuple of X with shape [windows, length, features] and y with shape [windows]
+    """
+    data = np.asarray(data)
+    if data.ndim != 2:
+        raise ValueError(f"Expected a [time, features] array, got shape {data.shape}")
+    if len(data) < length + horizon:
+        raise ValueError(f"Need at least {length + horizon} rows for windows of {length}, got {len(data)}")
+
+    X = sliding_windows(data[:len(data) - horizon], length)
+    y = data[length + horizon - 1:, target_column]
+    return X, y
+
+
+class WindowBatches:
+    """
+    Lazily materialized (X, y) mini-batches of sequence windows
+
+    Only batch_size windows are copied at a time, so memory stays flat as the
+    history grows. Implements the Keras Sequence interface (__len__,
+    __getitem__, on_epoch_end); subclass together with keras.utils.Sequence
+    for model.fit.
+    """
+
+    def __init__(self, data, length, batch_size=32, target_column=0, horizon=1,
+                 indices=None, shuffle=False, seed=None, **kwargs):
+        super().__init__(**kwargs)
+        self.data = data
+        self.length = length
+        self.batch_size = batch_size
+        self.target_column = target_column
+        self.horizon = horizon
+        self.shuffle = shuffle
+        self.seed = seed
+        self.X, self.y = sequence_windows(data, length, target_column, horizon)
+        self.indices = np.arange(len(self.y)) if indices is None else np.asarray(indices)
+        self._rng = np.random.default_rng(seed)
+        self._order = self.indices.copy()
+        if shuffle:
+            self._rng.shuffle(self._order)
+
+    def __len__(self):
+        return -(-len(self._order) // self.batch_size)
+
+    def __getitem__(self, batch):
+        if not 0 <= batch < len(self):
+            raise IndexError(f"Batch {batch} out of range for {len(self)} batches")
+        rows = self._order[batch * self.batch_size:(batch + 1) * self.batch_size]
+        # Fancy indexing copies just this batch out of the strided views
+        return self.X[rows], self.y[rows]
+
+    def __iter__(self):
+        for batch in range(len(self)):
+            yield self[batch]
+        self.on_epoch_end()
+
+    def on_epoch_end(self):
+        if self.shuffle:
+            self._rng.shuffle(self._order)
+
+    def split(self, fraction):
+        """
+        Split at fraction of the windows, keeping time order (like Keras validation_split)
+
+        Returns:
+            Tuple of two WindowBatches over the same data, the second one unshuffled
+        """
+        cut = int(len(self.indices) * fraction)
+        return self._subset(self.indices[:cut], self.shuffle), self._subset(self.indices[cut:], False)
+
+    def _subset(self, indices, shuffle):
+        return self.__class__(
+            self.data, self.length, self.batch_size, self.target_column, self.horizon,
+            indices=indices, shuffle=shuffle, seed=self.seed,
+        )
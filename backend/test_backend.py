@@ -9,6 +9,7 @@ import django
 # Setup Django
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbri_backend.settings')
+os.environ.setdefault('PRICE_DATA_SOURCE', 'simulator')  # offline, reproducible bars; 'yahoo' for live data
 django.setup()
 
 from predictor.model import get_predictor
@@ -30,7 +31,7 @@ def test_model_loading():
         return False
 
 def test_data_fetching():
-    """Test if data can be fetched from yfinance"""
+    """Test if data can be fetched from the configured price source"""
     print("\n" + "=" * 80)
     print("Testing Data Fetching")
     print("=" * 80)
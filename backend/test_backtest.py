@@ -0,0 +1,107 @@
+"""
+Test the walk-forward backtester against per-origin TFTPredictor inference
+Run this after changing predictor/backtest.py or the inference path in predictor/model.py
+"""
+import os
+import sys
+import time
+from datetime import datetime
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbri_backend.settings')
+django.setup()
+
+import numpy as np
+import pandas as pd
+from predictor.backtest import forecast_origins, score_forecasts
+from predictor.market_sim import MarketSimulator
+from predictor.model import TFTPredictor
+
+TOLERANCE = 1e-3  # IDR
+TICKER = 'BBRI.JK'
+
+
+def reference_forecast(predictor, bars, origin):
+    """One origin through the API's own steps: read the window, prepare it, run the model"""
+    start = TFTPredictor.history_start(origin).normalize()
+    window = bars[(bars['date'] >= start) & (bars['date'] <= origin)]
+    predictor.indicator_states.pop(TICKER, None)
+    return predictor._run_inference(predictor._prepare_features(window, TICKER))
+
+
+def test_forecast_parity(predictor, bars, origins, workers):
+    """Batched backtest forecasts must match per-origin inference"""
+    start = time.perf_counter()
+    forecasts = forecast_origins(predictor, {TICKER: bars}, {TICKER: origins}, batch_size=16, workers=workers)[TICKER]
+    elapsed = time.perf_counter() - start
+
+    sample = np.linspace(0, len(origins) - 1, 5).astype(int)
+    diff = max(np.abs(forecasts[i] - reference_forecast(predictor, bars, pd.Timestamp(origins[i]))).max() for i in sample)
+
+    passed = forecasts.shape == (len(origins), predictor.max_prediction_length, 7) and diff < TOLERANCE
+    print(f"{'✓' if passed else '❌'} {len(origins)} origins, workers={workers}: shape {forecasts.shape}, "
+          f"max abs diff {diff:.2e} IDR ({elapsed * 1000 / len(origins):.1f} ms/origin)")
+    return passed
+
+
+def test_scoring():
+    """Metrics match a direct computation; non-trading target days are skipped"""
+    dates = pd.bdate_range('2025-01-01', periods=80)
+    close = np.linspace(1000, 1800, len(dates))
+    origins = dates[:20]
+    offsets = np.array([-30, -20, -10, 0, 10, 20, 30], dtype=float)
+
+    # Forecast the actual price of origin + h calendar days (or 0 on weekends), shifted by 5
+    lookup = pd.Series(close, index=dates)
+    targets = origins.to_numpy()[:, None] + np.arange(1, 31) * np.timedelta64(1, 'D')
+    actual = lookup.reindex(pd.DatetimeIndex(targets.ravel())).to_numpy().reshape(targets.shape)
+    quantiles = np.nan_to_num(actual)[:, :, None] + 5 + offsets
+
+    report = score_forecasts(quantiles, origins, dates, close)
+    scored = ~np.isnan(actual)
+    overall = report['overall']
+
+    passed = (
+        overall['count'] == scored.sum()
+        and np.isclose(overall['mae'], 5) and np.isclose(overall['rmse'], 5)
+        and np.isclose(overall['mape'], np.mean(5 / actual[scored]) * 100)
+        and overall['coverage'] == 1.0
+        and overall['quantile_hits'] == [0, 0, 0, 1, 1, 1, 1]
+        and [row['horizon'] for row in report['horizons']] == list(range(1, 31))
+        and all(row['count'] == scored[:, row['horizon'] - 1].sum() for row in report['horizons'])
+    )
+    print(f"{'✓' if passed else '❌'} {overall['count']} scored forecasts: MAE {overall['mae']:.2f}, "
+          f"coverage {overall['coverage']:.0%}, quantile hits {overall['quantile_hits']}")
+    return passed
+
+
+if __name__ == '__main__':
+    print("\n🧪 BBRI Stock Prediction - Backtest Test\n")
+
+    predictor = TFTPredictor()
+    predictor.load_model()
+
+    bars = MarketSimulator(seed=7).fetch(TICKER, datetime(2023, 6, 1), datetime(2025, 1, 1))
+    bars['date'] = pd.to_datetime(bars['date'])
+    origins = bars.loc[bars['date'] >= '2024-06-01', 'date'].to_numpy()
+
+    results = [
+        ("Forecast parity (in-process)", test_forecast_parity(predictor, bars, origins, workers=0)),
+        ("Forecast parity (workers)", test_forecast_parity(predictor, bars, origins, workers=2)),
+        ("Scoring", test_scoring()),
+    ]
+
+    # Summary
+    print("\n" + "=" * 80)
+    print("Test Summary")
+    print("=" * 80)
+
+    for test_name, passed in results:
+        status = "✓ PASSED" if passed else "❌ FAILED"
+        print(f"{test_name:.<50} {status}")
+
+    total_passed = sum(1 for _, passed in results if passed)
+    print(f"\nTotal: {total_passed}/{len(results)} tests passed")
+    sys.exit(0 if total_passed == len(results) else 1)
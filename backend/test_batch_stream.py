@@ -0,0 +1,144 @@
+"""
+Test the streaming NDJSON batch endpoint (POST /api/predict/batch/)
+Run this after changing BatchPredictView or the serving predictor interface
+"""
+import os
+import sys
+import json
+import time
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbri_backend.settings')
+django.setup()
+
+from datetime import timedelta
+from django.test import Client
+from predictor.concurrency import get_inference_executor
+from predictor.views import get_serving_predictor
+
+URL = '/api/predict/batch/'
+TICKERS = ['BBRI.JK', 'BMRI.JK']
+
+
+def build_requests(predictor):
+    """Every target date within the horizon for two tickers, plus invalid items"""
+    items = []
+    for ticker in TICKERS:
+        last_date = predictor.forecast(ticker)[1]
+        items += [
+            {'ticker': ticker, 'target_date': (last_date + timedelta(days=h)).strftime('%Y-%m-%d')}
+            for h in range(1, 31)
+        ]
+    items += [
+        {'ticker': 'XXXX.JK', 'target_date': items[0]['target_date']},
+        {'ticker': TICKERS[0], 'target_date': 'besok'},
+        {'ticker': TICKERS[0], 'target_date': '2000-01-01'},
+    ]
+    return items
+
+
+def test_stream(client, predictor, items):
+    """One line per item, equal to /predict/ without history, one forecast per group"""
+    executor = get_inference_executor()
+    submitted = executor.submitted
+
+    start = time.perf_counter()
+    response = client.post(URL, {'requests': items}, content_type='application/json')
+    lines, first_line = [], None
+    for chunk in response.streaming_content:
+        first_line = first_line or time.perf_counter() - start
+        lines += [json.loads(line) for line in chunk.decode().splitlines()]
+    total = time.perf_counter() - start
+
+    passed = response.status_code == 200 and response['Content-Type'] == 'application/x-ndjson'
+    passed &= sorted(line['index'] for line in lines) == list(range(len(items)))
+
+    for line in lines:
+        item = items[line['index']]
+        if line['index'] >= len(items) - 3:
+            passed &= line['success'] is False and bool(line['error'])
+            continue
+        expected = predictor.predict(item['target_date'], item['ticker'])
+        # data_status ages between the two calls
+        for key in ('historical', 'data_status'):
+            expected.pop(key, None)
+        line.pop('data_status', None)
+        passed &= line == {'index': line['index'], **expected}
+
+    forecasts = executor.submitted - submitted
+    passed &= forecasts == len(TICKERS)
+    print(f"{'✓' if passed else '❌'} {len(lines)} lines from {forecasts} forecasts "
+          f"(first line {first_line * 1000:.0f} ms, all {total * 1000:.0f} ms)")
+    return passed
+
+
+def test_include_history(client, items):
+    """include_history adds the 90-day history back"""
+    response = client.post(URL, {'requests': items[:2], 'include_history': True}, content_type='application/json')
+    lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+    passed = len(lines) == 2 and all(len(line['historical']['close']) > 0 for line in lines)
+    print(f"{'✓' if passed else '❌'} include_history returns the price history")
+    return passed
+
+
+def test_data_date_failure(client, predictor, items):
+    """A ticker whose data date cannot be read gets error lines, the others still stream"""
+    data_date = predictor.data_date
+
+    def failing_data_date(ticker):
+        if ticker == TICKERS[1]:
+            raise OSError('price store unreadable')
+        return data_date(ticker)
+
+    predictor.data_date = failing_data_date
+    try:
+        response = client.post(URL, {'requests': items[:3] + items[30:33]}, content_type='application/json')
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+    finally:
+        del predictor.data_date
+
+    outcomes = {line['index']: line['success'] for line in lines}
+    passed = response.status_code == 200 and outcomes == {0: True, 1: True, 2: True, 3: False, 4: False, 5: False}
+    print(f"{'✓' if passed else '❌'} Unreadable data date for {TICKERS[1]}: {len(lines)} lines, success {outcomes}")
+    return passed
+
+
+def test_bad_request(client):
+    """Malformed bodies are rejected before streaming starts"""
+    codes = [
+        client.post(URL, body, content_type='application/json').status_code
+        for body in ({}, {'requests': []}, {'requests': 'BBRI.JK'}, [{'ticker': 'BBRI.JK'}], '5')
+    ]
+    passed = codes == [400] * 5
+    print(f"{'✓' if passed else '❌'} Malformed bodies: {codes}")
+    return passed
+
+
+if __name__ == '__main__':
+    print("\n🧪 BBRI Stock Prediction - Streaming Batch Endpoint Test\n")
+
+    client = Client(SERVER_NAME='localhost')
+    predictor = get_serving_predictor()
+    items = build_requests(predictor)
+
+    results = [
+        ("NDJSON stream", test_stream(client, predictor, items)),
+        ("Include history", test_include_history(client, items)),
+        ("Data date failure", test_data_date_failure(client, predictor, items)),
+        ("Bad request", test_bad_request(client)),
+    ]
+
+    # Summary
+    print("\n" + "=" * 80)
+    print("Test Summary")
+    print("=" * 80)
+
+    for test_name, passed in results:
+        status = "✓ PASSED" if passed else "❌ FAILED"
+        print(f"{test_name:.<50} {status}")
+
+    total_passed = sum(1 for _, passed in results if passed)
+    print(f"\nTotal: {total_passed}/{len(results)} tests passed")
+    sys.exit(0 if total_passed == len(results) else 1)
@@ -0,0 +1,141 @@
+"""
+Test the micro-batching scheduler (predictor/batching.py)
+Run this after changing InferenceBatcher or TFTPredictor._run_inference_batch
+"""
+import os
+import sys
+import threading
+import time
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbri_backend.settings')
+django.setup()
+
+import numpy as np
+from predictor.batching import InferenceBatcher
+from predictor.model import TFTPredictor
+from predictor.sample_data import create_sample_bbri_data
+
+
+class RecordingBatch:
+    """run_batch stand-in: item * 10 per item, records every batch it is called with"""
+
+    def __init__(self, delay=0.0, poison=None):
+        self.delay = delay
+        self.poison = poison
+        self.batches = []
+
+    def __call__(self, items):
+        self.batches.append(list(items))
+        time.sleep(self.delay)
+        if self.poison is not None and self.poison in items:
+            raise ValueError(f"bad input {self.poison}")
+        return [item * 10 for item in items]
+
+
+def submit_concurrently(batcher, items, payload=lambda item: item, timeout=10):
+    """Submit payload(item) for every item from its own thread at the same moment; returns item -> result or exception"""
+    barrier = threading.Barrier(len(items))
+    outcomes = {}
+
+    def call(item):
+        barrier.wait()
+        try:
+            outcomes[item] = batcher.submit(payload(item)).result(timeout=timeout)
+        except Exception as e:
+            outcomes[item] = e
+
+    threads = [threading.Thread(target=call, args=(item,)) for item in items]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def test_coalescing():
+    """Concurrent submissions within max_wait_ms run as one batch"""
+    run_batch = RecordingBatch()
+    batcher = InferenceBatcher(run_batch, max_batch_size=16, max_wait_ms=200)
+    outcomes = submit_concurrently(batcher, list(range(8)))
+
+    stats = batcher.stats()
+    passed = len(run_batch.batches) == 1 and sorted(run_batch.batches[0]) == list(range(8)) and stats['items'] == 8
+    print(f"{'✓' if passed else '❌'} 8 concurrent calls -> batch sizes {[len(b) for b in run_batch.batches]}, "
+          f"mean {stats['mean_batch_size']:.1f}")
+    return passed and len(outcomes) == 8
+
+
+def test_routing():
+    """Every caller gets its own row back, also when the load spans several capped batches"""
+    run_batch = RecordingBatch(delay=0.01)
+    batcher = InferenceBatcher(run_batch, max_batch_size=8, max_wait_ms=20)
+    items = list(range(40))
+    outcomes = submit_concurrently(batcher, items)
+
+    routed = all(outcomes[item] == item * 10 for item in items)
+    sizes = [len(batch) for batch in run_batch.batches]
+    passed = routed and sum(sizes) == len(items) and max(sizes) <= 8 and len(sizes) < len(items)
+    print(f"{'✓' if passed else '❌'} 40 calls, max_batch_size 8: {len(sizes)} batches {sizes}, "
+          f"results routed {routed}")
+    return passed
+
+
+def test_exception():
+    """A failing batch raises in every waiter of that batch; the worker keeps serving"""
+    run_batch = RecordingBatch(poison=3)
+    batcher = InferenceBatcher(run_batch, max_batch_size=16, max_wait_ms=200)
+    outcomes = submit_concurrently(batcher, list(range(6)))
+
+    all_failed = all(isinstance(outcome, ValueError) and 'bad input 3' in str(outcome) for outcome in outcomes.values())
+    recovered = batcher.submit(7).result(timeout=10) == 70
+    passed = len(outcomes) == 6 and all_failed and recovered and batcher.stats()['failures'] == 1
+    print(f"{'✓' if passed else '❌'} Failing batch: {sum(isinstance(o, ValueError) for o in outcomes.values())}/6 "
+          f"waiters got the error, next call served {recovered}")
+    return passed
+
+
+def test_model_batches():
+    """Through the real model, batched rows equal one-by-one inference"""
+    predictor = TFTPredictor()
+    predictor.load_model()
+    base = create_sample_bbri_data(days=200)
+    frames = [predictor._prepare_features(base.iloc[:len(base) - offset].reset_index(drop=True), 'BBRI.JK')
+              for offset in range(0, 40, 5)]
+    expected = [predictor._run_inference_batch([df])[0] for df in frames]
+
+    batcher = InferenceBatcher(predictor._run_inference_batch, max_batch_size=16, max_wait_ms=200)
+    outcomes = submit_concurrently(batcher, list(range(len(frames))), payload=frames.__getitem__, timeout=60)
+
+    diff = max(float(np.abs(outcomes[index] - expected[index]).max()) for index in range(len(frames)))
+    stats = batcher.stats()
+    passed = diff < 1e-3 and stats['max_batch_size_seen'] > 1
+    print(f"{'✓' if passed else '❌'} {len(frames)} concurrent forecasts in {stats['batches']} batches, "
+          f"max abs diff to single inference {diff:.2e} IDR")
+    return passed
+
+
+if __name__ == '__main__':
+    print("\n🧪 BBRI Stock Prediction - Micro-Batching Test\n")
+
+    results = [
+        ("Coalescing", test_coalescing()),
+        ("Result routing", test_routing()),
+        ("Exception propagation", test_exception()),
+        ("Model batches", test_model_batches()),
+    ]
+
+    # Summary
+    print("\n" + "=" * 80)
+    print("Test Summary")
+    print("=" * 80)
+
+    for test_name, passed in results:
+        status = "✓ PASSED" if passed else "❌ FAILED"
+        print(f"{test_name:.<50} {status}")
+
+    total_passed = sum(1 for _, passed in results if passed)
+    print(f"\nTotal: {total_passed}/{len(results)} tests passed")
+    sys.exit(0 if total_passed == len(results) else 1)
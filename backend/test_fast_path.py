@@ -0,0 +1,90 @@
+"""
+Parity test: direct tensor inference path vs TimeSeriesDataSet/DataLoader path
+Run this after changing predictor/inputs.py or the model spec
+"""
+import os
+import sys
+import time
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbri_backend.settings')
+django.setup()
+
+import numpy as np
+from predictor.model import TFTPredictor
+from predictor.inputs import build_model_input
+from predictor.sample_data import create_sample_bbri_data
+
+TOLERANCE = 1e-3  # IDR, after inverse normalization
+
+
+def test_input_parity(predictor, df):
+    """Direct input tensors must match the ones produced by the DataLoader"""
+    print("=" * 80)
+    print("Testing Input Tensor Parity")
+    print("=" * 80)
+
+    dataset = predictor._build_prediction_dataset(df)
+    expected, _ = next(iter(dataset.to_dataloader(train=False, batch_size=1, num_workers=0)))
+    actual = build_model_input(df, predictor.model_spec)
+
+    passed = True
+    for name, tensor in expected.items():
+        if name not in actual or actual[name].shape != tensor.shape:
+            print(f"❌ {name}: shape {tuple(tensor.shape)} vs {tuple(actual[name].shape) if name in actual else 'missing'}")
+            passed = False
+            continue
+        diff = (actual[name].double() - tensor.double()).abs().max().item()
+        status = "✓" if diff < 1e-4 else "❌"
+        print(f"{status} {name:<20} max abs diff {diff:.2e}")
+        passed = passed and diff < 1e-4
+    return passed
+
+
+def test_prediction_parity(predictor, df):
+    """Direct forward pass must reproduce the Lightning predict quantiles"""
+    print("\n" + "=" * 80)
+    print("Testing Prediction Parity")
+    print("=" * 80)
+
+    start = time.perf_counter()
+    expected = predictor._run_inference_dataset(df)
+    dataset_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    actual = predictor._run_inference_direct([df])[0]
+    direct_ms = (time.perf_counter() - start) * 1000
+
+    diff = np.abs(actual - expected).max()
+    print(f"  - Shape: {actual.shape} (expected {expected.shape})")
+    print(f"  - Max abs diff: {diff:.2e} IDR")
+    print(f"  - Dataset path: {dataset_ms:.1f} ms, direct path: {direct_ms:.1f} ms")
+    return actual.shape == expected.shape and diff < TOLERANCE
+
+
+if __name__ == '__main__':
+    print("\n🧪 BBRI Stock Prediction - Fast Path Parity Test\n")
+
+    predictor = TFTPredictor()
+    predictor.load_model()
+
+    results = []
+    for days in (120, 240):
+        df = create_sample_bbri_data(days=days)
+        results.append((f"Input parity ({days} days)", test_input_parity(predictor, df)))
+        results.append((f"Prediction parity ({days} days)", test_prediction_parity(predictor, df)))
+
+    # Summary
+    print("\n" + "=" * 80)
+    print("Test Summary")
+    print("=" * 80)
+
+    for test_name, passed in results:
+        status = "✓ PASSED" if passed else "❌ FAILED"
+        print(f"{test_name:.<50} {status}")
+
+    total_passed = sum(1 for _, passed in results if passed)
+    print(f"\nTotal: {total_passed}/{len(results)} tests passed")
+    sys.exit(0 if total_passed == len(results) else 1)
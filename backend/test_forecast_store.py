@@ -0,0 +1,153 @@
+"""
+Test the precomputed forecast store, its read-only predictor and the nightly job
+Run this after changing predictor/forecast_store.py or the precompute_forecasts command
+"""
+import os
+import sys
+import tempfile
+import time
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbri_backend.settings')
+django.setup()
+
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import override_settings
+from predictor.forecast_store import ForecastStore, PrecomputedPredictor
+from predictor.model import TFTPredictor
+from predictor.results import HISTORY_DAYS
+from predictor.revalidate import DataUnavailableError
+from predictor.sample_data import create_sample_bbri_data
+
+TICKERS = ['BBRI.JK', 'BMRI.JK']
+
+
+def sample_forecast(offset=0.0):
+    """(prepared DataFrame, last data date, quantiles) as TFTPredictor.forecast returns it"""
+    df = create_sample_bbri_data(days=200)
+    quantiles = np.linspace(4000, 5000, 30 * 7, dtype=np.float32).reshape(30, 7) + offset
+    return df, pd.Timestamp(df['date'].iloc[-1]), quantiles
+
+
+def test_round_trip(root):
+    """load() returns what save() wrote and picks up a rewritten file"""
+    store = ForecastStore(root)
+    df, last_date, quantiles = sample_forecast()
+    store.save(TICKERS[0], (df, last_date, quantiles), 'abc123')
+    record = store.load(TICKERS[0])
+
+    checks = {
+        'quantiles': np.array_equal(record['quantiles'], quantiles),
+        'read-only': not record['quantiles'].flags.writeable,
+        'last date': record['last_date'] == last_date.normalize(),
+        'history': np.allclose(record['history']['close'], df['close'].tail(HISTORY_DAYS)),
+        'weights hash': record['weights_hash'] == 'abc123',
+        'cached': store.load(TICKERS[0]) is record,
+        'missing': store.load(TICKERS[1]) is None,
+        'no temp files': all(name.endswith('.npz') for name in os.listdir(root)),
+    }
+
+    # A rewrite (new mtime) is read again
+    time.sleep(0.01)
+    store.save(TICKERS[0], (df, last_date, quantiles + 1), 'def456')
+    reloaded = store.load(TICKERS[0])
+    checks['reloaded'] = reloaded['weights_hash'] == 'def456' and np.array_equal(reloaded['quantiles'], quantiles + 1)
+
+    failed = [name for name, ok in checks.items() if not ok]
+    print(f"{'✓' if not failed else '❌'} Save/load round trip {'passed' if not failed else f'failed: {failed}'}")
+    return not failed
+
+
+def test_precomputed_predictor(root):
+    """Stored forecasts answer like the live path; missing ones are a 503, bad dates a 400"""
+    store = ForecastStore(root)
+    df, last_date, quantiles = sample_forecast()
+    store.save(TICKERS[0], (df, last_date, quantiles), 'abc123')
+    predictor = PrecomputedPredictor(store)
+
+    target = last_date + timedelta(days=7)
+    result = predictor.predict(target.strftime('%Y-%m-%d'), TICKERS[0])
+    expected = TFTPredictor().predict_from_forecast(target.strftime('%Y-%m-%d'), TICKERS[0], (df, last_date, quantiles))
+    for key in ('historical', 'data_status'):
+        result.pop(key, None)
+        expected.pop(key, None)
+
+    try:
+        predictor.forecast(TICKERS[1])
+        missing = None
+    except Exception as e:
+        missing = type(e)
+    try:
+        predictor.predict((last_date + timedelta(days=60)).strftime('%Y-%m-%d'), TICKERS[0])
+        too_far = None
+    except Exception as e:
+        too_far = type(e)
+    many = predictor.predict_many(target.strftime('%Y-%m-%d'), TICKERS)
+
+    checks = {
+        'same result as live': result == expected,
+        'missing is DataUnavailableError': missing is DataUnavailableError,
+        'outside horizon is ValueError': too_far is ValueError,
+        'data date': predictor.data_date(TICKERS[0]) == last_date.normalize() and predictor.data_date(TICKERS[1]) is None,
+        'predict_many': many[TICKERS[0]]['success'] and many[TICKERS[1]]['success'] is False,
+    }
+    failed = [name for name, ok in checks.items() if not ok]
+    print(f"{'✓' if not failed else '❌'} PrecomputedPredictor {'passed' if not failed else f'failed: {failed}'}")
+    return not failed
+
+
+def test_command_skips_failed_ticker(root):
+    """One ticker without data is reported and fails the run; the others are still written"""
+    fetch_and_prepare_data = TFTPredictor.fetch_and_prepare_data
+
+    def failing(self, lookback_days=180, ticker=None):
+        if ticker == TICKERS[1]:
+            raise DataUnavailableError(f"No stored data for ticker {ticker}")
+        return fetch_and_prepare_data(self, lookback_days, ticker)
+
+    TFTPredictor.fetch_and_prepare_data = failing
+    try:
+        with override_settings(PRICE_STORE_DIR=os.path.join(root, 'prices')):
+            call_command('precompute_forecasts', tickers=TICKERS, output=os.path.join(root, 'forecasts'))
+        error = None
+    except CommandError as e:
+        error = str(e)
+    finally:
+        TFTPredictor.fetch_and_prepare_data = fetch_and_prepare_data
+
+    store = ForecastStore(os.path.join(root, 'forecasts'))
+    passed = (error is not None and TICKERS[1] in error
+              and store.load(TICKERS[0]) is not None and store.load(TICKERS[1]) is None)
+    print(f"{'✓' if passed else '❌'} precompute_forecasts with {TICKERS[1]} failing: "
+          f"{TICKERS[0]} written {store.load(TICKERS[0]) is not None}, error: {error}")
+    return passed
+
+
+if __name__ == '__main__':
+    print("\n🧪 BBRI Stock Prediction - Forecast Store Test\n")
+
+    with tempfile.TemporaryDirectory() as root:
+        results = [
+            ("Save/load round trip", test_round_trip(os.path.join(root, 'store'))),
+            ("Precomputed predictor", test_precomputed_predictor(os.path.join(root, 'predictor'))),
+            ("Command skips failed ticker", test_command_skips_failed_ticker(os.path.join(root, 'command'))),
+        ]
+
+    # Summary
+    print("\n" + "=" * 80)
+    print("Test Summary")
+    print("=" * 80)
+
+    for test_name, passed in results:
+        status = "✓ PASSED" if passed else "❌ FAILED"
+        print(f"{test_name:.<50} {status}")
+
+    total_passed = sum(1 for _, passed in results if passed)
+    print(f"\nTotal: {total_passed}/{len(results)} tests passed")
+    sys.exit(0 if total_passed == len(results) else 1)
@@ -0,0 +1,109 @@
+"""
+Test the per-ticker indicator state kept by TFTPredictor
+Run this after changing TFTPredictor._add_technical_indicators
+"""
+import os
+import sys
+import threading
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbri_backend.settings')
+django.setup()
+
+import numpy as np
+from predictor.indicators import INDICATOR_COLUMNS
+from predictor.model import TFTPredictor
+from predictor.sample_data import create_sample_bbri_data
+
+TICKER = 'BBRI.JK'
+TOLERANCE = 1e-9
+
+
+def from_scratch(predictor, bars):
+    """Features of a freshly started process for the same bars"""
+    predictor.indicator_states.pop(TICKER, None)
+    return predictor._prepare_features(bars, TICKER)
+
+
+def max_diff(actual, expected, rows):
+    """Largest indicator difference over the last rows the model sees"""
+    if len(actual) != len(expected):
+        return np.inf
+    a = actual[INDICATOR_COLUMNS].to_numpy()[-rows:]
+    e = expected[INDICATOR_COLUMNS].to_numpy()[-rows:]
+    return float(np.abs(a - e).max())
+
+
+def test_incremental_matches_scratch(predictor, bars):
+    """A long-running worker prepares the same features as a fresh one"""
+    rows = predictor.max_encoder_length
+    # (first bar, end bar) of successive requests: new bars, moved start, shorter window, same window
+    windows = [(0, 200), (0, 203), (0, 210), (5, 215), (5, 220), (8, 220), (8, 212), (8, 212)]
+
+    scratch = TFTPredictor()
+    passed = True
+    predictor.indicator_states.pop(TICKER, None)
+    for lo, hi in windows:
+        window = bars.iloc[lo:hi].reset_index(drop=True)
+        diff = max_diff(predictor._prepare_features(window, TICKER), from_scratch(scratch, window), rows)
+        ok = diff <= TOLERANCE
+        passed = passed and ok
+        print(f"{'✓' if ok else '❌'} bars [{lo}:{hi}]: max diff over the last {rows} rows {diff:.2e}")
+    return passed
+
+
+def test_concurrent_appends(predictor, bars):
+    """Threads extending the same state apply the new bars once"""
+    predictor.indicator_states.pop(TICKER, None)
+    predictor._prepare_features(bars.iloc[:200].reset_index(drop=True), TICKER)
+
+    window = bars.iloc[:230].reset_index(drop=True)
+    barrier = threading.Barrier(8)
+    outputs = []
+
+    def prepare():
+        barrier.wait()
+        outputs.append(predictor._prepare_features(window.copy(), TICKER))
+
+    threads = [threading.Thread(target=prepare) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    expected = from_scratch(TFTPredictor(), window)
+    diffs = [max_diff(output, expected, len(expected)) for output in outputs]
+    # The next request extends whatever state the threads left behind
+    later = bars.iloc[:240].reset_index(drop=True)
+    diffs.append(max_diff(predictor._prepare_features(later, TICKER), from_scratch(TFTPredictor(), later), len(expected)))
+
+    passed = len(outputs) == 8 and max(diffs) <= TOLERANCE
+    print(f"{'✓' if passed else '❌'} {len(outputs)} concurrent requests and the next one: max diff {max(diffs):.2e}")
+    return passed
+
+
+if __name__ == '__main__':
+    print("\n🧪 BBRI Stock Prediction - Indicator State Test\n")
+
+    predictor = TFTPredictor()
+    bars = create_sample_bbri_data(days=400)[['date', 'open', 'high', 'low', 'close', 'volume']]
+
+    results = [
+        ("Incremental matches from scratch", test_incremental_matches_scratch(predictor, bars)),
+        ("Concurrent appends", test_concurrent_appends(predictor, bars)),
+    ]
+
+    # Summary
+    print("\n" + "=" * 80)
+    print("Test Summary")
+    print("=" * 80)
+
+    for test_name, passed in results:
+        status = "✓ PASSED" if passed else "❌ FAILED"
+        print(f"{test_name:.<50} {status}")
+
+    total_passed = sum(1 for _, passed in results if passed)
+    print(f"\nTotal: {total_passed}/{len(results)} tests passed")
+    sys.exit(0 if total_passed == len(results) else 1)
@@ -0,0 +1,93 @@
+"""
+Test the incremental indicator engine against the `ta` library
+Run this after changing predictor/indicators.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+import ta
+from predictor.indicators import EXTENDED_INDICATOR_COLUMNS, IndicatorEngine
+
+TOLERANCE = 1e-6
+
+
+def reference_indicators(close):
+    """Indicators exactly as computed with `ta` in the training notebook"""
+    macd = ta.trend.MACD(close=close)
+    bollinger = ta.volatility.BollingerBands(close=close, window=20, window_dev=2)
+    return pd.DataFrame({
+        'ma_7': close.rolling(window=7).mean(),
+        'ma_30': close.rolling(window=30).mean(),
+        'rsi': ta.momentum.RSIIndicator(close=close, window=14).rsi(),
+        'macd': macd.macd(),
+        'macd_signal': macd.macd_signal(),
+        'bb_upper': bollinger.bollinger_hband(),
+        'bb_middle': bollinger.bollinger_mavg(),
+        'bb_lower': bollinger.bollinger_lband(),
+        'macd_diff': macd.macd_diff(),
+        'bb_width': bollinger.bollinger_wband(),
+    })
+
+
+def compare(actual, expected, label):
+    passed = True
+    for column in EXTENDED_INDICATOR_COLUMNS:
+        a = actual[column].to_numpy()
+        e = expected[column].to_numpy()
+        same_nan = (np.isnan(a) == np.isnan(e)).all()
+        diff = np.nanmax(np.abs(a - e))
+        if not same_nan or diff > TOLERANCE:
+            print(f"❌ {label} {column}: max abs diff {diff:.2e}, NaN pattern match: {same_nan}")
+            passed = False
+    if passed:
+        print(f"✓ {label}: all indicators within {TOLERANCE}")
+    return passed
+
+
+def test_vectorized(close, expected):
+    """compute() over the full history"""
+    start = time.perf_counter()
+    actual = IndicatorEngine().compute(close.to_numpy())
+    print(f"  - compute(): {(time.perf_counter() - start) * 1000:.2f} ms for {len(close)} bars")
+    return compare(actual, expected, "Vectorized")
+
+
+def test_incremental(close, expected, split):
+    """compute() over a prefix, then update() bar by bar"""
+    engine = IndicatorEngine()
+    head = engine.compute(close.to_numpy()[:split])
+    start = time.perf_counter()
+    tail = engine.append(close.to_numpy()[split:])
+    per_bar = (time.perf_counter() - start) / max(len(close) - split, 1) * 1e6
+    print(f"  - update(): {per_bar:.1f} µs per bar")
+    return compare(pd.concat([head, tail], ignore_index=True), expected, f"Incremental from bar {split}")
+
+
+if __name__ == '__main__':
+    print("\n🧪 BBRI Stock Prediction - Indicator Engine Test\n")
+
+    rng = np.random.default_rng(42)
+    close = pd.Series(5000 * np.cumprod(1 + rng.normal(0.0002, 0.015, 4000)))
+    expected = reference_indicators(close)
+
+    results = [("Vectorized", test_vectorized(close, expected))]
+    for split in (0, 10, 40, 2500):
+        results.append((f"Incremental ({split})", test_incremental(close, expected, split)))
+
+    # Summary
+    print("\n" + "=" * 80)
+    print("Test Summary")
+    print("=" * 80)
+
+    for test_name, passed in results:
+        status = "✓ PASSED" if passed else "❌ FAILED"
+        print(f"{test_name:.<50} {status}")
+
+    total_passed = sum(1 for _, passed in results if passed)
+    print(f"\nTotal: {total_passed}/{len(results)} tests passed")
+    sys.exit(0 if total_passed == len(results) else 1)
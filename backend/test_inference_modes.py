@@ -0,0 +1,162 @@
+"""
+Accuracy and latency check of the optimized inference modes against fp32 eager
+Run this after changing predictor/optimize.py or upgrading torch/onnxruntime
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+import subprocess
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbri_backend.settings')
+django.setup()
+
+import numpy as np
+from django.test import override_settings
+from predictor.inputs import build_model_input
+from predictor.market_sim import MarketSimulator
+from predictor.model import TFTPredictor
+from predictor.optimize import export_onnx
+
+# Max allowed deviation from the fp32 quantiles, relative to the price level
+TOLERANCE = {
+    'torchscript': 1e-6,
+    'quantized': 0.01,
+    'onnx': 1e-6,
+}
+
+# Serving in onnx mode in a fresh interpreter: which heavy modules got imported
+ONNX_WORKER = """
+import json, sys, time
+start = time.perf_counter()
+import django
+import bbri_backend.settings as conf
+conf.MODEL_ONNX_PATH = sys.argv[1]
+conf.PREDICTOR_EAGER_LOAD = False
+django.setup()
+from predictor.model import get_predictor
+from predictor.sample_data import create_sample_bbri_data
+from predictor import backtest
+predictor = get_predictor()
+predictor.warm_up()
+quantiles = predictor._run_inference(create_sample_bbri_data(days=120))
+# What a backtest worker runs: its initializer, then window prep
+bars = create_sample_bbri_data(days=400)[['date', 'open', 'high', 'low', 'close', 'volume']]
+backtest._init_worker((predictor, {'BBRI.JK': bars}))
+windows = predictor._forward(backtest._prepare_chunk('BBRI.JK', [(0, 240), (100, 340)]))
+print(json.dumps({
+    'mode': predictor.inference_mode,
+    'shape': list(quantiles.shape),
+    'backtest_shape': list(windows.shape),
+    'seconds': time.perf_counter() - start,
+    'imported': [name for name in ('torch', 'pytorch_forecasting', 'lightning') if name in sys.modules],
+}))
+"""
+
+
+def held_out_windows(predictor, count=8):
+    """Prepared frames ending on different days of a simulated history the model never saw"""
+    bars = MarketSimulator(seed=7).fetch('BBRI.JK', '2024-01-01', '2026-01-01')
+    frames = []
+    for end in np.linspace(len(bars) - 200, len(bars), count, dtype=int):
+        window = bars.iloc[end - 200:end].reset_index(drop=True)
+        frames.append(predictor._prepare_features(window, 'BBRI.JK'))
+    return frames
+
+
+def latency(predictor, frames, repeat=30):
+    """Median ms of one direct inference call"""
+    for _ in range(3):
+        predictor._run_inference_direct(frames)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        predictor._run_inference_direct(frames)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def check_torch_free(path):
+    """A worker in onnx mode loads, predicts and prepares backtest windows without importing torch"""
+    env = dict(os.environ, PREDICTOR_INFERENCE_MODE='onnx', DJANGO_SETTINGS_MODULE='bbri_backend.settings')
+    result = subprocess.run(
+        [sys.executable, '-c', ONNX_WORKER, path], env=env, capture_output=True, text=True,
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+    )
+    if result.returncode != 0:
+        print(f"❌ onnx worker failed: {result.stderr[-500:]}")
+        return False
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    passed = (report['mode'] == 'onnx' and report['shape'] == [30, 7]
+              and report['backtest_shape'] == [2, 30, 7] and not report['imported'])
+    print(f"{'✓' if passed else '❌'} onnx worker: startup + first forecast {report['seconds']:.2f}s, "
+          f"imported {report['imported'] or 'no torch/pytorch-forecasting/lightning'}")
+    return passed
+
+
+def load(mode):
+    predictor = TFTPredictor()
+    predictor.inference_mode = mode
+    predictor.load_model()
+    if predictor.inference_mode != mode:
+        raise RuntimeError(f"{mode} mode could not be enabled")
+    return predictor
+
+
+if __name__ == '__main__':
+    print("\n🧪 BBRI Stock Prediction - Inference Mode Check\n")
+
+    reference = load('eager')
+    frames = held_out_windows(reference)
+    expected = reference._run_inference_direct(frames)
+    baseline = {size: latency(reference, frames[:size]) for size in (1, len(frames))}
+
+    print("=" * 80)
+    print(f"{'Mode':<14}{'max abs diff':>14}{'max rel diff':>14}{'batch 1':>12}{f'batch {len(frames)}':>12}")
+    print("=" * 80)
+    print(f"{'eager':<14}{'-':>14}{'-':>14}{baseline[1]:>10.2f}ms{baseline[len(frames)]:>10.2f}ms")
+
+    # Export next to the test instead of overwriting MODEL_ONNX_PATH
+    onnx_dir = tempfile.TemporaryDirectory()
+    onnx_path = os.path.join(onnx_dir.name, 'tft.onnx')
+    export_onnx(reference.model, build_model_input(frames[0], reference.model_spec), onnx_path, reference.weights_hash)
+
+    results = []
+    for mode, tolerance in TOLERANCE.items():
+        try:
+            with override_settings(MODEL_ONNX_PATH=onnx_path):
+                predictor = load(mode)
+        except Exception as e:
+            print(f"❌ {mode}: {str(e)}")
+            results.append((f"{mode} accuracy", False))
+            continue
+
+        actual = predictor._run_inference_direct(frames)
+        abs_diff = np.abs(actual - expected).max()
+        rel_diff = (np.abs(actual - expected) / np.abs(expected)).max()
+        timings = {size: latency(predictor, frames[:size]) for size in (1, len(frames))}
+        print(f"{mode:<14}{abs_diff:>11.4f}IDR{rel_diff:>14.2e}"
+              f"{timings[1]:>10.2f}ms{timings[len(frames)]:>10.2f}ms"
+              f"  ({baseline[1] / timings[1]:.1f}x)")
+        results.append((f"{mode} accuracy", rel_diff <= tolerance))
+
+    print()
+    results.append(("onnx without torch", check_torch_free(onnx_path)))
+    onnx_dir.cleanup()
+
+    # Summary
+    print("\n" + "=" * 80)
+    print("Test Summary")
+    print("=" * 80)
+
+    for test_name, passed in results:
+        status = "✓ PASSED" if passed else "❌ FAILED"
+        print(f"{test_name:.<50} {status}")
+
+    total_passed = sum(1 for _, passed in results if passed)
+    print(f"\nTotal: {total_passed}/{len(results)} tests passed")
+    sys.exit(0 if total_passed == len(results) else 1)
@@ -7,6 +7,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbri_backend.settings')
+os.environ.setdefault('PRICE_DATA_SOURCE', 'simulator')  # offline, reproducible bars; 'yahoo' for live data
 django.setup()
 
 from predictor.model import get_predictor
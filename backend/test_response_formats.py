@@ -0,0 +1,197 @@
+"""
+Test the compact response encodings and response compression
+Run this after changing predictor/renderers.py or predictor/middleware.py
+"""
+import os
+import sys
+import gzip
+import json
+import time
+import django
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbri_backend.settings')
+django.setup()
+
+import brotli
+import msgpack
+import numpy as np
+import pyarrow as pa
+from datetime import timedelta
+from django.test import Client, override_settings
+from predictor.renderers import ArrowRenderer, MessagePackRenderer
+from predictor.views import get_serving_predictor
+from rest_framework.renderers import JSONRenderer
+
+TICKERS = ['BBRI.JK', 'BMRI.JK']
+MSGPACK = 'application/msgpack'
+ARROW = 'application/vnd.apache.arrow.stream'
+
+
+def decode_series(series):
+    """Epoch base + offsets and float32 buffers back to ISO dates and lists"""
+    offsets = np.frombuffer(series['offsets'], dtype='<u2')
+    decoded = {'dates': (np.datetime64(series['epoch_day'], 'D') + offsets).astype(str).tolist()}
+    for name, value in series.items():
+        if name not in ('epoch_day', 'offsets'):
+            decoded[name] = np.frombuffer(value, dtype='<f4').tolist()
+    return decoded
+
+
+def same_series(actual, expected):
+    return actual['dates'] == expected['dates'] and all(
+        np.allclose(actual[name], expected[name], rtol=1e-6) for name in expected if name != 'dates'
+    )
+
+
+def test_msgpack(client, body, expected):
+    """MessagePack decodes to the JSON response within float32 precision"""
+    response = client.post('/api/predict/', body, content_type='application/json', HTTP_ACCEPT=MSGPACK)
+    data = msgpack.unpackb(response.content)
+
+    passed = response.status_code == 200 and response['Content-Type'] == MSGPACK
+    passed &= all(same_series(decode_series(data[name]), expected[name]) for name in ('predictions', 'historical'))
+    # data_status ages between the two requests
+    skip = ('predictions', 'historical', 'data_status')
+    passed &= {k: v for k, v in data.items() if k not in skip} == {k: v for k, v in expected.items() if k not in skip}
+    print(f"{'✓' if passed else '❌'} MessagePack round trip ({len(response.content)} bytes)")
+    return passed
+
+
+def test_arrow(client, body, expected):
+    """Arrow IPC rows decode to the JSON history and forecast of every ticker"""
+    response = client.post('/api/predict/?format=arrow', body, content_type='application/json')
+    table = pa.ipc.open_stream(response.content).read_all()
+    metadata = table.schema.metadata
+    dates = (np.datetime64(int(metadata[b'epoch_day']), 'D') + table['offset'].to_numpy()).astype(str)
+    response_json = json.loads(metadata[b'response'])
+
+    passed = response.status_code == 200 and response['Content-Type'] == ARROW
+    for ticker, result in expected['results'].items():
+        rows = (table['ticker'].to_numpy(zero_copy_only=False) == ticker)
+        history = rows & ~table['close'].is_null().to_numpy(zero_copy_only=False)
+        forecast = rows & ~table['median'].is_null().to_numpy(zero_copy_only=False)
+        passed &= same_series({
+            'dates': dates[history].tolist(),
+            'close': table['close'].to_numpy(zero_copy_only=False)[history],
+        }, result['historical'])
+        passed &= same_series({
+            'dates': dates[forecast].tolist(),
+            **{name: table[name].to_numpy(zero_copy_only=False)[forecast]
+               for name in ('median', 'lower_bound', 'upper_bound')},
+        }, result['predictions'])
+        passed &= response_json['results'][ticker]['analysis'] == result['analysis']
+    print(f"{'✓' if passed else '❌'} Arrow IPC round trip, {len(expected['results'])} tickers "
+          f"({len(response.content)} bytes)")
+    return passed
+
+
+def test_async_negotiation(client, body):
+    """The async endpoint negotiates the same encodings and rejects unknown ones"""
+    codes = {}
+    for accept in ('application/json', MSGPACK, ARROW, 'text/csv'):
+        response = client.post('/api/predict/async/', body, content_type='application/json', HTTP_ACCEPT=accept)
+        codes[accept] = (response.status_code, response['Content-Type'].split(';')[0])
+    passed = codes == {
+        'application/json': (200, 'application/json'),
+        MSGPACK: (200, MSGPACK),
+        ARROW: (200, ARROW),
+        'text/csv': (406, 'application/json'),
+    }
+    print(f"{'✓' if passed else '❌'} Async endpoint: {codes}")
+    return passed
+
+
+def test_compression(client, body):
+    """br/gzip decode to the uncompressed body; off switch and small bodies skip it"""
+    def parsed(content):
+        # data_status ages between requests
+        data = json.loads(content)
+        data.pop('data_status', None)
+        return data
+
+    plain = parsed(client.post('/api/predict/', body, content_type='application/json').content)
+
+    passed = True
+    for accept, encoding, decompress in (('gzip, deflate, br', 'br', brotli.decompress),
+                                         ('gzip', 'gzip', gzip.decompress)):
+        response = client.post('/api/predict/', body, content_type='application/json', HTTP_ACCEPT_ENCODING=accept)
+        passed &= response['Content-Encoding'] == encoding and 'Accept-Encoding' in response['Vary']
+        passed &= parsed(decompress(response.content)) == plain
+
+    with override_settings(RESPONSE_COMPRESSION=False):
+        response = client.post('/api/predict/', body, content_type='application/json', HTTP_ACCEPT_ENCODING='br')
+        passed &= not response.has_header('Content-Encoding')
+
+    response = client.get('/api/health/', HTTP_ACCEPT_ENCODING='br')
+    passed &= len(response.content) >= 1024 or not response.has_header('Content-Encoding')
+
+    print(f"{'✓' if passed else '❌'} br and gzip responses, RESPONSE_COMPRESSION=False leaves them plain")
+    return passed
+
+
+def test_stream_compression(client, body):
+    """Compressed NDJSON still arrives line by line"""
+    items = [{'ticker': body['ticker'], 'target_date': body['target_date']}] * 3
+    response = client.post('/api/predict/batch/', {'requests': items}, content_type='application/json',
+                           HTTP_ACCEPT_ENCODING='br')
+    decompressor = brotli.Decompressor()
+    chunks = [decompressor.process(chunk) for chunk in response.streaming_content]
+    lines = b''.join(chunks).decode().splitlines()
+
+    passed = response['Content-Encoding'] == 'br' and len(lines) == 3
+    passed &= all(chunk.endswith(b'\n') for chunk in chunks if chunk)
+    print(f"{'✓' if passed else '❌'} Streamed NDJSON compressed per line ({len(lines)} lines)")
+    return passed
+
+
+def report_sizes(result):
+    """Payload size and serialization time per encoding (informational)"""
+    print("\n" + "=" * 80)
+    print("Payload Size and Serialization Time (chart=client, one ticker)")
+    print("=" * 80)
+
+    for name, renderer in (('JSON', JSONRenderer()), ('MessagePack', MessagePackRenderer()), ('Arrow', ArrowRenderer())):
+        start = time.perf_counter()
+        for _ in range(200):
+            content = renderer.render(result)
+        elapsed = (time.perf_counter() - start) / 200 * 1000
+        print(f"  {name:<12} {len(content):>6} bytes  gzip {len(gzip.compress(content)):>6}  "
+              f"br {len(brotli.compress(content, quality=5)):>6}  {elapsed:.3f} ms")
+
+
+if __name__ == '__main__':
+    print("\n🧪 BBRI Stock Prediction - Response Format Test\n")
+
+    client = Client(SERVER_NAME='localhost')
+    predictor = get_serving_predictor()
+    last_date = predictor.forecast(TICKERS[0])[1]
+    target_date = (last_date + timedelta(days=10)).strftime('%Y-%m-%d')
+
+    body = {'target_date': target_date, 'ticker': TICKERS[0], 'chart': 'client'}
+    expected = client.post('/api/predict/', body, content_type='application/json').json()
+    batch = {'target_date': target_date, 'tickers': TICKERS}
+    expected_batch = client.post('/api/predict/', batch, content_type='application/json').json()
+
+    results = [
+        ("MessagePack", test_msgpack(client, body, expected)),
+        ("Arrow IPC", test_arrow(client, batch, expected_batch)),
+        ("Async negotiation", test_async_negotiation(client, body)),
+        ("Compression", test_compression(client, body)),
+        ("Stream compression", test_stream_compression(client, body)),
+    ]
+    report_sizes(expected)
+
+    # Summary
+    print("\n" + "=" * 80)
+    print("Test Summary")
+    print("=" * 80)
+
+    for test_name, passed in results:
+        status = "✓ PASSED" if passed else "❌ FAILED"
+        print(f"{test_name:.<50} {status}")
+
+    total_passed = sum(1 for _, passed in results if passed)
+    print(f"\nTotal: {total_passed}/{len(results)} tests passed")
+    sys.exit(0 if total_passed == len(results) else 1)
@@ -0,0 +1,166 @@
+"""
+Test stale-while-revalidate price data and the upstream circuit breaker
+Run this after changing predictor/revalidate.py or TFTPredictor.fetch_and_prepare_data
+"""
+import os
+import sys
+import time
+import tempfile
+import django
+from datetime import timedelta
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbri_backend.settings')
+django.setup()
+
+import numpy as np
+from predictor.data_store import PriceStore
+from predictor.market_sim import MarketSimulator
+from predictor.model import TFTPredictor
+from predictor.revalidate import CircuitBreaker, DataUnavailableError
+
+TICKER = 'BBRI.JK'
+
+
+class FlakyFetcher:
+    """MarketSimulator behind a switchable delay and outage"""
+
+    def __init__(self):
+        self.fetcher = MarketSimulator(seed=7)
+        self.delay = 0.0
+        self.fail = False
+        self.calls = 0
+
+    def fetch(self, ticker, start, end):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError('upstream down')
+        return self.fetcher.fetch(ticker, start, end)
+
+
+def make_stale(store, drop_bars=10):
+    """Drop the newest bars and age the file, as if the last refresh was yesterday"""
+    bars = np.asarray(store._load_array(TICKER))
+    store._write(TICKER, bars[:-drop_bars])
+    yesterday = time.time() - 24 * 60 * 60
+    os.utime(store.path(TICKER), (yesterday, yesterday))
+
+
+def test_breaker():
+    """closed -> open after 3 failures -> one half-open probe -> closed/open"""
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60, clock=lambda: now[0])
+
+    states = []
+    for _ in range(3):
+        breaker.allow()
+        breaker.record_failure()
+    states.append((breaker.state, breaker.allow()))
+    now[0] = 61
+    probe = breaker.allow()
+    states.append((breaker.state, probe, breaker.allow()))  # probe claimed, second call rejected
+    breaker.record_failure()
+    states.append((breaker.state, breaker.allow()))
+    now[0] = 122
+    breaker.allow()
+    breaker.record_success()
+    states.append((breaker.state, breaker.allow()))
+
+    passed = states == [('open', False), ('half_open', True, False), ('open', False), ('closed', True)]
+    print(f"{'✓' if passed else '❌'} Breaker transitions: {states}")
+    return passed
+
+
+def test_serves_stale_immediately(predictor, fetcher):
+    """A slow upstream does not delay the request; the response says the data is stale"""
+    make_stale(predictor.data_store)
+    fetcher.delay = 2.0
+
+    start = time.perf_counter()
+    predictor.fetch_and_prepare_data(ticker=TICKER)
+    elapsed = time.perf_counter() - start
+    during = predictor.refresher.status(TICKER)
+
+    predictor.refresher.schedule(TICKER).result()
+    after = predictor.refresher.status(TICKER)
+    fetcher.delay = 0.0
+
+    passed = elapsed < 1.0 and during['stale'] and not after['stale']
+    print(f"{'✓' if passed else '❌'} Served in {elapsed * 1000:.0f} ms with a 2 s upstream "
+          f"(stale during refresh: {during['stale']}, after: {after['stale']})")
+    return passed
+
+
+def test_circuit_opens(predictor, fetcher):
+    """A failing upstream is called 3 times, then left alone while requests keep working"""
+    make_stale(predictor.data_store)
+    fetcher.fail = True
+    calls = fetcher.calls
+
+    for _ in range(10):
+        predictor.fetch_and_prepare_data(ticker=TICKER)
+        predictor.refresher.schedule(TICKER).result()
+    status = predictor.refresher.status(TICKER)
+    fetcher.fail = False
+
+    upstream_calls = fetcher.calls - calls
+    passed = upstream_calls == 3 and status['stale'] and status['upstream'] == 'open'
+    print(f"{'✓' if passed else '❌'} 10 requests during an outage: {upstream_calls} upstream calls, "
+          f"status {status}")
+    return passed
+
+
+def test_prediction_reports_staleness(predictor):
+    """Predictions carry data_status"""
+    target_date = predictor.data_date(TICKER) + timedelta(days=5)
+    result = predictor.predict(target_date.strftime('%Y-%m-%d'), TICKER)
+    status = result['data_status']
+    passed = status['stale'] and status['upstream'] == 'open' and status['age_seconds'] >= 24 * 60 * 60
+    print(f"{'✓' if passed else '❌'} Prediction data_status: {status}")
+    return passed
+
+
+def test_cold_start_unavailable(root):
+    """No stored bars and no upstream: an explicit error instead of sample data"""
+    fetcher = FlakyFetcher()
+    fetcher.fail = True
+    predictor = TFTPredictor(data_store=PriceStore(os.path.join(root, 'empty'), fetcher=fetcher))
+    try:
+        predictor.fetch_and_prepare_data(ticker=TICKER)
+        passed, message = False, 'no error'
+    except DataUnavailableError as e:
+        passed, message = True, str(e)
+    print(f"{'✓' if passed else '❌'} Empty store with upstream down: {message}")
+    return passed
+
+
+if __name__ == '__main__':
+    print("\n🧪 BBRI Stock Prediction - Stale-While-Revalidate Test\n")
+
+    with tempfile.TemporaryDirectory() as root:
+        fetcher = FlakyFetcher()
+        predictor = TFTPredictor(data_store=PriceStore(root, fetcher=fetcher))
+        predictor.fetch_and_prepare_data(ticker=TICKER)  # cold start fills the store
+
+        results = [
+            ("Circuit breaker", test_breaker()),
+            ("Stale data served immediately", test_serves_stale_immediately(predictor, fetcher)),
+            ("Circuit opens on outage", test_circuit_opens(predictor, fetcher)),
+            ("Staleness in prediction", test_prediction_reports_staleness(predictor)),
+            ("Cold start unavailable", test_cold_start_unavailable(root)),
+        ]
+
+    # Summary
+    print("\n" + "=" * 80)
+    print("Test Summary")
+    print("=" * 80)
+
+    for test_name, passed in results:
+        status = "✓ PASSED" if passed else "❌ FAILED"
+        print(f"{test_name:.<50} {status}")
+
+    total_passed = sum(1 for _, passed in results if passed)
+    print(f"\nTotal: {total_passed}/{len(results)} tests passed")
+    sys.exit(0 if total_passed == len(results) else 1)
@@ -5,8 +5,12 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from predictor.sample_data import create_sample_bbri_data
-from datetime import datetime
+import time
+import tempfile
+import numpy as np
+from predictor.data_store import PriceStore, SampleDataFetcher
+from predictor.sample_data import create_sample_bbri_data, create_sample_prices
+from datetime import datetime, timedelta
 
 print("Testing sample data generation...")
 print("=" * 60)
@@ -23,5 +27,30 @@ print(f"✓ Days from last date to today: {(datetime.now().date() - df['date'].i
 print("\nLast 5 rows:")
 print(df[['date', 'close']].tail())
 
+print("\nMulti-ticker generation (10 years x 50 tickers)...")
+start = time.perf_counter()
+prices = create_sample_prices(days=2600, tickers=[f"SIM{i}.JK" for i in range(50)])
+print(f"✓ {len(prices)} bars in {(time.perf_counter() - start) * 1000:.1f} ms")
+print(f"✓ Price range: {prices['close'].min():.0f} - {prices['close'].max():.0f}")
+print(f"✓ Weekend bars: {(prices['date'].dt.weekday >= 5).sum()}")
+
+print("\nSample fetcher slices (offline 'sample' price source)...")
+fetcher = SampleDataFetcher()
+today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+wide = fetcher.fetch('BBRI.JK', today - timedelta(days=400), today)
+narrow = fetcher.fetch('BBRI.JK', today - timedelta(days=100), today - timedelta(days=30))
+same_slice = np.allclose(wide.set_index('date').loc[narrow['date'], 'close'], narrow['close'])
+print(f"{'✓' if same_slice else '❌'} Overlapping slices return the same bars")
+
+# Refreshing in two steps gives the same bars as one download
+with tempfile.TemporaryDirectory() as root:
+    store = PriceStore(root, fetcher=fetcher, history_days=380)  # starts where wide does
+    store.refresh('BBRI.JK', end=today - timedelta(days=20))
+    store.refresh('BBRI.JK', end=today)
+    stored = store.read('BBRI.JK')
+joined = len(stored) == len(wide) and np.allclose(stored['close'], wide['close'])
+print(f"{'✓' if joined else '❌'} Appended bars continue the stored series ({len(stored)} bars)")
+print(f"✓ Last published bar: {wide['date'].iloc[-1].date()} (nothing after yesterday)")
+
 print("\n" + "=" * 60)
 print("Sample data test completed!")
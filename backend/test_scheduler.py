@@ -0,0 +1,257 @@
+"""
+Test the IDX trading calendar and the scheduled market-data refresh
+Run this after changing predictor/trading_calendar.py or predictor/scheduler.py
+"""
+import os
+import sys
+import time
+import tempfile
+import django
+from datetime import date, datetime, timedelta, timezone
+
+# Setup Django
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bbri_backend.settings')
+django.setup()
+
+import numpy as np
+import pandas as pd
+from django.test import override_settings
+from predictor.data_store import PriceStore
+from predictor.market_sim import MarketSimulator
+from predictor.model import TFTPredictor
+from predictor.revalidate import DataUnavailableError
+from predictor.scheduler import MarketDataJob, MarketDataScheduler, last_scheduled_run, next_scheduled_run
+from predictor.trading_calendar import JAKARTA, IDXCalendar
+
+TICKER = 'BBRI.JK'
+
+
+class CountingFetcher:
+    """MarketSimulator that counts upstream calls"""
+
+    def __init__(self):
+        self.fetcher = MarketSimulator(seed=11)
+        self.calls = 0
+
+    def fetch(self, ticker, start, end):
+        self.calls += 1
+        return self.fetcher.fetch(ticker, start, end)
+
+
+class SessionFetcher:
+    """Daily [start, end) bars, published up to and including last_session"""
+
+    def __init__(self, last_session):
+        self.last_session = last_session
+        self.calls = 0
+
+    def fetch(self, ticker, start, end):
+        self.calls += 1
+        days = pd.date_range(start, min(pd.Timestamp(end), pd.Timestamp(self.last_session) + pd.Timedelta(days=1)),
+                              inclusive='left')
+        # Price depends only on the date, so any slice continues the stored bars
+        close = 4500 + 300 * np.sin(days.to_julian_date().to_numpy() / 9.0)
+        return pd.DataFrame({'date': days, 'open': close, 'high': close * 1.01, 'low': close * 0.99,
+                             'close': close, 'volume': 1e6})
+
+
+def wib(*args):
+    return datetime(*args, tzinfo=JAKARTA)
+
+
+def make_stale(store, drop_bars=10):
+    """Drop the newest bars and age the file, as if the last refresh was days ago"""
+    bars = np.asarray(store._load_array(TICKER))
+    store._write(TICKER, bars[:-drop_bars])
+    last_week = time.time() - 7 * 24 * 60 * 60
+    os.utime(store.path(TICKER), (last_week, last_week))
+
+
+def test_calendar():
+    """Weekends and exchange holidays are skipped, closes are 16:00 WIB"""
+    calendar = IDXCalendar()
+    checks = {
+        'weekend': not calendar.is_trading_day(date(2025, 8, 16)),
+        'holiday': not calendar.is_trading_day(date(2025, 8, 18)),
+        'trading day': calendar.is_trading_day(date(2025, 8, 19)),
+        # Friday evening -> that Friday's close; next is Tuesday after the Monday holiday
+        'previous close': calendar.previous_close(wib(2025, 8, 15, 17, 0)) == wib(2025, 8, 15, 16, 0),
+        'next close': calendar.next_close(wib(2025, 8, 15, 17, 0)) == wib(2025, 8, 19, 16, 0),
+        # Before the close the session is still open
+        'intraday': calendar.previous_close(wib(2025, 8, 19, 10, 0)) == wib(2025, 8, 15, 16, 0),
+        # Idul Fitri closure 2025-03-28 .. 2025-04-07
+        'lebaran': calendar.next_close(wib(2025, 3, 27, 16, 0)) == wib(2025, 4, 8, 16, 0),
+        'utc input': calendar.previous_close(datetime(2025, 8, 15, 2, 0, tzinfo=timezone.utc)) == wib(2025, 8, 14, 16, 0),
+        'trading days': len(calendar.trading_days(date(2025, 3, 24), date(2025, 4, 11))) == 8,
+        'covered years': calendar.missing_years == set(),
+    }
+    # A year without holiday data is reported once
+    calendar.is_trading_day(date(2099, 1, 1))
+    calendar.is_trading_day(date(2099, 1, 2))
+    checks['missing year reported'] = calendar.missing_years == {2099} and calendar.holidays_through() >= 2026
+    failed = [name for name, ok in checks.items() if not ok]
+    print(f"{'✓' if not failed else '❌'} Calendar checks {'passed' if not failed else f'failed: {failed}'}")
+    return not failed
+
+
+def test_run_times():
+    """Runs are due 30 minutes after each close, never on closed days"""
+    calendar = IDXCalendar()
+    delay = timedelta(minutes=30)
+    cases = [
+        (wib(2025, 8, 15, 16, 10), wib(2025, 8, 14, 16, 30), wib(2025, 8, 15, 16, 30)),
+        (wib(2025, 8, 15, 16, 30), wib(2025, 8, 15, 16, 30), wib(2025, 8, 19, 16, 30)),
+        (wib(2025, 8, 17, 12, 0), wib(2025, 8, 15, 16, 30), wib(2025, 8, 19, 16, 30)),
+    ]
+    passed = True
+    for now, last, upcoming in cases:
+        got = (last_scheduled_run(calendar, delay, now), next_scheduled_run(calendar, delay, now))
+        ok = got == (last, upcoming)
+        passed = passed and ok
+        print(f"{'✓' if ok else '❌'} {now:%a %Y-%m-%d %H:%M}: last {got[0]:%Y-%m-%d %H:%M}, next {got[1]:%Y-%m-%d %H:%M}")
+    return passed
+
+
+def test_job_refreshes_and_warms(root):
+    """The job appends the new bars, drops outdated forecasts and caches the new ones"""
+    fetcher = CountingFetcher()
+    predictor = TFTPredictor(data_store=PriceStore(root, fetcher=fetcher))
+    predictor.fetch_and_prepare_data(ticker=TICKER)
+    make_stale(predictor.data_store)
+    outdated = (TICKER, '2000-01-03', predictor.weights_hash)
+    predictor.forecast_cache.set(outdated, np.zeros((30, 7), dtype=np.float32))
+
+    report = MarketDataJob(predictor, [TICKER]).run()[TICKER]
+    last_date = predictor.data_store.last_date(TICKER).strftime('%Y-%m-%d')
+    current = (TICKER, last_date, predictor.weights_hash)
+
+    checks = {
+        'bars appended': report['appended'] >= 10 and report['error'] is None,
+        'last date reported': report['last_date'] == last_date,
+        'outdated forecast dropped': predictor.forecast_cache.get(outdated) is None,
+        'new forecast cached': predictor.forecast_cache.get(current) is not None,
+        'fresh': not predictor.refresher.is_stale(TICKER),
+    }
+    failed = [name for name, ok in checks.items() if not ok]
+    print(f"{'✓' if not failed else '❌'} Job: {report['appended']} bars appended, forecast from {last_date} warmed"
+          + (f", failed: {failed}" if failed else ''))
+    return not failed
+
+
+def test_requests_skip_upstream(root):
+    """With a scheduler the request path never calls the upstream"""
+    with override_settings(PRICE_SCHEDULER='sidecar'):
+        fetcher = CountingFetcher()
+        predictor = TFTPredictor(data_store=PriceStore(root, fetcher=fetcher))
+
+        try:
+            predictor.fetch_and_prepare_data(ticker='BBCA.JK')
+            cold_start = False
+        except DataUnavailableError:
+            cold_start = True
+
+        make_stale(predictor.data_store)
+        predictor.fetch_and_prepare_data(ticker=TICKER)
+        time.sleep(0.2)  # a background refresh would have started by now
+        status = predictor.refresher.status(TICKER)
+
+    passed = cold_start and fetcher.calls == 0 and status['stale']
+    print(f"{'✓' if passed else '❌'} Upstream calls on the request path: {fetcher.calls}, "
+          f"cold start 503: {cold_start}, stale reported: {status['stale']}")
+    return passed
+
+
+class EveryDayCalendar(IDXCalendar):
+    """Trades every day, so today's session exists whatever day the test runs"""
+
+    def is_trading_day(self, day):
+        return True
+
+
+def test_same_day_bar(root):
+    """The run after today's close fetches today's bar with the real job, without retries"""
+    calendar = EveryDayCalendar()
+    session = date.today()
+    fetcher = SessionFetcher(session)
+    predictor = TFTPredictor(data_store=PriceStore(root, fetcher=fetcher))
+    # Stored through the previous session, as after yesterday's run
+    predictor.data_store.refresh(TICKER, end=datetime.combine(session, datetime.min.time()))
+    seeded = predictor.data_store.last_date(TICKER).date()
+
+    job = MarketDataJob(predictor, [TICKER], warm=False, calendar=calendar)
+    now = calendar.session_close(session) + timedelta(minutes=31)
+    scheduler = MarketDataScheduler(job, calendar, retry_interval=timedelta(milliseconds=10), clock=lambda: now)
+    report = scheduler.run_once()[TICKER]
+
+    passed = seeded < session and report['last_date'] == session.strftime('%Y-%m-%d') and fetcher.calls == 2
+    print(f"{'✓' if passed else '❌'} Run after the {session} close: stored through {seeded}, "
+          f"last bar {report['last_date']}, {report['appended']} appended, {fetcher.calls - 1} upstream calls")
+    return passed
+
+
+def test_scheduler_loop():
+    """Idle until the due time, then run; tickers missing the close's bar are retried"""
+    class StubJob:
+        def __init__(self):
+            self.calls = []
+
+        def stale_tickers(self):
+            return []
+
+        def run(self, tickers=None, end=None):
+            self.calls.append(tickers)
+            # The close's bar only shows up on the second attempt
+            last_date = '2025-08-15' if len(self.calls) > 1 else '2025-08-14'
+            return {TICKER: {'appended': 1, 'last_date': last_date, 'error': None}}
+
+    now = [wib(2025, 8, 15, 16, 29, 59, 900000)]
+    job = StubJob()
+    scheduler = MarketDataScheduler(
+        job, IDXCalendar(), retry_interval=timedelta(milliseconds=10), clock=lambda: now[0],
+    ).start()
+
+    time.sleep(0.5)
+    idle = job.calls == []
+    now[0] = wib(2025, 8, 15, 16, 31)
+    deadline = time.monotonic() + 5
+    while scheduler.runs == 0 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    stats = scheduler.stats()
+
+    started = time.perf_counter()
+    scheduler.stop(timeout=5)
+    stopped = not scheduler._thread.is_alive() and time.perf_counter() - started < 1
+
+    passed = (idle and job.calls == [None, [TICKER]] and stats['runs'] == 1
+              and stats['next_run'].startswith('2025-08-19T16:30') and stopped)
+    print(f"{'✓' if passed else '❌'} Scheduler: idle before due {idle}, job calls {job.calls}, "
+          f"next run {stats['next_run']}, stopped {stopped}")
+    return passed
+
+
+if __name__ == '__main__':
+    print("\n🧪 BBRI Stock Prediction - Market Data Scheduler Test\n")
+
+    with tempfile.TemporaryDirectory() as root:
+        results = [
+            ("IDX calendar", test_calendar()),
+            ("Scheduled run times", test_run_times()),
+            ("Job refreshes and warms", test_job_refreshes_and_warms(os.path.join(root, 'job'))),
+            ("No upstream calls on requests", test_requests_skip_upstream(os.path.join(root, 'job'))),
+            ("Same-day bar", test_same_day_bar(os.path.join(root, 'session'))),
+            ("Scheduler loop", test_scheduler_loop()),
+        ]
+
+    # Summary
+    print("\n" + "=" * 80)
+    print("Test Summary")
+    print("=" * 80)
+
+    for test_name, passed in results:
+        status = "✓ PASSED" if passed else "❌ FAILED"
+        print(f"{test_name:.<50} {status}")
+
+    total_passed = sum(1 for _, passed in results if passed)
+    print(f"\nTotal: {total_passed}/{len(results)} tests passed")
+    sys.exit(0 if total_passed == len(results) else 1)
@@ -0,0 +1,111 @@
+"""
+Test the zero-copy window builder against the loop-based create_sequences
+Run this after changing predictor/windows.py
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+from predictor.windows import WindowBatches, sequence_windows, sliding_windows
+
+
+def reference_sequences(data, seq_length):
+    """Loop version from the training notebook"""
+    X, y = [], []
+    for i in range(len(data) - seq_length):
+        X.append(data[i:i+seq_length])
+        y.append(data[i+seq_length, 0])
+    return np.array(X), np.array(y)
+
+
+def test_matches_loop(data, seq_length):
+    """Same windows and targets as the loop, without copying"""
+    start = time.perf_counter()
+    X, y = sequence_windows(data, seq_length)
+    elapsed = (time.perf_counter() - start) * 1000
+    expected_X, expected_y = reference_sequences(data, seq_length)
+
+    passed = np.array_equal(X, expected_X) and np.array_equal(y, expected_y)
+    shared = np.shares_memory(X, data) and np.shares_memory(y, data)
+    print(f"{'✓' if passed else '❌'} {X.shape} windows match the loop ({elapsed:.3f} ms)")
+    print(f"{'✓' if shared else '❌'} Windows are views into the source array")
+    return passed and shared
+
+
+def test_sliding_windows():
+    """1D input and step"""
+    series = np.arange(10)
+    windows = sliding_windows(series, 4, step=3)
+    passed = windows.tolist() == [[0, 1, 2, 3], [3, 4, 5, 6], [6, 7, 8, 9]]
+    print(f"{'✓' if passed else '❌'} Stepped 1D windows: {windows.tolist()}")
+    return passed
+
+
+def test_batches(data, seq_length):
+    """Shuffled batches cover every window once per epoch, split keeps time order"""
+    train, val = WindowBatches(data, seq_length, batch_size=64, shuffle=True, seed=1).split(0.9)
+    expected_X, expected_y = reference_sequences(data, seq_length)
+
+    passed = True
+    for epoch in range(2):
+        seen = []
+        for X, y in train:
+            rows = np.flatnonzero(np.isin(expected_y, y))
+            passed &= X.shape[1:] == (seq_length, data.shape[1]) and len(X) <= 64
+            seen.append(np.sort(rows))
+        seen = np.sort(np.concatenate(seen))
+        passed &= np.array_equal(seen, np.arange(len(train.indices)))
+
+    X_val, y_val = val[0]
+    passed &= np.array_equal(X_val, expected_X[train.indices[-1] + 1:][:64])
+    print(f"{'✓' if passed else '❌'} {len(train)} training / {len(val)} validation batches cover all windows")
+    return passed
+
+
+def test_memory(features, days=20000, seq_length=60):
+    """Peak memory while iterating over one epoch stays near one batch"""
+    data = np.random.default_rng(0).random((days, features), dtype=np.float32)
+    batch_bytes = 32 * seq_length * features * 4
+
+    tracemalloc.start()
+    for X, y in WindowBatches(data, seq_length, batch_size=32, shuffle=True, seed=0):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    loop_bytes = (days - seq_length) * seq_length * features * 4
+    passed = peak < 4 * batch_bytes + 2 * days * 8
+    print(f"{'✓' if passed else '❌'} {days} days x {features} features: peak {peak / 1e6:.2f} MB "
+          f"(materialized windows: {loop_bytes / 1e6:.0f} MB)")
+    return passed
+
+
+if __name__ == '__main__':
+    print("\n🧪 BBRI Stock Prediction - Window Builder Test\n")
+
+    data = np.random.default_rng(42).random((1000, 13))
+
+    results = [
+        ("Matches loop", test_matches_loop(data, 60)),
+        ("Sliding windows", test_sliding_windows()),
+        ("Batches", test_batches(data, 60)),
+    ]
+    for features in (13, 50):
+        results.append((f"Flat memory ({features} features)", test_memory(features)))
+
+    # Summary
+    print("\n" + "=" * 80)
+    print("Test Summary")
+    print("=" * 80)
+
+    for test_name, passed in results:
+        status = "✓ PASSED" if passed else "❌ FAILED"
+        print(f"{test_name:.<50} {status}")
+
+    total_passed = sum(1 for _, passed in results if passed)
+    print(f"\nTotal: {total_passed}/{len(results)} tests passed")
+    sys.exit(0 if total_passed == len(results) else 1)
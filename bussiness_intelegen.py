@@ -1,357 +1,445 @@
 # -*- coding: utf-8 -*-
-"""Bussiness intelegen.ipynb
+"""
+Model comparison pipeline for BBRI: ARIMA vs SARIMAX vs LSTM vs TFT
 
-Automatically generated by Colab.
+Originally the "Bussiness intelegen" Colab notebook. Each model now trains in its
+own worker process with a bounded thread count, prepared feature frames are
+cached on disk between runs, and the wall time of every model is reported.
+The best model (lowest RMSE) is saved for deployment as before.
 
-Original file is located at
-    https://colab.research.google.com/drive/15PnxZv7b_98H33bO1_LHlUgUk8c-8pZy
+Usage:
+    python bussiness_intelegen.py                              # all models in parallel
+    python bussiness_intelegen.py --models TFT LSTM --jobs 2
+    python bussiness_intelegen.py --end 2025-12-01 --plot report.html
+    python bussiness_intelegen.py --source simulator           # offline data
 
-# Install libraries
+Requirements:
+    pip install pytorch-forecasting lightning pandas numpy yfinance ta bokeh scikit-learn statsmodels tensorflow
 """
-
-!pip install pytorch-forecasting lightning pandas numpy yfinance ta bokeh scikit-learn statsmodels tensorflow -q
-
-import pandas as pd
-import numpy as np
-import yfinance as yf
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import time
 import warnings
-warnings.filterwarnings('ignore')
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-from statsmodels.tsa.arima.model import ARIMA
-from statsmodels.tsa.statespace.sarimax import SARIMAX
+import numpy as np
+import pandas as pd
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
-"""# Deep Learning Models"""
+warnings.filterwarnings('ignore')
 
-import tensorflow as tf
-from tensorflow import keras
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import LSTM, Dense, Dropout
-from tensorflow.keras.callbacks import EarlyStopping
-from sklearn.preprocessing import MinMaxScaler
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(ROOT_DIR, 'backend'))
 
-"""# PyTorch dan TFT"""
+# Same indicator engine and price store as the backend (backend/predictor/)
+from predictor.data_store import PriceStore, create_fetcher
+from predictor.indicators import EXTENDED_INDICATOR_COLUMNS, add_technical_indicators
+from predictor.windows import WindowBatches
 
-import torch
-from pytorch_forecasting import TimeSeriesDataSet, TemporalFusionTransformer
-from pytorch_forecasting.data import GroupNormalizer
-from pytorch_forecasting.metrics import QuantileLoss
-from lightning.pytorch import Trainer
-from lightning.pytorch.callbacks import EarlyStopping as PLEarlyStopping
 
-"""# Visualisasi dengan Bokeh"""
+TICKER = "BBRI.JK"
+START_DATE = "2010-01-01"
+END_DATE = "2025-11-01"
 
-from bokeh.plotting import figure, show, output_notebook
-from bokeh.layouts import column, row, gridplot
-from bokeh.models import HoverTool, Legend
-from bokeh.palettes import Category10
+MODELS = ('ARIMA', 'SARIMAX', 'LSTM', 'TFT')
 
-"""# Technical Analysis"""
+# Statistical models are single-threaded; the deep models share the remaining CPUs
+STATISTICAL_MODELS = ('ARIMA', 'SARIMAX')
 
-import ta
+CACHE_DIR = os.path.join(ROOT_DIR, 'backend', 'data', 'training')
 
-from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+EXOG_FEATURES = ['ma_7', 'ma_30', 'rsi', 'macd', 'volume_ma_7']
 
-"""# Load Data Saham BBRI"""
+LSTM_FEATURES = ['close', 'open', 'high', 'low', 'volume',
+                 'ma_7', 'ma_30', 'rsi', 'macd', 'macd_signal',
+                 'bb_upper', 'bb_middle', 'bb_lower']
 
-import yfinance as yf
-import pandas as pd
+SEQ_LENGTH = 60
+MAX_ENCODER_LENGTH = 60
 
-ticker_symbol= "BBRI.JK"
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'TF_NUM_INTRAOP_THREADS')
 
-start_date = "2010-01-01"
-end_date = "2025-11-01"
 
-df = yf.download(ticker_symbol, start=start_date, end=end_date)
-df.reset_index(inplace=True)
+# Load Data Saham BBRI
 
-# Flatten MultiIndex columns if they exist
-if isinstance(df.columns, pd.MultiIndex):
-    # This creates names like 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume', 'Date'
-    # if it's from a single ticker and Price/Ticker levels
-    # For a single ticker, the structure is usually (Level 0, Level 1) where Level 0 is 'Price' and Level 1 is actual column name.
-    # 'Date' column is usually top level.
-    df.columns = [col[1] if col[0] == 'Price' else col[0] for col in df.columns.values]
+def load_prices(ticker, start, end, source='yahoo', cache_dir=CACHE_DIR):
+    """
+    Daily OHLCV bars in [start, end)
 
-# Rename 'Date' to 'date' and convert all others to lowercase
-new_columns = []
-for col in df.columns:
-    if col == 'Date':
-        new_columns.append('date')
-    else:
-        new_columns.append(col.lower().replace(' ', '_'))
-df.columns = new_columns
+    Bars are kept in a local PriceStore, so later runs only download the bars
+    added since the previous run.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    store = PriceStore(
+        os.path.join(cache_dir, 'prices', source),
+        fetcher=create_fetcher(source),
+        history_days=(end - start).days,
+    )
+    store.refresh(ticker, end=end.to_pydatetime())
+    df = store.read(ticker, start=start.to_pydatetime())
+    return df[df['date'] < end].reset_index(drop=True)
 
-# Ensure only desired columns are kept and in a standard order
-# This assumes 'adj_close' might be present but 'close' is what's used for MA.
-# We are making sure 'close' exists and removing 'adj_close' for simplicity if it's not needed.
-cols_to_keep = ['date', 'open', 'high', 'low', 'close', 'volume']
-df = df[[col for col in cols_to_keep if col in df.columns]].copy()
 
-(df)
+# MENGHITUNG INDIKATOR TEKNIKAL
 
-"""# MENGHITUNG INDIKATOR TEKNIKAL"""
+def prepare_features(prices):
+    """Technical indicators, volume and price-change features, without NaN rows"""
+    # MA 7/30, RSI, MACD + Signal Line, Bollinger Bands
+    df = add_technical_indicators(prices.copy(), EXTENDED_INDICATOR_COLUMNS)
 
-# Moving Average (MA) 7 dan 30 hari
-df['ma_7'] = df['close'].rolling(window=7).mean()
-df['ma_30'] = df['close'].rolling(window=30).mean()
+    # Volume features
+    df['volume_ma_7'] = df['volume'].rolling(window=7).mean()
 
-"""Relative Strength Index (RSI)"""
+    # Price changes
+    df['returns'] = df['close'].pct_change()
+    df['price_change'] = df['close'].diff()
 
-df['rsi'] = ta.momentum.RSIIndicator(close=df['close'], window=14).rsi()
+    return df.dropna().reset_index(drop=True)
 
-"""MACD dan Signal Line"""
 
-macd = ta.trend.MACD(close=df['close'])
-df['macd'] = macd.macd()
-df['macd_signal'] = macd.macd_signal()
-df['macd_diff'] = macd.macd_diff()
+def load_features(ticker, start, end, source='yahoo', cache_dir=CACHE_DIR, refresh=False):
+    """
+    Prepared feature frame, cached per ticker, source and last bar date
 
-"""Bollinger Bands"""
+    Returns:
+        Tuple of (DataFrame, whether it came from the cache)
+    """
+    prices = load_prices(ticker, start, end, source, cache_dir)
+    if prices.empty:
+        raise ValueError(f"No price data for {ticker} between {start} and {end}")
 
-bollinger = ta.volatility.BollingerBands(close=df['close'], window=20, window_dev=2)
-df['bb_upper'] = bollinger.bollinger_hband()
-df['bb_middle'] = bollinger.bollinger_mavg()
-df['bb_lower'] = bollinger.bollinger_lband()
-df['bb_width'] = bollinger.bollinger_wband()
+    feature_dir = os.path.join(cache_dir, 'features')
+    os.makedirs(feature_dir, exist_ok=True)
+    prefix = f"{ticker}_{source}_{pd.Timestamp(start):%Y%m%d}_"
+    path = os.path.join(feature_dir, f"{prefix}{prices['date'].iloc[-1]:%Y%m%d}_{len(prices)}.pkl")
 
-"""Volume features"""
+    if os.path.exists(path) and not refresh:
+        return pd.read_pickle(path), True
 
-df['volume_ma_7'] = df['volume'].rolling(window=7).mean()
+    df = prepare_features(prices)
+    # Frames from older data are superseded by this one
+    for name in os.listdir(feature_dir):
+        if name.startswith(prefix):
+            os.remove(os.path.join(feature_dir, name))
+    df.to_pickle(path)
+    return df, False
 
-"""Price changes"""
 
-df['returns'] = df['close'].pct_change()
-df['price_change'] = df['close'].diff()
+# SPLIT DATA
 
-"""Remove NaN values"""
+def split_data(df, train_size):
+    return df[:train_size].copy(), df[train_size:].copy()
 
-df = df.dropna().reset_index(drop=True)
 
-train_size = int(len(df) * 0.8)
-test_size = len(df) - train_size
+def plan_threads(models, jobs, cpus=None):
+    """
+    Threads per model when up to jobs models train at the same time
 
-train_df = df[:train_size].copy()
-test_df = df[train_size:].copy()
+    Returns:
+        Dictionary of model name -> thread count
+    """
+    cpus = cpus or os.cpu_count() or 1
+    if jobs <= 1:
+        return {name: cpus for name in models}
 
-print(f"✓ Data split selesai")
-print(f"  - Training: {len(train_df)} baris ({train_size/len(df)*100:.1f}%)")
-print(f"  - Testing: {len(test_df)} baris ({test_size/len(df)*100:.1f}%)")
+    statistical = [name for name in models if name in STATISTICAL_MODELS]
+    deep = [name for name in models if name not in STATISTICAL_MODELS]
+    deep_threads = max((cpus - len(statistical)) // max(min(len(deep), jobs), 1), 1)
+    return {name: 1 if name in STATISTICAL_MODELS else deep_threads for name in models}
 
-"""# SPLIT DATA
 
-ARIMA
-"""
+def limit_threads(threads):
+    """Cap BLAS/OpenMP/torch/TensorFlow threads in this process"""
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    os.environ['TF_NUM_INTEROP_THREADS'] = '1'
 
-# ARIMA hanya menggunakan data univariate (close price)
-train_close = train_df['close'].values
+    # Worker processes may be reused for a second model with libraries already loaded
+    if 'torch' in sys.modules:
+        sys.modules['torch'].set_num_threads(threads)
+    if 'tensorflow' in sys.modules:
+        try:
+            sys.modules['tensorflow'].config.threading.set_intra_op_parallelism_threads(threads)
+        except RuntimeError:
+            pass  # Already initialized in this process
 
-# Fit ARIMA model (p=5, d=1, q=2)
-arima_model = ARIMA(train_close, order=(5, 1, 2))
-arima_fitted = arima_model.fit()
 
-# Predict
-arima_predictions = arima_fitted.forecast(steps=test_size)
+# ARIMA
 
-print("✓ ARIMA Model berhasil dilatih")
-print(f"  - Order: (5, 1, 2)")
-print(f"  - AIC: {arima_fitted.aic:.2f}")
+def train_arima(df, train_size, model_dir):
+    import joblib
+    from statsmodels.tsa.arima.model import ARIMA
 
-"""SARIMAX"""
+    train_df, test_df = split_data(df, train_size)
 
-# SARIMAX dengan exogenous variables (indikator teknikal)
-exog_features = ['ma_7', 'ma_30', 'rsi', 'macd', 'volume_ma_7']
-train_exog = train_df[exog_features].values
-test_exog = test_df[exog_features].values
+    # ARIMA hanya menggunakan data univariate (close price)
+    arima_model = ARIMA(train_df['close'].values, order=(5, 1, 2))
+    arima_fitted = arima_model.fit()
+    predictions = arima_fitted.forecast(steps=len(test_df))
 
-# Fit SARIMAX model
-sarimax_model = SARIMAX(
-    train_close,
-    exog=train_exog,
-    order=(5, 1, 2),
-    seasonal_order=(1, 1, 1, 12),
-    enforce_stationarity=False,
-    enforce_invertibility=False
-)
-sarimax_fitted = sarimax_model.fit(disp=False)
-sarimax_predictions = sarimax_fitted.forecast(steps=test_size, exog=test_exog)
+    path = os.path.join(model_dir, 'best_arima_model.pkl')
+    joblib.dump(arima_fitted, path)
+    return predictions, path, {'Order': '(5, 1, 2)', 'AIC': f"{arima_fitted.aic:.2f}"}
 
-print("✓ SARIMAX Model berhasil dilatih")
-print(f"  - Order: (5, 1, 2)")
-print(f"  - Seasonal Order: (1, 1, 1, 12)")
-print(f"  - AIC: {sarimax_fitted.aic:.2f}")
 
-"""LSTM"""
+# SARIMAX
 
-# Prepare data for LSTM
-lstm_features = ['close', 'open', 'high', 'low', 'volume',
-                 'ma_7', 'ma_30', 'rsi', 'macd', 'macd_signal',
-                 'bb_upper', 'bb_middle', 'bb_lower']
+def train_sarimax(df, train_size, model_dir):
+    import joblib
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+
+    train_df, test_df = split_data(df, train_size)
+
+    # SARIMAX dengan exogenous variables (indikator teknikal)
+    sarimax_model = SARIMAX(
+        train_df['close'].values,
+        exog=train_df[EXOG_FEATURES].values,
+        order=(5, 1, 2),
+        seasonal_order=(1, 1, 1, 12),
+        enforce_stationarity=False,
+        enforce_invertibility=False
+    )
+    sarimax_fitted = sarimax_model.fit(disp=False)
+    predictions = sarimax_fitted.forecast(steps=len(test_df), exog=test_df[EXOG_FEATURES].values)
+
+    path = os.path.join(model_dir, 'best_sarimax_model.pkl')
+    joblib.dump(sarimax_fitted, path)
+    return predictions, path, {
+        'Order': '(5, 1, 2)',
+        'Seasonal Order': '(1, 1, 1, 12)',
+        'AIC': f"{sarimax_fitted.aic:.2f}",
+    }
+
+
+# LSTM
+
+def train_lstm(df, train_size, model_dir):
+    from sklearn.preprocessing import MinMaxScaler
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import LSTM, Dense, Dropout
+    from tensorflow.keras.callbacks import EarlyStopping
+    from tensorflow.keras.utils import Sequence
+
+    class LSTMBatches(WindowBatches, Sequence):
+        pass
+
+    # Scale data
+    scaler = MinMaxScaler(feature_range=(0, 1))
+    scaled_data = scaler.fit_transform(df[LSTM_FEATURES].values).astype(np.float32)
+
+    # Windows of SEQ_LENGTH days predicting the next close price, copied one batch at a time
+    n_windows = len(scaled_data) - SEQ_LENGTH
+    train_size_lstm = int(n_windows * 0.8)
+    train_batches, val_batches = LSTMBatches(
+        scaled_data, SEQ_LENGTH, batch_size=32, indices=np.arange(train_size_lstm), shuffle=True, seed=42,
+    ).split(0.9)
+    test_batches = LSTMBatches(scaled_data, SEQ_LENGTH, batch_size=256, indices=np.arange(train_size_lstm, n_windows))
+
+    # Build LSTM model
+    lstm_model = Sequential([
+        LSTM(100, return_sequences=True, input_shape=(SEQ_LENGTH, len(LSTM_FEATURES))),
+        Dropout(0.2),
+        LSTM(100, return_sequences=True),
+        Dropout(0.2),
+        LSTM(50, return_sequences=False),
+        Dropout(0.2),
+        Dense(25),
+        Dense(1)
+    ])
+    lstm_model.compile(optimizer='adam', loss='mean_squared_error')
+
+    # Train
+    early_stop = EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True)
+    history = lstm_model.fit(
+        train_batches,
+        validation_data=val_batches,
+        epochs=50,
+        callbacks=[early_stop],
+        verbose=0
+    )
+
+    # Predict and inverse transform the close price column
+    predictions_scaled = lstm_model.predict(test_batches, verbose=0)
+    predictions_full = np.zeros((len(predictions_scaled), len(LSTM_FEATURES)))
+    predictions_full[:, 0] = predictions_scaled.flatten()
+    predictions = scaler.inverse_transform(predictions_full)[:, 0]
+
+    path = os.path.join(model_dir, 'best_lstm_model.h5')
+    lstm_model.save(path)
+    return predictions, path, {
+        'Architecture': '3 LSTM layers (100, 100, 50 units)',
+        'Sequence Length': SEQ_LENGTH,
+        'Epochs': len(history.history['loss']),
+    }
+
+
+# Temporal Fusion Transformer
+
+def train_tft(df, train_size, model_dir):
+    import torch
+    from pytorch_forecasting import TimeSeriesDataSet, TemporalFusionTransformer
+    from pytorch_forecasting.data import GroupNormalizer
+    from pytorch_forecasting.metrics import QuantileLoss
+    from lightning.pytorch import Trainer
+    from lightning.pytorch.callbacks import EarlyStopping as PLEarlyStopping
+    from predictor.model_spec import build_model_spec, save_model_spec
+
+    # Prepare data for TFT
+    df_tft = df.copy()
+    df_tft['time_idx'] = range(len(df_tft))
+    df_tft['series'] = 'BBRI'
+    df_tft['target'] = df_tft['close']
+
+    train_tft = df_tft[:train_size].copy()
+    test_tft = df_tft[train_size:].copy()
+
+    max_prediction_length = min(30, len(test_tft))
+
+    training_tft = TimeSeriesDataSet(
+        train_tft,
+        time_idx="time_idx",
+        target="target",
+        group_ids=["series"],
+        min_encoder_length=MAX_ENCODER_LENGTH // 2,
+        max_encoder_length=MAX_ENCODER_LENGTH,
+        min_prediction_length=1,
+        max_prediction_length=max_prediction_length,
+        static_categoricals=["series"],
+        time_varying_known_reals=["time_idx"],
+        time_varying_unknown_reals=[
+            "target", "open", "high", "low", "volume",
+            "ma_7", "ma_30", "rsi", "macd", "macd_signal",
+            "bb_upper", "bb_middle", "bb_lower"
+        ],
+        target_normalizer=GroupNormalizer(groups=["series"], transformation="softplus"),
+        add_relative_time_idx=True,
+        add_target_scales=True,
+        add_encoder_length=True,
+    )
+    validation_tft = TimeSeriesDataSet.from_dataset(training_tft, test_tft, predict=True, stop_randomization=True)
+
+    # Dataloaders
+    batch_size = 32
+    train_dataloader = training_tft.to_dataloader(train=True, batch_size=batch_size, num_workers=0)
+    val_dataloader = validation_tft.to_dataloader(train=False, batch_size=batch_size, num_workers=0)
+
+    tft = TemporalFusionTransformer.from_dataset(
+        training_tft,
+        learning_rate=0.03,
+        hidden_size=32,
+        attention_head_size=2,
+        dropout=0.1,
+        hidden_continuous_size=16,
+        output_size=7,
+        loss=QuantileLoss(),
+        reduce_on_plateau_patience=4,
+    )
+
+    early_stop_tft = PLEarlyStopping(monitor="val_loss", min_delta=1e-4, patience=10, verbose=False, mode="min")
+    trainer = Trainer(
+        max_epochs=30,
+        accelerator="auto",
+        gradient_clip_val=0.1,
+        callbacks=[early_stop_tft],
+        logger=False,
+        enable_checkpointing=False,
+        enable_model_summary=False,
+        enable_progress_bar=False,
+    )
+    trainer.fit(tft, train_dataloaders=train_dataloader, val_dataloaders=val_dataloader)
+
+    # Single forecast over the first max_prediction_length test days
+    predictions = tft.predict(
+        val_dataloader, mode="prediction", return_x=True, trainer_kwargs=dict(logger=False),
+    )[0].numpy().flatten()
+
+    path = os.path.join(model_dir, 'best_tft_model.pth')
+    torch.save(tft.state_dict(), path)
+    # The backend rebuilds the architecture from this spec (backend/predictor/model_spec.py)
+    save_model_spec(build_model_spec(tft), os.path.join(model_dir, 'best_tft_model.spec.json'))
+    return predictions, path, {
+        'Hidden size': 32,
+        'Attention heads': 2,
+        'Max encoder length': MAX_ENCODER_LENGTH,
+    }
+
+
+TRAINERS = {
+    'ARIMA': train_arima,
+    'SARIMAX': train_sarimax,
+    'LSTM': train_lstm,
+    'TFT': train_tft,
+}
+
+
+def train_model(name, df, train_size, model_dir, threads):
+    """
+    Train one model (worker process entry point)
+
+    Returns:
+        Dictionary with name, predictions, artifact path, info and wall_time in seconds
+    """
+    limit_threads(threads)
+    start = time.perf_counter()
+    predictions, artifact, info = TRAINERS[name](df, train_size, model_dir)
+    return {
+        'name': name,
+        'predictions': np.asarray(predictions, dtype=float),
+        'artifact': artifact,
+        'info': info,
+        'threads': threads,
+        'wall_time': time.perf_counter() - start,
+    }
+
+
+def train_models(df, train_size, models=MODELS, jobs=None, model_dir=None):
+    """
+    Train models, up to jobs at a time in separate processes
+
+    Returns:
+        Dictionary of model name -> train_model() result
+    """
+    model_dir = model_dir or os.path.join(CACHE_DIR, 'models')
+    os.makedirs(model_dir, exist_ok=True)
+    jobs = min(jobs or len(models), len(models))
+    threads = plan_threads(models, jobs)
+
+    results = {}
+    if jobs <= 1:
+        for name in models:
+            results[name] = train_model(name, df, train_size, model_dir, threads[name])
+            print_model_result(results[name])
+        return results
+
+    # spawn: TensorFlow and torch are not fork-safe once initialized
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=context) as executor:
+        futures = {
+            executor.submit(train_model, name, df, train_size, model_dir, threads[name]): name
+            for name in models
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"❌ {futures[future]} gagal dilatih: {str(e)}")
+                continue
+            results[result['name']] = result
+            print_model_result(result)
+    return results
+
+
+def print_model_result(result):
+    print(f"✓ {result['name']} Model berhasil dilatih ({result['wall_time']:.1f}s, {result['threads']} threads)")
+    for key, value in result['info'].items():
+        print(f"  - {key}: {value}")
+
+
+# EVALUASI SEMUA MODEL
 
-# Scale data
-scaler = MinMaxScaler(feature_range=(0, 1))
-scaled_data = scaler.fit_transform(df[lstm_features].values)
-
-# Create sequences
-def create_sequences(data, seq_length):
-    X, y = [], []
-    for i in range(len(data) - seq_length):
-        X.append(data[i:i+seq_length])
-        y.append(data[i+seq_length, 0])  # Predict close price
-    return np.array(X), np.array(y)
-
-seq_length = 60
-X, y = create_sequences(scaled_data, seq_length)
-
-# Split
-train_size_lstm = int(len(X) * 0.8)
-X_train, X_test = X[:train_size_lstm], X[train_size_lstm:]
-y_train, y_test = y[:train_size_lstm], y[train_size_lstm:]
-
-# Build LSTM model
-lstm_model = Sequential([
-    LSTM(100, return_sequences=True, input_shape=(seq_length, len(lstm_features))),
-    Dropout(0.2),
-    LSTM(100, return_sequences=True),
-    Dropout(0.2),
-    LSTM(50, return_sequences=False),
-    Dropout(0.2),
-    Dense(25),
-    Dense(1)
-])
-
-lstm_model.compile(optimizer='adam', loss='mean_squared_error')
-
-# Train
-early_stop = EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True)
-history = lstm_model.fit(
-    X_train, y_train,
-    epochs=50,
-    batch_size=32,
-    validation_split=0.1,
-    callbacks=[early_stop],
-    verbose=0
-)
-
-# Predict
-lstm_predictions_scaled = lstm_model.predict(X_test, verbose=0)
-
-# Inverse transform
-lstm_predictions_full = np.zeros((len(lstm_predictions_scaled), len(lstm_features)))
-lstm_predictions_full[:, 0] = lstm_predictions_scaled.flatten()
-lstm_predictions = scaler.inverse_transform(lstm_predictions_full)[:, 0]
-
-print("✓ LSTM Model berhasil dilatih")
-print(f"  - Architecture: 3 LSTM layers (100, 100, 50 units)")
-print(f"  - Sequence Length: {seq_length}")
-print(f"  - Epochs: {len(history.history['loss'])}")
-
-"""# Temporal Fusion Transformer"""
-
-# Prepare data for TFT
-df_tft = df.copy()
-df_tft['time_idx'] = range(len(df_tft))
-df_tft['series'] = 'BBRI'
-df_tft['target'] = df_tft['close']
-
-train_tft = df_tft[:train_size].copy()
-test_tft = df_tft[train_size:].copy()
-
-# Define parameters
-max_prediction_length = min(30, test_size)
-max_encoder_length = 60
-
-# Create TimeSeriesDataSet
-training_tft = TimeSeriesDataSet(
-    train_tft,
-    time_idx="time_idx",
-    target="target",
-    group_ids=["series"],
-    min_encoder_length=max_encoder_length // 2,
-    max_encoder_length=max_encoder_length,
-    min_prediction_length=1,
-    max_prediction_length=max_prediction_length,
-    static_categoricals=["series"],
-    time_varying_known_reals=["time_idx"],
-    time_varying_unknown_reals=[
-        "target", "open", "high", "low", "volume",
-        "ma_7", "ma_30", "rsi", "macd", "macd_signal",
-        "bb_upper", "bb_middle", "bb_lower"
-    ],
-    target_normalizer=GroupNormalizer(groups=["series"], transformation="softplus"),
-    add_relative_time_idx=True,
-    add_target_scales=True,
-    add_encoder_length=True,
-)
-
-validation_tft = TimeSeriesDataSet.from_dataset(training_tft, test_tft, predict=True, stop_randomization=True)
-
-# Dataloaders
-batch_size = 32
-train_dataloader = training_tft.to_dataloader(train=True, batch_size=batch_size, num_workers=0)
-val_dataloader = validation_tft.to_dataloader(train=False, batch_size=batch_size, num_workers=0)
-
-# TFT model
-tft = TemporalFusionTransformer.from_dataset(
-    training_tft,
-    learning_rate=0.03,
-    hidden_size=32,
-    attention_head_size=2,
-    dropout=0.1,
-    hidden_continuous_size=16,
-    output_size=7,
-    loss=QuantileLoss(),
-    reduce_on_plateau_patience=4,
-)
-
-# Trainer
-early_stop_tft = PLEarlyStopping(monitor="val_loss", min_delta=1e-4, patience=10, verbose=False, mode="min")
-trainer = Trainer(
-    max_epochs=30,
-    accelerator="auto",
-    gradient_clip_val=0.1,
-    callbacks=[early_stop_tft],
-    logger=False,
-    enable_checkpointing=False,
-    enable_model_summary=False,
-)
-
-# Train
-trainer.fit(tft, train_dataloaders=train_dataloader, val_dataloaders=val_dataloader)
-
-# Predict
-tft_predictions_raw = tft.predict(val_dataloader, mode="prediction", return_x=True)
-tft_predictions = tft_predictions_raw[0].numpy()
-
-print("✓ TFT Model berhasil dilatih")
-print(f"  - Hidden size: 32")
-print(f"  - Attention heads: 2")
-print(f"  - Max encoder length: {max_encoder_length}")
-
-"""# EVALUASI SEMUA MODEL"""
-
-actual_values = test_df['close'].values
-
-# Adjust predictions to match test size
-arima_pred = arima_predictions[:len(actual_values)]
-sarimax_pred = sarimax_predictions[:len(actual_values)]
-
-# LSTM predictions (align with test data)
-lstm_pred = lstm_predictions[:len(actual_values)]
-if len(lstm_pred) < len(actual_values):
-    lstm_pred = np.pad(lstm_pred, (0, len(actual_values) - len(lstm_pred)), 'edge')
-elif len(lstm_pred) > len(actual_values):
-    lstm_pred = lstm_pred[:len(actual_values)]
-
-# TFT predictions
-# tft_predictions (Variable #23) has shape (1, 30), representing a single forecast horizon.
-# Flatten it to a 1D array.
-tft_pred_flat = tft_predictions.flatten() # Shape (30,)
-
-# For evaluation, compare the predicted horizon with the actual values in that same horizon.
-# Slice actual_values to match the length of the TFT forecast.
-actual_tft_horizon = actual_values[:len(tft_pred_flat)] # Shape (30,)
-
-# Calculate metrics for each model
 def calculate_metrics(actual, predicted, model_name):
     mae = mean_absolute_error(actual, predicted)
     rmse = np.sqrt(mean_squared_error(actual, predicted))
@@ -366,201 +454,263 @@ def calculate_metrics(actual, predicted, model_name):
 
     return {'MAE': mae, 'RMSE': rmse, 'MAPE': mape, 'R2': r2}
 
-metrics = {}
-metrics['ARIMA'] = calculate_metrics(actual_values, arima_pred, "ARIMA")
-metrics['SARIMAX'] = calculate_metrics(actual_values, sarimax_pred, "SARIMAX")
-metrics['LSTM'] = calculate_metrics(actual_values, lstm_pred, "LSTM")
-# Use the correctly shaped TFT predictions and actual values for metric calculation
-metrics['TFT'] = calculate_metrics(actual_tft_horizon, tft_pred_flat, "TFT")
-
-# Find best model
-best_model = min(metrics.items(), key=lambda x: x[1]['RMSE'])
-print(f"\n{'='*80}")
-print(f"🏆 MODEL TERBAIK: {best_model[0]} (RMSE terendah: {best_model[1]['RMSE']:.2f})")
-print(f"{'='*80}")
-
-"""# VISUALISASI"""
-
-output_notebook()
-
-# Prepare dates
-test_dates = test_df['date'].values[:len(actual_values)]
-
-# Plot 1: Perbandingan Semua Model
-p1 = figure(
-    title="Perbandingan Prediksi: ARIMA vs SARIMAX vs LSTM vs TFT",
-    x_axis_type='datetime',
-    width=1200,
-    height=500,
-    tools="pan,wheel_zoom,box_zoom,reset,save"
-)
-
-p1.line(train_df['date'], train_df['close'], legend_label="Training Data",
-        line_width=2, color='gray', alpha=0.5)
-p1.line(test_dates, actual_values, legend_label="Actual",
-        line_width=3, color='black')
-p1.line(test_dates, arima_pred, legend_label="ARIMA",
-        line_width=2, color='red', line_dash='dashed')
-p1.line(test_dates, sarimax_pred, legend_label="SARIMAX",
-        line_width=2, color='blue', line_dash='dotted')
-p1.line(test_dates, lstm_pred, legend_label="LSTM",
-        line_width=2, color='green', line_dash='dashdot')
-
-# Use tft_pred_flat (1D) and slice test_dates to match its length for plotting
-p1.line(test_dates[:len(tft_pred_flat)], tft_pred_flat, legend_label="TFT",
-        line_width=2, color='purple', alpha=0.8)
-
-p1.legend.location = "top_left"
-p1.legend.click_policy = "hide"
-p1.xaxis.axis_label = "Tanggal"
-p1.yaxis.axis_label = "Harga (IDR)"
-
-p2 = figure(
-    title="Relative Strength Index (RSI)",
-    x_axis_type='datetime',
-    width=1200,
-    height=300,
-    tools="pan,wheel_zoom,box_zoom,reset,save"
-)
-
-p2.line(df['date'], df['rsi'], legend_label="RSI", line_width=2, color='blue')
-p2.line(df['date'], [70]*len(df), legend_label="Overbought",
-        line_width=1.5, color='red', line_dash='dashed')
-p2.line(df['date'], [30]*len(df), legend_label="Oversold",
-        line_width=1.5, color='green', line_dash='dashed')
-
-p2.legend.location = "top_left"
-p2.xaxis.axis_label = "Tanggal"
-p2.yaxis.axis_label = "RSI"
-
-p3 = figure(
-    title="MACD dan Signal Line",
-    x_axis_type='datetime',
-    width=1200,
-    height=300,
-    tools="pan,wheel_zoom,box_zoom,reset,save"
-)
-
-p3.line(df['date'], df['macd'], legend_label="MACD", line_width=2, color='blue')
-p3.line(df['date'], df['macd_signal'], legend_label="Signal",
-        line_width=2, color='red')
-p3.vbar(x=df['date'], top=df['macd_diff'], width=0.8,
-        legend_label="Histogram", color='gray', alpha=0.5)
-
-p3.legend.location = "top_left"
-p3.xaxis.axis_label = "Tanggal"
-p3.yaxis.axis_label = "MACD"
-
-p4 = figure(
-    title="Bollinger Bands dengan Harga Saham",
-    x_axis_type='datetime',
-    width=1200,
-    height=400,
-    tools="pan,wheel_zoom,box_zoom,reset,save"
-)
-
-p4.line(df['date'], df['close'], legend_label="Harga",
-        line_width=2, color='navy')
-p4.line(df['date'], df['bb_upper'], legend_label="Upper Band",
-        line_width=1.5, color='red', line_dash='dashed', alpha=0.7)
-p4.line(df['date'], df['bb_middle'], legend_label="Middle Band",
-        line_width=1.5, color='orange', alpha=0.7)
-p4.line(df['date'], df['bb_lower'], legend_label="Lower Band",
-        line_width=1.5, color='green', line_dash='dashed', alpha=0.7)
-
-p4.varea(x=df['date'], y1=df['bb_lower'], y2=df['bb_upper'],
-         alpha=0.1, color='blue')
-
-p4.legend.location = "top_left"
-p4.xaxis.axis_label = "Tanggal"
-p4.yaxis.axis_label = "Harga (IDR)"
-
-layout = column(p1, p2, p3, p4)
-show(layout)
-
-print("\n" + "=" * 80)
-print("ANALISIS TEKNIKAL TERAKHIR")
-print("=" * 80)
-
-latest = df.iloc[-1]
-print(f"\nData Terakhir ({latest['date'].strftime('%Y-%m-%d')}):")
-print(f"  Harga Penutupan: Rp {latest['close']:>12,.0f}")
-print(f"  MA 7 hari:       Rp {latest['ma_7']:>12,.0f}")
-print(f"  MA 30 hari:      Rp {latest['ma_30']:>12,.0f}")
-print(f"  RSI:             {latest['rsi']:>15.2f}")
-print(f"  MACD:            {latest['macd']:>15.4f}")
-print(f"  MACD Signal:     {latest['macd_signal']:>15.4f}")
-print(f"  BB Upper:        Rp {latest['bb_upper']:>12,.0f}")
-print(f"  BB Lower:        Rp {latest['bb_lower']:>12,.0f}")
-
-print("\n" + "-" * 80)
-print("INTERPRETASI SINYAL:")
-print("-" * 80)
-
-if latest['rsi'] > 70:
-    print("  🔴 RSI > 70: OVERBOUGHT - Potensi koreksi/penurunan")
-elif latest['rsi'] < 30:
-    print("  🟢 RSI < 30: OVERSOLD - Peluang beli")
-else:
-    print("  🟡 RSI 30-70: Neutral/Normal")
-
-# Moving Average Analysis
-if latest['close'] > latest['ma_7'] > latest['ma_30']:
-    print("  🟢 MA: Strong Bullish Trend (Harga > MA7 > MA30)")
-elif latest['close'] < latest['ma_7'] < latest['ma_30']:
-    print("  🔴 MA: Strong Bearish Trend (Harga < MA7 < MA30)")
-else:
-    print("  🟡 MA: Mixed Signals")
-
-# MACD Analysis
-if latest['macd'] > latest['macd_signal']:
-    print("  🟢 MACD > Signal: Momentum Positif")
-else:
-    print("  🔴 MACD < Signal: Momentum Negatif")
-
-# Bollinger Bands Analysis
-if latest['close'] > latest['bb_upper']:
-    print("  🔴 Harga > Upper Band: Overbought territory")
-elif latest['close'] < latest['bb_lower']:
-    print("  🟢 Harga < Lower Band: Oversold territory")
-else:
-    print("  🟡 Harga dalam Bollinger Bands: Normal range")
-
-print("\n" + "=" * 80)
-print("KESIMPULAN:")
-print("=" * 80)
-print(f"✓ Model terbaik untuk prediksi: {best_model[0]}")
-print(f"✓ RMSE terbaik: {best_model[1]['RMSE']:.2f}")
-print(f"✓ MAPE terbaik: {best_model[1]['MAPE']:.2f}%")
-
-"""### Menyimpan Model Terbaik untuk Deployment"""
-
-import torch
-
-# Dapatkan nama model terbaik dari hasil evaluasi sebelumnya
-best_model_name = best_model[0]
-
-if best_model_name == 'TFT':
-    model_to_save = tft # 'tft' adalah objek model TemporalFusionTransformer yang sudah dilatih
-    model_path = 'best_tft_model.pth'
-    torch.save(model_to_save.state_dict(), model_path)
-    print(f"✓ Model {best_model_name} berhasil disimpan ke {model_path}")
-elif best_model_name == 'LSTM':
-    model_to_save = lstm_model # 'lstm_model' adalah objek model Keras LSTM
-    model_path = 'best_lstm_model.h5'
-    model_to_save.save(model_path)
-    print(f"✓ Model {best_model_name} berhasil disimpan ke {model_path}")
-elif best_model_name == 'ARIMA':
-    model_to_save = arima_fitted # 'arima_fitted' adalah objek model ARIMA yang sudah dilatih
-    model_path = 'best_arima_model.pkl'
-    import joblib
-    joblib.dump(model_to_save, model_path)
-    print(f"✓ Model {best_model_name} berhasil disimpan ke {model_path}")
-elif best_model_name == 'SARIMAX':
-    model_to_save = sarimax_fitted # 'sarimax_fitted' adalah objek model SARIMAX yang sudah dilatih
-    model_path = 'best_sarimax_model.pkl'
-    import joblib
-    joblib.dump(model_to_save, model_path)
-    print(f"✓ Model {best_model_name} berhasil disimpan ke {model_path}")
-else:
-    print(f"⚠️ Tidak dapat menyimpan model: {best_model_name} tidak dikenali atau tidak ada strategi penyimpanan yang ditentukan.")
\ No newline at end of file
+
+def align_predictions(name, predictions, actual_values):
+    """Predictions and actual values over the same test days"""
+    if name == 'TFT':
+        # A single forecast horizon: compare with the actual values in that horizon
+        return actual_values[:len(predictions)], predictions
+
+    if name == 'LSTM' and len(predictions) < len(actual_values):
+        predictions = np.pad(predictions, (0, len(actual_values) - len(predictions)), 'edge')
+    return actual_values, predictions[:len(actual_values)]
+
+
+def evaluate(results, test_df):
+    """Dictionary of model name -> metrics"""
+    actual_values = test_df['close'].values
+    metrics = {}
+    for name in MODELS:
+        if name in results:
+            actual, predicted = align_predictions(name, results[name]['predictions'], actual_values)
+            metrics[name] = calculate_metrics(actual, predicted, name)
+    return metrics
+
+
+def print_timings(results, total_time):
+    print(f"\n{'=' * 80}")
+    print("WAKTU TRAINING PER MODEL")
+    print(f"{'=' * 80}")
+    for name in MODELS:
+        if name in results:
+            print(f"  {name:<10}{results[name]['wall_time']:>10.1f}s  ({results[name]['threads']} threads)")
+    sequential = sum(result['wall_time'] for result in results.values())
+    print(f"  {'Total':<10}{total_time:>10.1f}s  (berurutan: {sequential:.1f}s)")
+
+
+# VISUALISASI
+
+def plot_comparison(df, train_df, test_df, results, path):
+    """Write the comparison and technical-indicator charts to an HTML file"""
+    from bokeh.plotting import figure, output_file, save
+    from bokeh.layouts import column
+
+    actual_values = test_df['close'].values
+    test_dates = test_df['date'].values
+
+    # Plot 1: Perbandingan Semua Model
+    p1 = figure(
+        title="Perbandingan Prediksi: ARIMA vs SARIMAX vs LSTM vs TFT",
+        x_axis_type='datetime',
+        width=1200,
+        height=500,
+        tools="pan,wheel_zoom,box_zoom,reset,save"
+    )
+    p1.line(train_df['date'], train_df['close'], legend_label="Training Data",
+            line_width=2, color='gray', alpha=0.5)
+    p1.line(test_dates, actual_values, legend_label="Actual",
+            line_width=3, color='black')
+
+    styles = {
+        'ARIMA': dict(color='red', line_dash='dashed'),
+        'SARIMAX': dict(color='blue', line_dash='dotted'),
+        'LSTM': dict(color='green', line_dash='dashdot'),
+        'TFT': dict(color='purple', alpha=0.8),
+    }
+    for name, style in styles.items():
+        if name in results:
+            _, predicted = align_predictions(name, results[name]['predictions'], actual_values)
+            p1.line(test_dates[:len(predicted)], predicted, legend_label=name, line_width=2, **style)
+
+    p1.legend.location = "top_left"
+    p1.legend.click_policy = "hide"
+    p1.xaxis.axis_label = "Tanggal"
+    p1.yaxis.axis_label = "Harga (IDR)"
+
+    p2 = figure(
+        title="Relative Strength Index (RSI)",
+        x_axis_type='datetime',
+        width=1200,
+        height=300,
+        tools="pan,wheel_zoom,box_zoom,reset,save"
+    )
+    p2.line(df['date'], df['rsi'], legend_label="RSI", line_width=2, color='blue')
+    p2.line(df['date'], [70]*len(df), legend_label="Overbought",
+            line_width=1.5, color='red', line_dash='dashed')
+    p2.line(df['date'], [30]*len(df), legend_label="Oversold",
+            line_width=1.5, color='green', line_dash='dashed')
+    p2.legend.location = "top_left"
+    p2.xaxis.axis_label = "Tanggal"
+    p2.yaxis.axis_label = "RSI"
+
+    p3 = figure(
+        title="MACD dan Signal Line",
+        x_axis_type='datetime',
+        width=1200,
+        height=300,
+        tools="pan,wheel_zoom,box_zoom,reset,save"
+    )
+    p3.line(df['date'], df['macd'], legend_label="MACD", line_width=2, color='blue')
+    p3.line(df['date'], df['macd_signal'], legend_label="Signal",
+            line_width=2, color='red')
+    p3.vbar(x=df['date'], top=df['macd_diff'], width=0.8,
+            legend_label="Histogram", color='gray', alpha=0.5)
+    p3.legend.location = "top_left"
+    p3.xaxis.axis_label = "Tanggal"
+    p3.yaxis.axis_label = "MACD"
+
+    p4 = figure(
+        title="Bollinger Bands dengan Harga Saham",
+        x_axis_type='datetime',
+        width=1200,
+        height=400,
+        tools="pan,wheel_zoom,box_zoom,reset,save"
+    )
+    p4.line(df['date'], df['close'], legend_label="Harga",
+            line_width=2, color='navy')
+    p4.line(df['date'], df['bb_upper'], legend_label="Upper Band",
+            line_width=1.5, color='red', line_dash='dashed', alpha=0.7)
+    p4.line(df['date'], df['bb_middle'], legend_label="Middle Band",
+            line_width=1.5, color='orange', alpha=0.7)
+    p4.line(df['date'], df['bb_lower'], legend_label="Lower Band",
+            line_width=1.5, color='green', line_dash='dashed', alpha=0.7)
+    p4.varea(x=df['date'], y1=df['bb_lower'], y2=df['bb_upper'],
+             alpha=0.1, color='blue')
+    p4.legend.location = "top_left"
+    p4.xaxis.axis_label = "Tanggal"
+    p4.yaxis.axis_label = "Harga (IDR)"
+
+    output_file(path, title="BBRI Model Comparison")
+    save(column(p1, p2, p3, p4))
+
+
+def print_technical_summary(df):
+    print("\n" + "=" * 80)
+    print("ANALISIS TEKNIKAL TERAKHIR")
+    print("=" * 80)
+
+    latest = df.iloc[-1]
+    print(f"\nData Terakhir ({latest['date'].strftime('%Y-%m-%d')}):")
+    print(f"  Harga Penutupan: Rp {latest['close']:>12,.0f}")
+    print(f"  MA 7 hari:       Rp {latest['ma_7']:>12,.0f}")
+    print(f"  MA 30 hari:      Rp {latest['ma_30']:>12,.0f}")
+    print(f"  RSI:             {latest['rsi']:>15.2f}")
+    print(f"  MACD:            {latest['macd']:>15.4f}")
+    print(f"  MACD Signal:     {latest['macd_signal']:>15.4f}")
+    print(f"  BB Upper:        Rp {latest['bb_upper']:>12,.0f}")
+    print(f"  BB Lower:        Rp {latest['bb_lower']:>12,.0f}")
+
+    print("\n" + "-" * 80)
+    print("INTERPRETASI SINYAL:")
+    print("-" * 80)
+
+    if latest['rsi'] > 70:
+        print("  🔴 RSI > 70: OVERBOUGHT - Potensi koreksi/penurunan")
+    elif latest['rsi'] < 30:
+        print("  🟢 RSI < 30: OVERSOLD - Peluang beli")
+    else:
+        print("  🟡 RSI 30-70: Neutral/Normal")
+
+    # Moving Average Analysis
+    if latest['close'] > latest['ma_7'] > latest['ma_30']:
+        print("  🟢 MA: Strong Bullish Trend (Harga > MA7 > MA30)")
+    elif latest['close'] < latest['ma_7'] < latest['ma_30']:
+        print("  🔴 MA: Strong Bearish Trend (Harga < MA7 < MA30)")
+    else:
+        print("  🟡 MA: Mixed Signals")
+
+    # MACD Analysis
+    if latest['macd'] > latest['macd_signal']:
+        print("  🟢 MACD > Signal: Momentum Positif")
+    else:
+        print("  🔴 MACD < Signal: Momentum Negatif")
+
+    # Bollinger Bands Analysis
+    if latest['close'] > latest['bb_upper']:
+        print("  🔴 Harga > Upper Band: Overbought territory")
+    elif latest['close'] < latest['bb_lower']:
+        print("  🟢 Harga < Lower Band: Oversold territory")
+    else:
+        print("  🟡 Harga dalam Bollinger Bands: Normal range")
+
+
+# Menyimpan Model Terbaik untuk Deployment
+
+def save_best_model(best_model_name, results, output_dir):
+    """Copy the best model's artifact (and the TFT spec) into output_dir"""
+    artifact = results[best_model_name]['artifact']
+    paths = [artifact]
+    if best_model_name == 'TFT':
+        paths.append(os.path.join(os.path.dirname(artifact), 'best_tft_model.spec.json'))
+
+    for path in paths:
+        destination = os.path.join(output_dir, os.path.basename(path))
+        shutil.copy2(path, destination)
+        print(f"✓ Model {best_model_name} berhasil disimpan ke {destination}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Train and compare ARIMA, SARIMAX, LSTM and TFT')
+    parser.add_argument('--ticker', default=TICKER)
+    parser.add_argument('--start', default=START_DATE)
+    parser.add_argument('--end', default=END_DATE, help='Exclusive end date (YYYY-MM-DD)')
+    parser.add_argument('--source', default='yahoo', choices=['yahoo', 'simulator', 'sample'],
+                        help='Price data source (simulator/sample work offline)')
+    parser.add_argument('--models', nargs='+', default=list(MODELS), choices=MODELS)
+    parser.add_argument('--jobs', type=int, help='Models trained at the same time (default: all)')
+    parser.add_argument('--cache-dir', default=CACHE_DIR, help='Price store, feature frames and trained models')
+    parser.add_argument('--refresh-features', action='store_true', help='Rebuild the cached feature frame')
+    parser.add_argument('--output-dir', default=ROOT_DIR, help='Where the best model is saved')
+    parser.add_argument('--no-save', action='store_true', help='Do not copy the best model to --output-dir')
+    parser.add_argument('--plot', help='Write the comparison charts to this HTML file')
+    args = parser.parse_args(argv)
+
+    pipeline_start = time.perf_counter()
+
+    start = time.perf_counter()
+    df, cached = load_features(args.ticker, args.start, args.end, args.source, args.cache_dir, args.refresh_features)
+    print(f"✓ Data {args.ticker} siap: {len(df)} baris "
+          f"({'cache' if cached else 'baru'}, {time.perf_counter() - start:.1f}s)")
+
+    train_df, test_df = split_data(df, int(len(df) * 0.8))
+    print(f"✓ Data split selesai")
+    print(f"  - Training: {len(train_df)} baris ({len(train_df)/len(df)*100:.1f}%)")
+    print(f"  - Testing: {len(test_df)} baris ({len(test_df)/len(df)*100:.1f}%)")
+
+    training_start = time.perf_counter()
+    results = train_models(df, len(train_df), args.models, args.jobs, os.path.join(args.cache_dir, 'models'))
+    print_timings(results, time.perf_counter() - training_start)
+    if not results:
+        print("❌ Tidak ada model yang berhasil dilatih")
+        return 1
+
+    metrics = evaluate(results, test_df)
+
+    # Find best model
+    best_model = min(metrics.items(), key=lambda x: x[1]['RMSE'])
+    print(f"\n{'='*80}")
+    print(f"🏆 MODEL TERBAIK: {best_model[0]} (RMSE terendah: {best_model[1]['RMSE']:.2f})")
+    print(f"{'='*80}")
+
+    if args.plot:
+        plot_comparison(df, train_df, test_df, results, args.plot)
+        print(f"✓ Grafik disimpan ke {args.plot}")
+
+    print_technical_summary(df)
+
+    print("\n" + "=" * 80)
+    print("KESIMPULAN:")
+    print("=" * 80)
+    print(f"✓ Model terbaik untuk prediksi: {best_model[0]}")
+    print(f"✓ RMSE terbaik: {best_model[1]['RMSE']:.2f}")
+    print(f"✓ MAPE terbaik: {best_model[1]['MAPE']:.2f}%")
+
+    if not args.no_save:
+        save_best_model(best_model[0], results, args.output_dir)
+
+    print(f"\n⏱️ Total waktu pipeline: {time.perf_counter() - pipeline_start:.1f}s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,10 +1,124 @@
 import { useEffect, useRef } from 'react'
 
-function BokehChart({ plotData }) {
+// Build the prediction figure in the browser from the raw arrays
+// (requested with chart: 'client', so the server skips Bokeh serialization)
+function buildFigure(prediction, element) {
+    const Bokeh = window.Bokeh
+    const { historical, predictions, ticker } = prediction
+
+    const histSource = new Bokeh.ColumnDataSource({
+        data: {
+            date: historical.dates.map((d) => Date.parse(d)),
+            price: historical.close,
+        }
+    })
+
+    const predSource = new Bokeh.ColumnDataSource({
+        data: {
+            date: predictions.dates.map((d) => Date.parse(d)),
+            median: predictions.median,
+            lower: predictions.lower_bound,
+            upper: predictions.upper_bound,
+        }
+    })
+
+    const p = Bokeh.Plotting.figure({
+        title: `Prediksi Harga Saham ${ticker.split('.')[0]}`,
+        x_axis_type: 'datetime',
+        width: 1000,
+        height: 500,
+        tools: 'pan,wheel_zoom,box_zoom,reset,save',
+        toolbar_location: 'above',
+        sizing_mode: 'stretch_width',
+    })
+
+    p.line({ field: 'date' }, { field: 'price' }, {
+        source: histSource,
+        legend_label: 'Data Historis',
+        line_width: 2.5,
+        color: '#2C3E50',
+        alpha: 0.8,
+    })
+    const histCircles = p.scatter({ field: 'date' }, { field: 'price' }, {
+        source: histSource,
+        size: 5,
+        color: '#2C3E50',
+        alpha: 0.6,
+    })
+
+    p.line({ field: 'date' }, { field: 'median' }, {
+        source: predSource,
+        legend_label: 'Prediksi (Median)',
+        line_width: 3,
+        color: '#E74C3C',
+        alpha: 0.9,
+    })
+    const predCircles = p.scatter({ field: 'date' }, { field: 'median' }, {
+        source: predSource,
+        size: 6,
+        color: '#E74C3C',
+        alpha: 0.8,
+    })
+
+    p.add_layout(new Bokeh.Band({
+        base: { field: 'date' },
+        lower: { field: 'lower' },
+        upper: { field: 'upper' },
+        source: predSource,
+        level: 'underlay',
+        fill_alpha: 0.3,
+        fill_color: '#3498DB',
+        line_width: 1,
+        line_color: '#3498DB',
+        line_dash: 'dashed',
+        line_alpha: 0.5,
+    }))
+
+    p.add_tools(
+        new Bokeh.HoverTool({
+            renderers: [histCircles],
+            tooltips: [
+                ['Tanggal', '@date{%d %b %Y}'],
+                ['Harga', 'Rp @price{0,0}'],
+            ],
+            formatters: { '@date': 'datetime' },
+            mode: 'mouse',
+        }),
+        new Bokeh.HoverTool({
+            renderers: [predCircles],
+            tooltips: [
+                ['Tanggal', '@date{%d %b %Y}'],
+                ['Prediksi', 'Rp @median{0,0}'],
+                ['Rentang Bawah (10%)', 'Rp @lower{0,0}'],
+                ['Rentang Atas (90%)', 'Rp @upper{0,0}'],
+            ],
+            formatters: { '@date': 'datetime' },
+            mode: 'mouse',
+        }),
+    )
+
+    // Styling (matches the server-rendered chart)
+    p.title.text_font_size = '16pt'
+    p.title.text_color = '#2C3E50'
+    p.title.align = 'center'
+    p.xaxis.axis_label = 'Tanggal'
+    p.yaxis.axis_label = 'Harga (IDR)'
+    p.yaxis.formatter = new Bokeh.NumeralTickFormatter({ format: '0,0' })
+    p.legend.location = 'top_left'
+    p.legend.click_policy = 'hide'
+    p.legend.background_fill_alpha = 0.8
+    p.grid.grid_line_alpha = 0.3
+    p.background_fill_color = '#FAFAFA'
+    p.border_fill_color = '#FFFFFF'
+
+    return Bokeh.Plotting.show(p, element)
+}
+
+function BokehChart({ plotData, prediction }) {
     const chartRef = useRef(null)
 
     useEffect(() => {
-        if (!plotData || !window.Bokeh) {
+        if (!window.Bokeh || (!plotData && !prediction)) {
             console.error('Bokeh or plot data not available')
             return
         }
@@ -15,12 +129,16 @@ function BokehChart({ plotData }) {
                 chartRef.current.innerHTML = ''
             }
 
-            // Embed Bokeh plot
-            window.Bokeh.embed.embed_item(plotData, 'bokeh-plot')
+            if (plotData) {
+                // Embed server-rendered Bokeh plot
+                window.Bokeh.embed.embed_item(plotData, 'bokeh-plot')
+            } else {
+                buildFigure(prediction, chartRef.current)
+            }
         } catch (error) {
             console.error('Error embedding Bokeh plot:', error)
         }
-    }, [plotData])
+    }, [plotData, prediction])
 
     return (
         <div className="chart-container">
@@ -46,7 +46,8 @@ function PredictionForm({ onPrediction, onError, onLoading, loading }) {
         onLoading(true)
         try {
             const response = await axios.post('/api/predict/', {
-                target_date: targetDate
+                target_date: targetDate,
+                chart: 'client'  // BokehChart builds the figure from the raw arrays
             })
 
             onPrediction(response.data)
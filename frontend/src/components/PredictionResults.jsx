@@ -123,7 +123,7 @@ function PredictionResults({ data }) {
                     </div>
                 </div>
 
-                <BokehChart plotData={data.bokeh_plot} />
+                <BokehChart plotData={data.bokeh_plot} prediction={data} />
             </div>
 
             {/* Disclaimer */}